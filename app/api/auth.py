@@ -57,6 +57,8 @@ async def check_and_increment_usage(user_id: str):
     Uses Clerk's private metadata to store usage stats.
     """
     from app.config import settings
+    from app.utils.shared_state import get_shared_state
+    import asyncio
     import httpx
     from datetime import datetime
     import structlog
@@ -98,6 +100,18 @@ async def check_and_increment_usage(user_id: str):
             usage_data = {"date": today_str, "count": 0}
             
         current_count = usage_data.get("count", 0)
+
+        # With several workers, concurrent requests would all pass the check
+        # before any writes back, so they count on one atomic shared counter
+        # (seeded from Clerk) instead
+        shared_state = get_shared_state()
+        if shared_state:
+            try:
+                current_count = await asyncio.to_thread(
+                    shared_state.incr, f"usage:{user_id}:{today_str}", 2 * 86400, current_count
+                ) - 1
+            except Exception as e:
+                logger.warning("shared_usage_counter_failed", user_id=user_id, error=str(e))
         logger.info("usage_check", current_count=current_count, limit=5)
         
         # 3. Enforce limit (5 per day)
@@ -0,0 +1,45 @@
+import asyncio
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.config import settings
+from app.utils import diagnostics
+
+router = APIRouter()
+
+_profile_lock = asyncio.Lock()
+
+
+async def require_diagnostics_token(x_diagnostics_token: Optional[str] = Header(None)):
+    """Guard debug endpoints with the shared DIAGNOSTICS_TOKEN."""
+    if not settings.DIAGNOSTICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_diagnostics_token or not hmac.compare_digest(x_diagnostics_token, settings.DIAGNOSTICS_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid diagnostics token")
+
+
+@router.get("/loop", dependencies=[Depends(require_diagnostics_token)])
+async def loop_status() -> dict:
+    """Current event-loop lag and recently captured stalls."""
+    if not diagnostics.loop_monitor:
+        raise HTTPException(status_code=503, detail="Loop monitor is not running")
+    return diagnostics.loop_monitor.snapshot()
+
+
+@router.get("/profile", response_class=PlainTextResponse, dependencies=[Depends(require_diagnostics_token)])
+async def profile(
+    seconds: float = Query(5.0, gt=0, le=60),
+    interval_ms: float = Query(5.0, ge=1, le=100)
+) -> PlainTextResponse:
+    """Run a time-boxed sampling profile and return collapsed stacks."""
+    if _profile_lock.locked():
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    async with _profile_lock:
+        # Sample from a worker thread so the loop itself shows up in the profile
+        collapsed = await asyncio.to_thread(
+            diagnostics.sample_stacks, seconds, interval_ms / 1000
+        )
+    return PlainTextResponse(collapsed)
@@ -0,0 +1,104 @@
+from datetime import datetime
+from typing import Any, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+
+from app.api.auth import get_current_user
+from app.models.schemas import (
+    SummarySeries,
+    WatchItem,
+    WatchItemCreate,
+    WatchItemUpdate
+)
+from app.services.watchlist import WatchEntry, WatchlistLimitError, watchlist_scheduler
+
+router = APIRouter()
+
+User = Any
+
+
+def _get_entry(watch_id: str, current_user: User) -> WatchEntry:
+    entry = watchlist_scheduler.get_item(current_user.clerk_id, watch_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Watch item {watch_id} not found")
+    return entry
+
+
+@router.get("", response_model=List[WatchItem])
+async def list_watch_items(current_user: User = Depends(get_current_user)) -> List[WatchItem]:
+    """List the posts the current user tracks."""
+    return watchlist_scheduler.list_items(current_user.clerk_id)
+
+
+@router.post("", response_model=WatchItem, status_code=201)
+async def add_watch_item(
+    request: WatchItemCreate,
+    current_user: User = Depends(get_current_user)
+) -> WatchItem:
+    """Track a post; its first run is scheduled within the first interval."""
+    try:
+        return await watchlist_scheduler.add(
+            current_user.clerk_id,
+            str(request.url),
+            request.language,
+            request.intervalSeconds,
+            request.delta
+        )
+    except WatchlistLimitError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{watch_id}", response_model=WatchItem)
+async def get_watch_item(watch_id: str, current_user: User = Depends(get_current_user)) -> WatchItem:
+    return _get_entry(watch_id, current_user).to_schema()
+
+
+@router.patch("/{watch_id}", response_model=WatchItem)
+async def update_watch_item(
+    watch_id: str,
+    request: WatchItemUpdate,
+    current_user: User = Depends(get_current_user)
+) -> WatchItem:
+    """Change the interval or language, or pause/resume a tracked post."""
+    entry = _get_entry(watch_id, current_user)
+    try:
+        return await watchlist_scheduler.update(
+            entry,
+            language=request.language,
+            interval=request.intervalSeconds,
+            enabled=request.enabled,
+            clear_language="language" in request.model_fields_set and request.language is None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.delete("/{watch_id}", status_code=204)
+async def delete_watch_item(watch_id: str, current_user: User = Depends(get_current_user)) -> Response:
+    """Stop tracking a post and drop its series."""
+    await watchlist_scheduler.remove(_get_entry(watch_id, current_user))
+    return Response(status_code=204)
+
+
+@router.post("/{watch_id}/run", response_model=WatchItem)
+async def run_watch_item(watch_id: str, current_user: User = Depends(get_current_user)) -> WatchItem:
+    """Move the next run of a tracked post to now."""
+    return watchlist_scheduler.run_now(_get_entry(watch_id, current_user))
+
+
+@router.get("/{watch_id}/series", response_model=SummarySeries)
+async def get_watch_series(
+    watch_id: str,
+    since: Optional[datetime] = None,
+    limit: int = Query(1000, ge=1, le=10000),
+    current_user: User = Depends(get_current_user)
+) -> SummarySeries:
+    """Summary snapshots of a tracked post, oldest first (the latest `limit`)."""
+    entry = _get_entry(watch_id, current_user)
+    return SummarySeries(
+        watchId=entry.id,
+        url=entry.url,
+        points=await watchlist_scheduler.series(entry, since=since, limit=limit)
+    )
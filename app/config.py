@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 from pydantic_settings import BaseSettings
 
 
@@ -38,6 +38,18 @@ class Settings(BaseSettings):
     # Model Configuration
     GEMINI_MODEL: str = "gemini-2.5-flash"
     OPENAI_MODEL: Optional[str] = "gpt-4"
+    OPENAI_BASE_URL: str = "https://api.openai.com/v1"  # Any OpenAI-compatible endpoint
+    # Gemini model -> OpenAI model for each tier; unmapped models use OPENAI_MODEL
+    OPENAI_MODEL_MAP: Dict[str, str] = {"gemini-2.5-flash-lite": "gpt-4o-mini"}
+    
+    # Model Providers: each call goes to the provider with the best rolling
+    # latency/error score and fails over to the next one on timeouts,
+    # throttling or errors (openai is skipped without OPENAI_API_KEY)
+    MODEL_PROVIDERS: List[str] = ["gemini", "openai"]
+    MODEL_CALL_TIMEOUT: float = 60.0
+    MODEL_ROUTER_WINDOW: int = 50  # Calls per provider kept for the score
+    MODEL_ROUTER_WINDOW_SECONDS: float = 300.0  # Older samples expire, so demoted providers get re-probed
+    MODEL_ROUTER_THROTTLE_COOLDOWN: float = 30.0  # Breaker open time when a 429 carries no Retry-After
     
     # Processing Settings
     BATCH_SIZE: int = 10
@@ -45,6 +57,147 @@ class Settings(BaseSettings):
     MAX_CONCURRENT_BATCHES: int = 5
     REQUEST_TIMEOUT: int = 300
     
+    # Tail latency: an optional per-request budget (seconds, scrape included)
+    # after which unfinished batches are cancelled and the response is partial,
+    # and hedged duplicates for batches slower than the HEDGE_QUANTILE latency
+    ANALYSIS_DEADLINE: Optional[float] = None  # Default for requests without `deadlineSeconds`
+    HEDGE_ENABLED: bool = False
+    HEDGE_QUANTILE: float = 0.95
+    HEDGE_MIN_SAMPLES: int = 20  # Batch latencies seen before the first hedge
+    HEDGE_MAX_RATE: float = 0.1  # At most this share of recent batches is hedged
+    
+    # Model Cascade: the cheap model labels everything with a confidence and only
+    # low-confidence, sarcastic or disputed comments escalate to GEMINI_MODEL
+    CASCADE_ENABLED: bool = False  # Default for requests that do not set `cascade`
+    CASCADE_CHEAP_MODEL: str = "gemini-2.5-flash-lite"
+    CASCADE_ESCALATION_THRESHOLD: float = 0.8
+    # USD per 1M (input, output) tokens, for the cost estimate in `modelTiers`
+    MODEL_PRICING: Dict[str, Tuple[float, float]] = {
+        "gemini-2.5-flash": (0.30, 2.50),
+        "gemini-2.5-flash-lite": (0.10, 0.40),
+        "gpt-4": (30.00, 60.00),
+        "gpt-4o-mini": (0.15, 0.60)
+    }
+    
+    # Rule-based fast path (opt-in, it changes labels): short English or
+    # emoji-only comments the local lexicon scores at or above the threshold
+    # skip the model
+    RULE_CLASSIFIER_ENABLED: bool = False
+    RULE_CLASSIFIER_THRESHOLD: float = 0.85
+    
+    # Distributed batches: "local" runs model batches inside the request; "redis"
+    # publishes them to a shared queue consumed by `python -m app.worker`
+    # processes ("memory" is an in-process queue for single-process use and
+    # tests). Unacknowledged batches are redelivered after the visibility timeout
+    BATCH_QUEUE_BACKEND: str = "local"
+    BATCH_QUEUE_NAME: str = "sentiment:batches"
+    BATCH_QUEUE_VISIBILITY_TIMEOUT: float = 90.0  # Extended by the worker while it runs the batch
+    BATCH_QUEUE_MAX_DELIVERIES: int = 3  # Then the batch fails instead of being retried
+    BATCH_QUEUE_RESULT_TIMEOUT: float = 300.0  # Longest wait for a batch without a request deadline
+    BATCH_QUEUE_POLL_INTERVAL: float = 0.2  # Max idle poll delay of a redis consumer
+    BATCH_WORKER_CONCURRENCY: int = 8  # Batches each worker process runs at once
+    BATCH_WORKER_IN_API: bool = False  # Also consume in API processes (always on for "memory")
+    
+    # Language ID: comments are tagged locally (script and word lists) and
+    # batched per language; languages with fewer comments than the minimum
+    # share batches instead of each costing a nearly empty call
+    LANGUAGE_ID_ENABLED: bool = True
+    LANGUAGE_GROUP_MIN_SIZE: int = 5
+    
+    # PDF Rendering (0 workers renders in a thread instead of a process pool)
+    PDF_WORKERS: int = 2
+    PDF_MAX_QUEUE: int = 8
+    PDF_RENDER_TIMEOUT: float = 30.0
+    PDF_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    PDF_CACHE_DIR: Optional[str] = None  # Enables the disk tier when set
+    PDF_CACHE_DISK_MAX_BYTES: int = 512 * 1024 * 1024
+    
+    # Result Store (server-side results for export by id)
+    RESULT_STORE_MAX_ENTRIES: int = 500
+    RESULT_STORE_TTL: int = 3600
+    RESULT_STORE_DB: Optional[str] = None  # SQLite path enables the persistent tier
+    
+    # Delta mode (per-post fingerprints and counters of earlier runs)
+    POST_STATE_MAX_ENTRIES: int = 1000
+    POST_STATE_DB: Optional[str] = None  # SQLite path keeps delta state across restarts
+    
+    # Comment Cleaning (large inputs are cleaned in chunks on a process pool;
+    # 0 workers uses a thread instead)
+    CLEAN_WORKERS: int = 2
+    CLEAN_PARALLEL_THRESHOLD: int = 20000
+    CLEAN_CHUNK_SIZE: int = 10000
+    CLEAN_NORMALIZE_EMOJI: bool = False
+    CLEAN_NORMALIZE_MENTIONS: bool = False
+    CLEAN_NORMALIZE_HASHTAGS: bool = False
+    
+    # Response Compression (brotli is used when installed and accepted)
+    COMPRESSION_MIN_SIZE: int = 1024
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+    
+    # Sampling mode: scrape up to SAMPLING_MAX_COMMENTS, analyze a stratified sample
+    SAMPLING_MAX_COMMENTS: int = 50000
+    SAMPLING_MAX_SAMPLE: int = 2000
+    SAMPLING_DEFAULT_MARGIN: float = 0.03
+    
+    # Circuit breakers per Apify actor and per model provider/model: open after
+    # consecutive failures, fail fast while open, probe again after the timeout.
+    # Retries spend from a per-upstream budget that refills by RETRY_BUDGET_RATIO
+    # per call, so a degraded upstream is not hit with every retry of every request
+    BREAKER_FAILURE_THRESHOLD: int = 5
+    BREAKER_RESET_TIMEOUT: float = 30.0
+    BREAKER_HALF_OPEN_PROBES: int = 1
+    RETRY_BUDGET_RATIO: float = 0.2
+    RETRY_BUDGET_MIN_TOKENS: float = 3.0
+    RETRY_BUDGET_MAX_TOKENS: float = 20.0
+    APIFY_MAX_ATTEMPTS: int = 3
+    
+    # Upstream concurrency shared by API requests and watchlist runs
+    MODEL_MAX_CONCURRENCY: int = 8
+    APIFY_MAX_CONCURRENCY: int = 4
+    
+    # Multi-worker deployments (gunicorn.conf.py): "local" keeps the concurrency
+    # budgets, usage counters and caches per process; "sqlite" shares them
+    # between the workers of one host (SHARED_STATE_DB); "redis" between hosts.
+    # Budget limits above then apply to the whole deployment
+    SHARED_STATE_BACKEND: str = "local"
+    SHARED_STATE_DB: Optional[str] = None  # Defaults to a file in the temp directory
+    SHARED_STATE_PREFIX: str = "sentiment:shared"
+    SHARED_BUDGET_LEASE: float = 60.0  # Renewed while the call runs; slots of crashed workers free up after it
+    SHARED_BUDGET_POLL_INTERVAL: float = 0.2  # Max wait between attempts on a full budget
+    WEB_CONCURRENCY: int = 0  # gunicorn workers; 0 = one per CPU with a shared backend, else 1
+    
+    # Watchlist: in-process scheduler that re-analyzes tracked posts and keeps a
+    # summary time series (needs a long-running process, so it is opt-in)
+    WATCHLIST_ENABLED: bool = False
+    WATCHLIST_DB: str = "watchlist.db"
+    WATCHLIST_MAX_ITEMS_PER_OWNER: int = 500
+    WATCHLIST_MIN_INTERVAL: int = 300
+    WATCHLIST_JITTER: float = 0.1  # Each interval is stretched or shrunk by up to 10%
+    WATCHLIST_STARTUP_SPREAD: float = 300.0  # Overdue runs are spread over this window
+    WATCHLIST_MAX_CONCURRENT_RUNS: int = 4
+    WATCHLIST_CONTEXT_TTL: int = 6 * 3600  # Re-scrape post context/transcripts after this
+    WATCHLIST_RETENTION_DAYS: int = 90
+    
+    # Apify run mode: "sync" holds one run-sync-get-dataset-items request open for
+    # the whole actor run; "async" starts the run, long-polls its status and
+    # streams the dataset in pages, reusing a recent run's dataset for the same input
+    APIFY_RUN_MODE: str = "sync"
+    APIFY_API_URL: str = "https://api.apify.com/v2"
+    APIFY_POLL_WAIT: int = 30  # waitForFinish seconds per status request (Apify caps it at 60)
+    APIFY_POLL_BACKOFF_MAX: float = 10.0
+    APIFY_DATASET_PAGE_SIZE: int = 1000
+    APIFY_RUN_REUSE_TTL: int = 600  # 0 disables reuse
+    
+    # Scrape cache: actor responses keyed by actor and input (canonical post URL
+    # included), so re-analyzing a post skips Apify until the platform's TTL
+    # (seconds, 0 disables) expires; `forceRefresh` on a request bypasses it
+    SCRAPE_CACHE_ENABLED: bool = True
+    SCRAPE_CACHE_TTLS: Dict[str, int] = {"youtube": 3600, "facebook": 1800, "twitter": 600, "instagram": 1800}
+    SCRAPE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    SCRAPE_CACHE_DIR: Optional[str] = None  # Enables the disk tier when set
+    SCRAPE_CACHE_DISK_MAX_BYTES: int = 1024 * 1024 * 1024
+    
     # Platform Specific Limits
     YOUTUBE_MAX_COMMENTS: int = 100
     FACEBOOK_MAX_COMMENTS: int = 100
@@ -54,11 +207,19 @@ class Settings(BaseSettings):
     # Usage Limits
     # Removed for stateless Vercel deployment
     
+    # Diagnostics (opt-in)
+    RESPONSE_TIMINGS_ENABLED: bool = False  # Adds the per-stage `timings` block to analysis responses
+    DIAGNOSTICS_ENABLED: bool = False
+    DIAGNOSTICS_TOKEN: Optional[str] = None
+    LOOP_LAG_INTERVAL: float = 0.5
+    LOOP_BLOCK_THRESHOLD: float = 0.25
+    
     # # Optional Integrations
-    # REDIS_HOST: str = "localhost"
-    # REDIS_PORT: int = 6379
-    # REDIS_DB: int = 0
-    # REDIS_PASSWORD: Optional[str] = None
+    # Redis (used by BATCH_QUEUE_BACKEND=redis and SHARED_STATE_BACKEND=redis)
+    REDIS_HOST: str = "localhost"
+    REDIS_PORT: int = 6379
+    REDIS_DB: int = 0
+    REDIS_PASSWORD: Optional[str] = None
     
     # GOOGLE_SHEETS_CREDENTIALS_FILE: str = "credentials.json"
     # GOOGLE_SHEETS_SPREADSHEET_ID: Optional[str] = None
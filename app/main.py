@@ -2,11 +2,20 @@ import sys
 from pathlib import Path
 import structlog
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime
 from app.config import settings
-from app.api.routes import router
+from app.api.routes import router, process_single_url
+from app.utils.metrics import REGISTRY
+from app.utils.circuit_breaker import BreakerState, breaker_states
+from app.utils import diagnostics
+from app.utils import comment_cleaner
+from app.services.pdf_render_pool import pdf_render_pool
+from app.services.watchlist import watchlist_scheduler
+from app.services.batch_queue import get_batch_queue
+from app.services.batch_worker import BatchWorker
+from app.utils.compression import CompressionMiddleware
 
 # Add the project root directory to the Python path
 project_root = str(Path(__file__).parent.parent)
@@ -19,7 +28,30 @@ logger = structlog.get_logger()
 async def lifespan(app: FastAPI):
     """Startup and shutdown events."""
     logger.info("app_starting", version=settings.VERSION)
+    monitor = None
+    if settings.DIAGNOSTICS_ENABLED:
+        monitor = diagnostics.start_loop_monitor(
+            interval=settings.LOOP_LAG_INTERVAL,
+            block_threshold=settings.LOOP_BLOCK_THRESHOLD
+        )
+    await pdf_render_pool.start()
+    if settings.WATCHLIST_ENABLED:
+        await watchlist_scheduler.start(process_single_url)
+    batch_worker = None
+    if settings.BATCH_QUEUE_BACKEND == "memory" or (
+        settings.BATCH_WORKER_IN_API and settings.BATCH_QUEUE_BACKEND != "local"
+    ):
+        batch_worker = BatchWorker(get_batch_queue(), settings.BATCH_WORKER_CONCURRENCY)
+        await batch_worker.start()
     yield
+    if batch_worker:
+        await batch_worker.stop()
+    if settings.WATCHLIST_ENABLED:
+        await watchlist_scheduler.stop()
+    await pdf_render_pool.shutdown()
+    comment_cleaner.shutdown_pool()
+    if monitor:
+        await monitor.stop()
     logger.info("app_shutdown")
 
 
@@ -38,10 +70,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Negotiated brotli/gzip for large JSON and CSV/NDJSON responses
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    gzip_level=settings.GZIP_LEVEL,
+    brotli_quality=settings.BROTLI_QUALITY
+)
+
 # Include API routes
 app.include_router(router, prefix="/api/v1")
 from app.api import auth
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
+if settings.DIAGNOSTICS_ENABLED:
+    from app.api import debug
+    app.include_router(debug.router, prefix="/api/v1/debug", tags=["debug"])
+if settings.WATCHLIST_ENABLED:
+    from app.api import watchlist
+    app.include_router(watchlist.router, prefix="/api/v1/watchlist", tags=["watchlist"])
 
 # Database initialization removed (Stateless)
 
@@ -56,12 +102,23 @@ async def root():
 
 @app.get("/health")
 async def health():
-    """Health check endpoint."""
+    """Health check endpoint; "degraded" while any upstream circuit breaker is open."""
+    breakers = breaker_states()
+    degraded = any(breaker["state"] != BreakerState.CLOSED.value for breaker in breakers.values())
     return {
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat()
+        "status": "degraded" if degraded else "healthy",
+        "timestamp": datetime.now().isoformat(),
+        "breakers": breakers
     }
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics endpoint."""
+    return Response(
+        content=REGISTRY.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
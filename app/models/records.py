@@ -0,0 +1,58 @@
+"""Lightweight internal records for the scrape -> analyze -> summarize pipeline.
+
+These mirror `CleanedComment`, `CommentSentiment` and `BatchResult` from
+`schemas.py` (plus a few pipeline-only fields), but are plain slotted
+dataclasses: no validation, no per-instance `__dict__`. Pydantic models are only built at the
+API boundary (`AnalysisResponse`).
+"""
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from app.models.schemas import Language, SentimentCategory
+
+
+def _as_confidence(value) -> Optional[float]:
+    try:
+        return min(max(float(value), 0.0), 1.0)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(slots=True)
+class CommentRecord:
+    comment: str
+    platform: str
+    originalIndex: int
+    timestamp: Optional[str] = None
+    commentId: Optional[str] = None
+    language: Optional[Language] = None  # Set by local language ID before batching
+
+
+@dataclass(slots=True)
+class SentimentRecord:
+    Comment: str
+    Sentiment: SentimentCategory
+    Justification: str
+    Confidence: Optional[float] = None  # Only requested from the cheap cascade tier
+
+    @classmethod
+    def from_model_output(cls, item: dict) -> "SentimentRecord":
+        """Build from one parsed model object; raises on missing keys or unknown categories."""
+        return cls(
+            Comment=str(item["Comment"]),
+            Sentiment=SentimentCategory(item["Sentiment"]),
+            Justification=str(item["Justification"]),
+            Confidence=_as_confidence(item.get("Confidence"))
+        )
+
+
+@dataclass(slots=True)
+class BatchOutcome:
+    batchNumber: int
+    sentiments: List[SentimentRecord] = field(default_factory=list)
+    processingTime: float = 0.0
+    error: Optional[str] = None
+    model: Optional[str] = None
+    provider: Optional[str] = None
+    inputTokens: int = 0
+    outputTokens: int = 0
@@ -1,6 +1,6 @@
 from enum import Enum
 from typing import Dict, List, Optional
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl
 from datetime import datetime
 
 
@@ -26,15 +26,48 @@ class Language(str, Enum):
     HINDI = "hindi"
     ASSAMESE = "assamese"
     MALAYALAM = "malayalam"
+    HINGLISH = "hinglish"  # Hindi written in Latin script
+    BENGALI = "bengali"
+
+
+class TimelineGranularity(str, Enum):
+    HOUR = "hour"
+    DAY = "day"
+
+
+class SamplingOptions(BaseModel):
+    """Analyze a stratified random sample instead of the first MAX_COMMENTS.
+
+    Give either `sampleSize` or `marginOfError`; with neither, the sample is
+    sized for SAMPLING_DEFAULT_MARGIN.
+    """
+    sampleSize: Optional[int] = Field(None, ge=1)
+    marginOfError: Optional[float] = Field(None, gt=0.0, lt=0.5)
+    confidenceLevel: float = Field(0.95, gt=0.5, lt=1.0)
+    seed: Optional[int] = None
 
 
 class AnalysisRequest(BaseModel):
     url: HttpUrl
-    language: Language = Language.ENGLISH
+    language: Optional[Language] = None  # Hint for comments the local language ID can't place
+    cascade: Optional[bool] = None  # None uses CASCADE_ENABLED
+    escalationThreshold: Optional[float] = Field(None, ge=0.0, le=1.0)
+    sampling: Optional[SamplingOptions] = None
+    delta: bool = False  # Only analyze comments not seen by earlier delta runs
+    timeline: Optional[TimelineGranularity] = None  # Adds per-hour/day counts
+    deadlineSeconds: Optional[float] = Field(None, gt=0)  # None uses ANALYSIS_DEADLINE
+    forceRefresh: bool = False  # Scrape again instead of reusing a cached scrape
 
 class BatchAnalysisRequest(BaseModel):
     urls: List[HttpUrl]
-    language: Language = Language.ENGLISH
+    language: Optional[Language] = None
+    cascade: Optional[bool] = None
+    escalationThreshold: Optional[float] = Field(None, ge=0.0, le=1.0)
+    sampling: Optional[SamplingOptions] = None
+    delta: bool = False
+    timeline: Optional[TimelineGranularity] = None
+    deadlineSeconds: Optional[float] = Field(None, gt=0)  # Applies to each URL
+    forceRefresh: bool = False
 
 
 class CleanedComment(BaseModel):
@@ -50,6 +83,13 @@ class CommentSentiment(BaseModel):
     Justification: str
 
 
+class ProportionEstimate(BaseModel):
+    proportion: float
+    lower: float
+    upper: float
+    estimatedCount: int
+
+
 class SentimentSummary(BaseModel):
     totalComments: int
     supportive_empathetic: int
@@ -59,6 +99,12 @@ class SentimentSummary(BaseModel):
     informative_neutral: int
     appreciative_praising: int
     totalViews: Optional[str] = None
+    # Sampling mode: counts above are for the sample; estimates cover the thread
+    sampled: bool = False
+    populationSize: Optional[int] = None
+    sampleSize: Optional[int] = None
+    confidenceLevel: Optional[float] = None
+    estimates: Optional[Dict[str, ProportionEstimate]] = None
 
 
 class PostContext(BaseModel):
@@ -81,8 +127,54 @@ class BatchResult(BaseModel):
     error: Optional[str] = None
 
 
+class ModelTierStats(BaseModel):
+    tier: str  # local, cheap or strong
+    model: Optional[str] = None
+    calls: int = 0
+    comments: int = 0
+    latencySeconds: float = 0.0  # Wall-clock time of the tier (its calls run in parallel)
+    inputTokens: int = 0
+    outputTokens: int = 0
+    estimatedCostUsd: float = 0.0
+    providers: Dict[str, int] = {}  # Answered calls per provider (after failover)
+
+
+class DeltaStats(BaseModel):
+    """What a delta run added on top of earlier runs of the same post.
+
+    Re-runs scrape newest first on YouTube and Facebook only; Twitter and
+    Instagram actors keep their default order, so there the comment limit can
+    be spent on already-seen comments (see `reachedHighWaterMark`).
+    """
+    runNumber: int
+    previousRunAt: Optional[datetime] = None
+    newComments: int = 0
+    seenComments: int = 0  # Scraped again but already counted
+    totalTracked: int = 0
+    newCounts: Dict[str, int] = {}
+    # False when the scrape stopped before reaching comments from the last run,
+    # so some new comments may have been missed (raise the platform limit)
+    reachedHighWaterMark: bool = True
+    highWaterMark: Optional[datetime] = None  # Time and id of the newest analyzed comment
+    highWaterId: Optional[str] = None
+
+
+class SentimentTimeline(BaseModel):
+    """Comment counts per UTC time bucket, as parallel arrays.
+
+    Only buckets with comments are listed. Relative timestamps ("2 days ago")
+    are only as precise as their unit.
+    """
+    granularity: TimelineGranularity
+    bucketStarts: List[datetime]
+    totals: List[int]
+    counts: Dict[str, List[int]]  # Per category, aligned with bucketStarts
+    undated: int = 0  # Analyzed comments without a usable timestamp
+
+
 class AnalysisResponse(BaseModel):
-    status: str = "completed"
+    resultId: Optional[str] = None
+    status: str = "completed"  # "partial" when the deadline cut analysis short
     error: Optional[str] = None
     timestamp: datetime
     postUrl: str
@@ -93,6 +185,12 @@ class AnalysisResponse(BaseModel):
     allComments: Dict[str, List[str]]
     processingTime: float
     batchesProcessed: int
+    unanalyzedComments: int = 0  # Sent to the model but left without a label (failed or cut off)
+    timings: Optional[Dict[str, float]] = None
+    modelTiers: Optional[List[ModelTierStats]] = None
+    languages: Optional[Dict[str, int]] = None  # Analyzed comments per detected language
+    delta: Optional[DeltaStats] = None
+    timeline: Optional[SentimentTimeline] = None
 
 
 class BatchAnalysisResponse(BaseModel):
@@ -101,6 +199,67 @@ class BatchAnalysisResponse(BaseModel):
     successful_count: int
     failed_count: int
 
+
+class CommentExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+    PARQUET = "parquet"
+
+
+class BulkExportMode(str, Enum):
+    ZIP = "zip"
+    COMBINED = "combined"
+
+
+class BulkExportRequest(BaseModel):
+    batch: Optional[BatchAnalysisResponse] = None
+    resultIds: Optional[List[str]] = None
+    mode: BulkExportMode = BulkExportMode.ZIP
+
+
+class WatchItemCreate(BaseModel):
+    url: HttpUrl
+    language: Optional[Language] = None  # Hint for undetected comments, as on AnalyzeRequest
+    intervalSeconds: int = Field(3600, gt=0)  # Runs are jittered around this interval
+    delta: bool = True  # Only analyze comments that arrived since the last run
+
+
+class WatchItemUpdate(BaseModel):
+    language: Optional[Language] = None  # An explicit null clears the hint
+    intervalSeconds: Optional[int] = Field(None, gt=0)
+    enabled: Optional[bool] = None
+
+
+class WatchItem(BaseModel):
+    id: str
+    url: str
+    platform: Platform
+    language: Optional[Language] = None
+    intervalSeconds: int
+    delta: bool
+    enabled: bool
+    createdAt: datetime
+    nextRunAt: Optional[datetime] = None
+    lastRunAt: Optional[datetime] = None
+    lastError: Optional[str] = None
+    runs: int = 0
+
+
+class SummaryPoint(BaseModel):
+    takenAt: datetime
+    totalComments: int
+    newComments: Optional[int] = None  # Delta items only
+    counts: Dict[str, int]
+    totalViews: Optional[str] = None  # None for Facebook/Instagram runs that reused the post context
+    resultId: Optional[str] = None  # Full result, while it is still in the result store
+
+
+class SummarySeries(BaseModel):
+    watchId: str
+    url: str
+    points: List[SummaryPoint]
+
+
 class UserBase(BaseModel):
     email: str
 
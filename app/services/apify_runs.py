@@ -0,0 +1,159 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import List, Optional, Set, Tuple
+
+import httpx
+import structlog
+
+from app.config import settings
+from app.utils.json_parser import JSONArrayStream
+from app.utils.metrics import CACHE_HITS, CACHE_MISSES
+
+logger = structlog.get_logger()
+
+TERMINAL_STATUSES = {"SUCCEEDED", "FAILED", "ABORTED", "TIMED-OUT"}
+RECENT_RUNS_MAX = 256
+
+
+class ApifyRunError(Exception):
+    """An asynchronous actor run failed, was aborted or took too long."""
+
+
+class ApifyRunClient:
+    """Runs actors without holding a run-sync connection open.
+
+    Starts the run, long-polls its status (`waitForFinish`, with backoff
+    when Apify answers early), then reads the default dataset in pages of
+    APIFY_DATASET_PAGE_SIZE, decoding each page while it downloads. The
+    dataset of a succeeded run is reused for identical input within
+    APIFY_RUN_REUSE_TTL.
+    """
+
+    def __init__(self, api_url: str, token: str, timeout: float):
+        self.api_url = api_url.rstrip("/")
+        self.token = token
+        self.timeout = timeout
+        self._recent_runs: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._aborts: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def input_key(actor_id: str, payload: dict) -> str:
+        digest = hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+        return f"{actor_id}:{digest}"
+
+    async def run(self, actor_id: str, payload: dict, reuse: bool = True) -> List[dict]:
+        """Run `actor_id` with `payload` and return its dataset items.
+
+        With `reuse` off (forced refreshes) a recent dataset is never served;
+        the fresh run's dataset still replaces it for later calls.
+        """
+        key = self.input_key(actor_id, payload)
+        http_timeout = httpx.Timeout(settings.APIFY_POLL_WAIT + 30.0)
+        async with httpx.AsyncClient(timeout=http_timeout, params={"token": self.token}) as client:
+            dataset_id = self._recent_dataset(key) if reuse else None
+            if dataset_id:
+                try:
+                    items = await self._read_dataset(client, dataset_id)
+                    CACHE_HITS.inc(cache="apify_run")
+                    logger.info("apify_run_reused", actor_id=actor_id, dataset_id=dataset_id, items=len(items))
+                    return items
+                except httpx.HTTPStatusError:
+                    self._recent_runs.pop(key, None)  # Dataset expired or deleted
+            CACHE_MISSES.inc(cache="apify_run")
+
+            run = await self._start(client, actor_id, payload)
+            try:
+                run = await self._wait(client, run)
+            except BaseException:
+                # Timed out or the caller gave up: stop paying for the run
+                abort = asyncio.ensure_future(self._abort(run["id"]))
+                self._aborts.add(abort)
+                abort.add_done_callback(self._aborts.discard)
+                raise
+            if run["status"] != "SUCCEEDED":
+                raise ApifyRunError(f"Actor run {run['id']} of {actor_id} ended with {run['status']}")
+
+            items = await self._read_dataset(client, run["defaultDatasetId"])
+            self._remember(key, run["defaultDatasetId"])
+            return items
+
+    async def _start(self, client: httpx.AsyncClient, actor_id: str, payload: dict) -> dict:
+        response = await client.post(f"{self.api_url}/acts/{actor_id}/runs", json=payload)
+        response.raise_for_status()
+        run = response.json()["data"]
+        logger.info("apify_run_started", actor_id=actor_id, run_id=run["id"])
+        return run
+
+    async def _wait(self, client: httpx.AsyncClient, run: dict) -> dict:
+        deadline = time.monotonic() + self.timeout
+        delay = 1.0
+        while run["status"] not in TERMINAL_STATUSES:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ApifyRunError(f"Actor run {run['id']} still {run['status']} after {self.timeout:g}s")
+            started = time.monotonic()
+            response = await client.get(
+                f"{self.api_url}/actor-runs/{run['id']}",
+                params={"waitForFinish": int(min(settings.APIFY_POLL_WAIT, max(remaining, 1)))}
+            )
+            response.raise_for_status()
+            run = response.json()["data"]
+            # Long-polling normally paces this loop; back off if Apify answers early
+            if run["status"] not in TERMINAL_STATUSES and time.monotonic() - started < 1.0:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, settings.APIFY_POLL_BACKOFF_MAX)
+        return run
+
+    async def _read_dataset(self, client: httpx.AsyncClient, dataset_id: str) -> List[dict]:
+        # Raw items (no `clean`, like the sync endpoint), so every page holds
+        # exactly `limit` items until the end and offsets stay aligned
+        items: List[dict] = []
+        page_size = settings.APIFY_DATASET_PAGE_SIZE
+        while True:
+            parser = JSONArrayStream()
+            page_items = []
+            async with client.stream(
+                "GET",
+                f"{self.api_url}/datasets/{dataset_id}/items",
+                params={"format": "json", "offset": len(items), "limit": page_size}
+            ) as response:
+                response.raise_for_status()
+                total = response.headers.get("X-Apify-Pagination-Total")
+                async for chunk in response.aiter_text():
+                    page_items.extend(parser.feed(chunk))
+            parser.close()
+            items.extend(page_items)
+            if len(page_items) < page_size or (total is not None and len(items) >= int(total)):
+                return items
+
+    async def _abort(self, run_id: str) -> None:
+        try:
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                await client.post(f"{self.api_url}/actor-runs/{run_id}/abort", params={"token": self.token})
+            logger.info("apify_run_aborted", run_id=run_id)
+        except Exception as e:
+            logger.warning("apify_run_abort_failed", run_id=run_id, error=str(e))
+
+    def _recent_dataset(self, key: str) -> Optional[str]:
+        entry = self._recent_runs.get(key)
+        if entry is None:
+            return None
+        dataset_id, finished_at = entry
+        if time.monotonic() - finished_at > settings.APIFY_RUN_REUSE_TTL:
+            del self._recent_runs[key]
+            return None
+        return dataset_id
+
+    def _remember(self, key: str, dataset_id: str) -> None:
+        if settings.APIFY_RUN_REUSE_TTL <= 0:
+            return
+        self._recent_runs[key] = (dataset_id, time.monotonic())
+        self._recent_runs.move_to_end(key)
+        while len(self._recent_runs) > RECENT_RUNS_MAX:
+            self._recent_runs.popitem(last=False)
+
+
+apify_run_client = ApifyRunClient(settings.APIFY_API_URL, settings.APIFY_API_TOKEN, settings.REQUEST_TIMEOUT)
@@ -0,0 +1,364 @@
+import asyncio
+import json
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Deque, Dict, List, Optional, Set
+
+import structlog
+
+from app.config import settings
+from app.models.records import BatchOutcome, CommentRecord, SentimentRecord
+from app.models.schemas import Language, SentimentCategory
+from app.utils.metrics import REGISTRY
+
+logger = structlog.get_logger()
+
+QUEUE_EVENTS = REGISTRY.counter(
+    "batch_queue_events_total", "Distributed batch jobs by lifecycle event", ["event"]
+)
+
+
+def encode_comments(batch: List[CommentRecord]) -> List[dict]:
+    return [
+        {**asdict(comment), "language": comment.language.value if comment.language else None}
+        for comment in batch
+    ]
+
+
+def decode_comments(items: List[dict]) -> List[CommentRecord]:
+    return [
+        CommentRecord(**{**item, "language": Language(item["language"]) if item.get("language") else None})
+        for item in items
+    ]
+
+
+def encode_outcome(outcome: BatchOutcome) -> str:
+    data = asdict(outcome)
+    for sentiment in data["sentiments"]:
+        sentiment["Sentiment"] = SentimentCategory(sentiment["Sentiment"]).value
+    return json.dumps(data, ensure_ascii=False)
+
+
+def decode_outcome(encoded: str) -> BatchOutcome:
+    data = json.loads(encoded)
+    data["sentiments"] = [
+        SentimentRecord(**{**item, "Sentiment": SentimentCategory(item["Sentiment"])})
+        for item in data["sentiments"]
+    ]
+    return BatchOutcome(**data)
+
+
+@dataclass(slots=True)
+class Delivery:
+    """A reserved job: invisible to other consumers until acked or its visibility lapses."""
+    id: str
+    job: dict
+    deliveries: int  # 1 on the first delivery
+
+
+class BatchQueue(ABC):
+    """Shared queue of model batches with visibility timeouts.
+
+    Publishers `enqueue` a request's batches (plus its post context, stored
+    once) and read outcomes back with `next_result`. Consumers `reserve` a
+    job, `extend` its visibility while working and `ack` it when its
+    outcome is published; a job not acked before its visibility lapses is
+    put back by `requeue_expired` and delivered again. Outcomes can
+    therefore arrive twice, so readers keep the first per batch.
+    """
+
+    @abstractmethod
+    async def enqueue(self, request_id: str, context: str, jobs: List[dict]) -> None:
+        ...
+
+    @abstractmethod
+    async def reserve(self, visibility: float, timeout: float) -> Optional[Delivery]:
+        ...
+
+    @abstractmethod
+    async def extend(self, delivery: Delivery, visibility: float) -> None:
+        ...
+
+    @abstractmethod
+    async def ack(self, delivery: Delivery) -> None:
+        ...
+
+    @abstractmethod
+    async def requeue_expired(self) -> int:
+        ...
+
+    @abstractmethod
+    async def get_context(self, request_id: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def publish_result(self, request_id: str, outcome: str) -> None:
+        ...
+
+    @abstractmethod
+    async def next_result(self, request_id: str, timeout: float) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def cancel(self, request_id: str) -> None:
+        """Drop the request's unstarted jobs; consumers skip the rest."""
+
+    @abstractmethod
+    async def is_cancelled(self, request_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def release(self, request_id: str) -> None:
+        """Forget the request's context and unread outcomes."""
+
+    @staticmethod
+    def new_job_id() -> str:
+        return uuid.uuid4().hex
+
+
+class MemoryBatchQueue(BatchQueue):
+    """In-process queue with the same semantics, for single-process use and tests."""
+
+    def __init__(self):
+        self._pending: Deque[str] = deque()
+        self._jobs: Dict[str, str] = {}
+        self._deliveries: Dict[str, int] = {}
+        self._inflight: Dict[str, float] = {}  # Job id -> visibility deadline
+        self._contexts: Dict[str, str] = {}
+        self._results: Dict[str, asyncio.Queue] = {}
+        self._cancelled: Set[str] = set()
+        self._available = asyncio.Condition()
+
+    async def enqueue(self, request_id: str, context: str, jobs: List[dict]) -> None:
+        self._contexts[request_id] = context
+        self._results[request_id] = asyncio.Queue()
+        async with self._available:
+            for job in jobs:
+                job_id = self.new_job_id()
+                self._jobs[job_id] = json.dumps({**job, "requestId": request_id}, ensure_ascii=False)
+                self._deliveries[job_id] = 0
+                self._pending.appendleft(job_id)
+            self._available.notify(len(jobs))
+        QUEUE_EVENTS.inc(len(jobs), event="enqueued")
+
+    async def reserve(self, visibility: float, timeout: float) -> Optional[Delivery]:
+        deadline = time.monotonic() + timeout
+        async with self._available:
+            while True:
+                if not self._pending:
+                    try:
+                        await asyncio.wait_for(
+                            self._available.wait_for(lambda: self._pending), max(deadline - time.monotonic(), 0)
+                        )
+                    except asyncio.TimeoutError:
+                        return None
+                job_id = self._pending.pop()
+                if job_id in self._jobs:  # Else acked by an earlier delivery after it was requeued
+                    break
+            self._deliveries[job_id] += 1
+            self._inflight[job_id] = time.monotonic() + visibility
+        QUEUE_EVENTS.inc(event="delivered")
+        return Delivery(job_id, json.loads(self._jobs[job_id]), self._deliveries[job_id])
+
+    async def extend(self, delivery: Delivery, visibility: float) -> None:
+        if delivery.id in self._inflight:
+            self._inflight[delivery.id] = time.monotonic() + visibility
+
+    async def ack(self, delivery: Delivery) -> None:
+        self._inflight.pop(delivery.id, None)
+        self._jobs.pop(delivery.id, None)
+        self._deliveries.pop(delivery.id, None)
+        QUEUE_EVENTS.inc(event="acked")
+
+    async def requeue_expired(self) -> int:
+        now = time.monotonic()
+        expired = [job_id for job_id, visible_at in self._inflight.items() if visible_at <= now]
+        if expired:
+            async with self._available:
+                for job_id in expired:
+                    del self._inflight[job_id]
+                    self._pending.append(job_id)  # Redelivered next
+                self._available.notify(len(expired))
+            QUEUE_EVENTS.inc(len(expired), event="redelivered")
+        return len(expired)
+
+    async def get_context(self, request_id: str) -> Optional[str]:
+        return self._contexts.get(request_id)
+
+    async def publish_result(self, request_id: str, outcome: str) -> None:
+        results = self._results.get(request_id)
+        if results is not None:  # Late duplicates of a finished request are dropped
+            results.put_nowait(outcome)
+
+    async def next_result(self, request_id: str, timeout: float) -> Optional[str]:
+        try:
+            return await asyncio.wait_for(self._results[request_id].get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def cancel(self, request_id: str) -> None:
+        self._cancelled.add(request_id)
+        async with self._available:
+            # Ids acked after a requeue linger in _pending without a payload; reserve skips them
+            dropped = [
+                job_id for job_id in self._pending
+                if job_id in self._jobs and json.loads(self._jobs[job_id])["requestId"] == request_id
+            ]
+            for job_id in dropped:
+                self._pending.remove(job_id)
+                self._jobs.pop(job_id, None)
+                self._deliveries.pop(job_id, None)
+
+    async def is_cancelled(self, request_id: str) -> bool:
+        return request_id in self._cancelled
+
+    async def release(self, request_id: str) -> None:
+        self._contexts.pop(request_id, None)
+        self._results.pop(request_id, None)
+        self._cancelled.discard(request_id)
+
+
+# Pops a job id and makes it invisible until now + visibility, atomically
+RESERVE_SCRIPT = """
+local id = redis.call('RPOP', KEYS[1])
+if not id then return nil end
+local job_key = ARGV[3] .. ':job:' .. id
+local deliveries = redis.call('HINCRBY', job_key, 'deliveries', 1)
+redis.call('ZADD', KEYS[2], tonumber(ARGV[1]) + tonumber(ARGV[2]), id)
+return {id, redis.call('HGET', job_key, 'payload') or '', deliveries}
+"""
+
+# Moves jobs whose visibility lapsed back to the consuming end of the queue
+REQUEUE_SCRIPT = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+for _, id in ipairs(ids) do
+  redis.call('ZREM', KEYS[1], id)
+  redis.call('RPUSH', KEYS[2], id)
+end
+return #ids
+"""
+
+
+class RedisBatchQueue(BatchQueue):
+    """Queue on a Redis-compatible server (needs the optional `redis` package).
+
+    Job ids wait in a list, reserved ids sit in a sorted set scored by their
+    visibility deadline, and payloads, contexts and outcome lists are plain
+    keys that expire after BATCH_QUEUE_RESULT_TIMEOUT. Reserving and
+    requeueing run as Lua scripts so a crashed consumer never loses a job.
+    """
+
+    def __init__(self, prefix: str, ttl: int):
+        import redis.asyncio as redis
+
+        self.redis = redis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=settings.REDIS_DB,
+            password=settings.REDIS_PASSWORD,
+            decode_responses=True
+        )
+        self.prefix = prefix
+        self.ttl = ttl
+        self.pending = f"{prefix}:pending"
+        self.inflight = f"{prefix}:inflight"
+        self._reserve = self.redis.register_script(RESERVE_SCRIPT)
+        self._requeue = self.redis.register_script(REQUEUE_SCRIPT)
+
+    def _key(self, kind: str, name: str) -> str:
+        return f"{self.prefix}:{kind}:{name}"
+
+    async def enqueue(self, request_id: str, context: str, jobs: List[dict]) -> None:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(self._key("context", request_id), context, ex=self.ttl)
+            job_ids = []
+            for job in jobs:
+                job_id = self.new_job_id()
+                job_key = self._key("job", job_id)
+                payload = json.dumps({**job, "requestId": request_id}, ensure_ascii=False)
+                pipe.hset(job_key, mapping={"payload": payload, "deliveries": 0})
+                pipe.expire(job_key, self.ttl)
+                job_ids.append(job_id)
+            pipe.lpush(self.pending, *job_ids)
+            await pipe.execute()
+        QUEUE_EVENTS.inc(len(jobs), event="enqueued")
+
+    async def reserve(self, visibility: float, timeout: float) -> Optional[Delivery]:
+        deadline = time.monotonic() + timeout
+        delay = 0.01
+        while True:
+            reserved = await self._reserve(
+                keys=[self.pending, self.inflight], args=[time.time(), visibility, self.prefix]
+            )
+            if reserved:
+                job_id, payload, deliveries = reserved
+                if not payload:  # Payload expired with its request
+                    await self.redis.zrem(self.inflight, job_id)
+                    await self.redis.delete(self._key("job", job_id))
+                    continue
+                QUEUE_EVENTS.inc(event="delivered")
+                return Delivery(job_id, json.loads(payload), int(deliveries))
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, settings.BATCH_QUEUE_POLL_INTERVAL)
+
+    async def extend(self, delivery: Delivery, visibility: float) -> None:
+        await self.redis.zadd(self.inflight, {delivery.id: time.time() + visibility}, xx=True)
+
+    async def ack(self, delivery: Delivery) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(self.inflight, delivery.id)
+            pipe.delete(self._key("job", delivery.id))
+            await pipe.execute()
+        QUEUE_EVENTS.inc(event="acked")
+
+    async def requeue_expired(self) -> int:
+        count = int(await self._requeue(keys=[self.inflight, self.pending], args=[time.time(), 100]))
+        if count:
+            QUEUE_EVENTS.inc(count, event="redelivered")
+        return count
+
+    async def get_context(self, request_id: str) -> Optional[str]:
+        return await self.redis.get(self._key("context", request_id))
+
+    async def publish_result(self, request_id: str, outcome: str) -> None:
+        key = self._key("results", request_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.rpush(key, outcome)
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+
+    async def next_result(self, request_id: str, timeout: float) -> Optional[str]:
+        popped = await self.redis.blpop([self._key("results", request_id)], timeout=max(timeout, 0.01))
+        return popped[1] if popped else None
+
+    async def cancel(self, request_id: str) -> None:
+        # Unstarted jobs stay queued; consumers check this flag and drop them
+        await self.redis.set(self._key("cancelled", request_id), 1, ex=self.ttl)
+
+    async def is_cancelled(self, request_id: str) -> bool:
+        return bool(await self.redis.exists(self._key("cancelled", request_id)))
+
+    async def release(self, request_id: str) -> None:
+        await self.redis.delete(self._key("context", request_id), self._key("results", request_id))
+
+
+_batch_queue: Optional[BatchQueue] = None
+
+
+def get_batch_queue() -> BatchQueue:
+    """The process-wide queue for BATCH_QUEUE_BACKEND ("memory" or "redis")."""
+    global _batch_queue
+    if _batch_queue is None:
+        if settings.BATCH_QUEUE_BACKEND == "redis":
+            _batch_queue = RedisBatchQueue(settings.BATCH_QUEUE_NAME, int(settings.BATCH_QUEUE_RESULT_TIMEOUT) + 60)
+        elif settings.BATCH_QUEUE_BACKEND == "memory":
+            _batch_queue = MemoryBatchQueue()
+        else:
+            raise ValueError(f"Unknown batch queue backend: {settings.BATCH_QUEUE_BACKEND}")
+    return _batch_queue
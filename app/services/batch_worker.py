@@ -0,0 +1,138 @@
+import asyncio
+from collections import OrderedDict
+from typing import List, Optional
+
+import structlog
+
+from app.config import settings
+from app.models.records import BatchOutcome
+from app.models.schemas import Language, PostContext
+from app.services.batch_queue import (
+    QUEUE_EVENTS,
+    BatchQueue,
+    Delivery,
+    decode_comments,
+    encode_outcome
+)
+from app.services.sentiment_service import SentimentService
+
+logger = structlog.get_logger()
+
+CONTEXT_CACHE_SIZE = 64
+
+
+class BatchWorker:
+    """Stateless consumer of the shared batch queue.
+
+    Runs BATCH_WORKER_CONCURRENCY consumers that reserve a batch, keep its
+    visibility extended while the model call runs, publish the outcome and
+    ack it. A worker that dies mid-batch never acks, so the batch is
+    redelivered once its visibility lapses; after BATCH_QUEUE_MAX_DELIVERIES
+    the batch is answered with an error instead.
+    """
+
+    def __init__(self, queue: BatchQueue, concurrency: int):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.visibility = settings.BATCH_QUEUE_VISIBILITY_TIMEOUT
+        self.sentiment_service = SentimentService()
+        self._contexts: "OrderedDict[str, PostContext]" = OrderedDict()
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+
+    async def start(self) -> None:
+        self._stopping = False
+        self._tasks = [asyncio.create_task(self._consume()) for _ in range(self.concurrency)]
+        self._tasks.append(asyncio.create_task(self._requeue_loop()))
+        logger.info("batch_worker_started", concurrency=self.concurrency, backend=settings.BATCH_QUEUE_BACKEND)
+
+    async def stop(self) -> None:
+        # The flag also ends loops whose cancellation a client library swallowed
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("batch_worker_stopped")
+
+    async def _requeue_loop(self) -> None:
+        while not self._stopping:
+            try:
+                requeued = await self.queue.requeue_expired()
+                if requeued:
+                    logger.warning("batch_jobs_redelivered", count=requeued)
+            except Exception as e:
+                logger.error("batch_requeue_failed", error=str(e))
+            await asyncio.sleep(min(self.visibility / 4, 5.0))
+
+    async def _consume(self) -> None:
+        while not self._stopping:
+            try:
+                delivery = await self.queue.reserve(self.visibility, timeout=5.0)
+                if delivery is not None:
+                    await self._handle(delivery)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Unacked jobs come back after their visibility timeout
+                logger.error("batch_worker_error", error=str(e))
+                await asyncio.sleep(1.0)
+
+    async def _handle(self, delivery: Delivery) -> None:
+        job = delivery.job
+        request_id = job["requestId"]
+        if await self.queue.is_cancelled(request_id):
+            await self.queue.ack(delivery)
+            return
+        if delivery.deliveries > settings.BATCH_QUEUE_MAX_DELIVERIES:
+            QUEUE_EVENTS.inc(event="dead")
+            logger.error("batch_job_dead", request_id=request_id, batch_number=job["batchNumber"])
+            await self._publish(request_id, BatchOutcome(
+                batchNumber=job["batchNumber"],
+                error=f"Batch not completed after {delivery.deliveries - 1} deliveries"
+            ))
+            await self.queue.ack(delivery)
+            return
+        post_context = await self._context(request_id)
+        if post_context is None:  # The request finished or expired
+            await self.queue.ack(delivery)
+            return
+
+        heartbeat = asyncio.create_task(self._heartbeat(delivery))
+        try:
+            outcome = await self.sentiment_service.analyze_batch_with_gemini(
+                post_context,
+                decode_comments(job["comments"]),
+                job["batchNumber"],
+                url=job.get("url"),
+                language=Language(job["language"]) if job.get("language") else None,
+                model=job.get("model"),
+                with_confidence=job.get("withConfidence", False)
+            )
+        finally:
+            heartbeat.cancel()
+        await self._publish(request_id, outcome)
+        await self.queue.ack(delivery)
+
+    async def _publish(self, request_id: str, outcome: BatchOutcome) -> None:
+        await self.queue.publish_result(request_id, encode_outcome(outcome))
+
+    async def _heartbeat(self, delivery: Delivery) -> None:
+        while True:
+            await asyncio.sleep(self.visibility / 3)
+            try:
+                await self.queue.extend(delivery, self.visibility)
+            except Exception as e:
+                logger.warning("batch_visibility_extend_failed", job_id=delivery.id, error=str(e))
+
+    async def _context(self, request_id: str) -> Optional[PostContext]:
+        context = self._contexts.get(request_id)
+        if context is None:
+            encoded = await self.queue.get_context(request_id)
+            if encoded is None:
+                return None
+            context = PostContext.model_validate_json(encoded)
+            self._contexts[request_id] = context
+            while len(self._contexts) > CONTEXT_CACHE_SIZE:
+                self._contexts.popitem(last=False)
+        return context
@@ -0,0 +1,144 @@
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+
+from app.models.records import CommentRecord
+from app.models.schemas import Language
+from app.utils.metrics import REGISTRY
+
+LANGUAGES_DETECTED = REGISTRY.counter(
+    "language_detected_total", "Comments per locally detected language", ["language"]
+)
+
+# Letters of each Indic script the detector tells apart
+SCRIPT_PATTERNS = {
+    "devanagari": re.compile(r"[ऀ-ॣ०-ॿ]"),
+    "bengali": re.compile(r"[ঀ-৿]"),
+    "malayalam": re.compile(r"[ഀ-ൿ]"),
+}
+LATIN_LETTERS = re.compile(r"[A-Za-zÀ-ɏ]")
+LATIN_WORDS = re.compile(r"[a-z]+")
+
+# ৰ and ৱ are Assamese-only letters; Bengali text never contains them
+ASSAMESE_LETTERS = re.compile(r"[ৰৱ]")
+
+# Frequent romanized Hindi words that are not also common English words
+HINGLISH_WORDS = {
+    "hai", "hain", "nahi", "nahin", "nhi", "kya", "kyu", "kyun", "kyon", "bhai", "bhi",
+    "bahut", "bohot", "bht", "accha", "acha", "achha", "achcha", "yaar", "yar", "aur",
+    "mein", "mai", "mera", "meri", "mere", "tera", "teri", "tere", "tum", "tumhara",
+    "aap", "apna", "apni", "apne", "kaise", "kaisa", "kuch", "koi", "sab", "sabse",
+    "sirf", "abhi", "kab", "kaha", "kahan", "jab", "tab", "phir", "fir", "ji", "hoga",
+    "hogi", "raha", "rahi", "rahe", "karo", "karna", "kiya", "kiye", "diya", "gaya",
+    "gayi", "dekho", "dekha", "ke", "ka", "ki", "ko", "se", "pe", "ye", "yeh", "wo",
+    "woh", "vo", "ek", "hum", "humara", "hamara", "matlab", "sahi", "galat", "bilkul",
+    "zyada", "jyada", "chahiye", "wala", "wali", "wale", "waala", "hua", "hui", "tha",
+    "thi", "pyaar", "pyar", "dil", "jai", "ho", "hoon", "hu", "nai", "haan", "arre",
+    "bolo", "bola", "bole", "unka", "unki", "iska", "iski", "uska", "uski", "lekin",
+}
+
+# Frequent English function and comment words
+ENGLISH_WORDS = {
+    "the", "and", "is", "are", "was", "were", "this", "that", "you", "it", "to", "of",
+    "in", "for", "with", "not", "but", "what", "so", "very", "good", "great", "love",
+    "like", "i", "my", "me", "he", "she", "they", "we", "be", "have", "has", "just",
+    "no", "yes", "on", "at", "all", "your", "how", "why", "can", "will", "do", "does",
+    "an", "if", "or", "from", "about", "more", "people", "thank", "thanks", "nice",
+    "best", "really", "video", "sir", "please", "who", "when", "there", "their", "his",
+    "her", "one", "would", "should", "could", "never", "always", "amazing", "awesome",
+}
+
+SCRIPT_LANGUAGES = {
+    "devanagari": Language.HINDI,
+    "malayalam": Language.MALAYALAM,
+}
+
+
+class LanguageDetector:
+    """Script- and word-based language ID for single comments, CPU only.
+
+    Indic scripts decide on their own (Bengali script is Assamese when it
+    uses ৰ/ৱ). Latin-script text is English or romanized Hindi (Hinglish)
+    by counting hits in two small word lists. Comments without enough
+    signal (emoji, names, romanized Malayalam/Assamese) stay undetected
+    and take the request's hint or the thread's dominant language.
+    """
+
+    @staticmethod
+    def detect(text: str) -> Optional[Language]:
+        if text.isascii():
+            return LanguageDetector._detect_latin(text)
+        latin = len(LATIN_LETTERS.findall(text))
+        script, count = max(
+            ((name, len(pattern.findall(text))) for name, pattern in SCRIPT_PATTERNS.items()),
+            key=lambda item: item[1]
+        )
+        if count >= 2 and count >= latin:
+            if script == "bengali":
+                return Language.ASSAMESE if ASSAMESE_LETTERS.search(text) else Language.BENGALI
+            return SCRIPT_LANGUAGES[script]
+        return LanguageDetector._detect_latin(text) if latin else None
+
+    @staticmethod
+    def _detect_latin(text: str) -> Optional[Language]:
+        hindi = english = 0
+        for word in LATIN_WORDS.findall(text.lower()):
+            if word in HINGLISH_WORDS:
+                hindi += 1
+            elif word in ENGLISH_WORDS:
+                english += 1
+        if hindi and (hindi * 2 >= english or (hindi >= 3 and hindi >= english)):
+            return Language.HINGLISH
+        if english:
+            return Language.ENGLISH
+        return None
+
+    @staticmethod
+    def annotate(comments: List[CommentRecord], hint: Optional[Language] = None) -> Dict[str, int]:
+        """Set `language` on every comment and return comments per language.
+
+        Undetected comments get `hint`, else the thread's most common
+        detected language, else English.
+        """
+        undetected = []
+        for comment in comments:
+            comment.language = LanguageDetector.detect(comment.comment)
+            if comment.language is None:
+                undetected.append(comment)
+
+        counts = Counter(comment.language for comment in comments if comment.language is not None)
+        fallback = hint or (counts.most_common(1)[0][0] if counts else Language.ENGLISH)
+        for comment in undetected:
+            comment.language = fallback
+        counts[fallback] += len(undetected)
+
+        breakdown = {language.value: count for language, count in counts.most_common() if count}
+        for language, count in breakdown.items():
+            LANGUAGES_DETECTED.inc(count, language=language)
+        return breakdown
+
+    @staticmethod
+    def group_batches(comments: List[CommentRecord], batch_size: int, min_group: int) -> List[List[CommentRecord]]:
+        """Chunk comments into single-language batches (in first-seen language order).
+
+        Languages with fewer than `min_group` comments share one mixed batch
+        chain instead of each costing a nearly empty model call.
+        """
+        groups: Dict[Optional[Language], List[CommentRecord]] = {}
+        for comment in comments:
+            groups.setdefault(comment.language, []).append(comment)
+        small = [language for language, group in groups.items() if len(group) < min_group]
+        if len(small) > 1:
+            mixed = [comment for language in small for comment in groups.pop(language)]
+            groups[None] = groups.get(None, []) + mixed
+        return [
+            group[i:i + batch_size]
+            for group in groups.values()
+            for i in range(0, len(group), batch_size)
+        ]
+
+    @staticmethod
+    def batch_language(batch: List[CommentRecord], default: Optional[Language]) -> Optional[Language]:
+        """The batch's majority language (the default for unannotated batches)."""
+        counts = Counter(comment.language for comment in batch if comment.language is not None)
+        return counts.most_common(1)[0][0] if counts else default
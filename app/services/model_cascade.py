@@ -0,0 +1,210 @@
+import time
+from functools import partial
+from collections import Counter
+from typing import List, Optional, Tuple
+
+import structlog
+
+from app.config import settings
+from app.models.records import BatchOutcome, CommentRecord, SentimentRecord
+from app.models.schemas import Language, ModelTierStats, PostContext, SentimentCategory
+from app.services.language_id import LanguageDetector
+from app.services.rule_classifier import RuleClassifier
+from app.services.sentiment_service import SentimentService
+from app.utils.batch_processor import BatchProcessor, latency_tracker
+from app.utils.comment_cleaner import CommentCleaner
+from app.utils.metrics import REGISTRY
+
+logger = structlog.get_logger()
+
+CASCADE_ESCALATIONS = REGISTRY.counter(
+    "cascade_escalations_total", "Comments re-sent from the cheap to the strong model", ["reason"]
+)
+
+TierRun = Tuple[List[List[CommentRecord]], List[BatchOutcome], ModelTierStats]
+
+
+def estimate_cost(model: Optional[str], input_tokens: int, output_tokens: int) -> float:
+    input_price, output_price = settings.MODEL_PRICING.get(model or "", (0.0, 0.0))
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+class ModelCascade:
+    """Runs comment batches through GEMINI_MODEL, optionally behind a cheap tier.
+
+    With the cascade on, CASCADE_CHEAP_MODEL labels every comment with a
+    confidence. A comment escalates to the strong model when:
+    - its confidence is below the threshold,
+    - it is labelled sarcastic,
+    - the local lexicon leans towards a different category, or
+    - the cheap model failed or dropped it.
+    Everything else keeps the cheap label.
+    """
+
+    def __init__(
+        self,
+        sentiment_service: SentimentService,
+        url: str,
+        language: Optional[Language],
+        enabled: bool,
+        threshold: float,
+        deadline: Optional[float] = None
+    ):
+        self.sentiment_service = sentiment_service
+        self.url = url
+        self.language = language
+        self.enabled = enabled
+        self.threshold = threshold
+        self.deadline = deadline  # time.monotonic() value shared by both tiers
+
+    async def run(
+        self,
+        post_context: PostContext,
+        comments: List[CommentRecord]
+    ) -> Tuple[List[List[CommentRecord]], List[BatchOutcome], List[ModelTierStats]]:
+        """Return the batches, their outcomes (numbered in batch order) and per-tier stats."""
+        if not self.enabled:
+            batches, results, stats = await self._run_tier(
+                "strong", settings.GEMINI_MODEL, post_context, comments, with_confidence=False
+            )
+            return batches, results, [stats]
+
+        cheap_batches, cheap_results, cheap_stats = await self._run_tier(
+            "cheap", settings.CASCADE_CHEAP_MODEL, post_context, comments, with_confidence=True
+        )
+        batches, results, escalated = self._accept_confident(cheap_batches, cheap_results)
+        strong_batches, strong_results, strong_stats = await self._run_tier(
+            "strong", settings.GEMINI_MODEL, post_context, escalated, with_confidence=False
+        )
+
+        offset = len(batches)
+        for result in strong_results:
+            result.batchNumber += offset
+        logger.info("cascade_complete",
+                   url=self.url,
+                   comments=len(comments),
+                   escalated=len(escalated))
+        return batches + strong_batches, results + strong_results, [cheap_stats, strong_stats]
+
+    async def _run_tier(
+        self,
+        tier: str,
+        model: str,
+        post_context: PostContext,
+        comments: List[CommentRecord],
+        with_confidence: bool
+    ) -> TierRun:
+        if settings.LANGUAGE_ID_ENABLED:
+            batches = LanguageDetector.group_batches(comments, settings.BATCH_SIZE, settings.LANGUAGE_GROUP_MIN_SIZE)
+        else:
+            batches = CommentCleaner.chunk_comments(comments, settings.BATCH_SIZE)
+        if not batches:
+            return batches, [], ModelTierStats(tier=tier, model=model)
+
+        start = time.perf_counter()
+        if settings.BATCH_QUEUE_BACKEND != "local":
+            # Batches run on queue workers; prompts are built there
+            results = await BatchProcessor.process_batches_distributed(
+                batches,
+                post_context,
+                {
+                    "url": self.url,
+                    "language": self.language.value if self.language else None,
+                    "model": model,
+                    "withConfidence": with_confidence
+                },
+                deadline=self.deadline
+            )
+        else:
+            analyze_func = partial(
+                self.sentiment_service.analyze_batch_with_gemini,
+                url=self.url,
+                language=self.language,
+                model=model,
+                with_confidence=with_confidence
+            )
+            results = await BatchProcessor.process_batches_parallel(
+                batches,
+                analyze_func,
+                post_context,
+                settings.MAX_CONCURRENT_BATCHES,
+                deadline=self.deadline,
+                latency=latency_tracker(model)
+            )
+        input_tokens = sum(result.inputTokens for result in results)
+        output_tokens = sum(result.outputTokens for result in results)
+        # Failover can answer a tier's calls with another provider's model
+        cost = sum(estimate_cost(result.model, result.inputTokens, result.outputTokens) for result in results)
+        return batches, results, ModelTierStats(
+            tier=tier,
+            model=model,
+            calls=len(results),
+            comments=len(comments),
+            latencySeconds=time.perf_counter() - start,
+            inputTokens=input_tokens,
+            outputTokens=output_tokens,
+            estimatedCostUsd=cost,
+            providers=dict(Counter(result.provider for result in results if result.provider))
+        )
+
+    def _accept_confident(
+        self,
+        batches: List[List[CommentRecord]],
+        results: List[BatchOutcome]
+    ) -> Tuple[List[List[CommentRecord]], List[BatchOutcome], List[CommentRecord]]:
+        """Keep confident cheap labels; collect the comments that need the strong model."""
+        accepted_batches = []
+        accepted_results = []
+        escalated = []
+        by_number = {result.batchNumber: result for result in results}
+
+        for batch_number, batch in enumerate(batches):
+            result = by_number.get(batch_number)
+            if result is None or result.error:
+                CASCADE_ESCALATIONS.inc(len(batch), reason="error")
+                escalated.extend(batch)
+                continue
+
+            kept_comments = []
+            kept_sentiments = []
+            labelled = set()
+            for source, sentiment in BatchProcessor.pair_with_comments(batch, result):
+                if source is None or id(source) in labelled:
+                    continue
+                labelled.add(id(source))
+                reason = self._escalation_reason(source, sentiment)
+                if reason:
+                    CASCADE_ESCALATIONS.inc(reason=reason)
+                    escalated.append(source)
+                else:
+                    kept_comments.append(source)
+                    kept_sentiments.append(sentiment)
+
+            missing = [comment for comment in batch if id(comment) not in labelled]
+            if missing:
+                CASCADE_ESCALATIONS.inc(len(missing), reason="missing")
+                escalated.extend(missing)
+
+            if kept_comments:
+                accepted_batches.append(kept_comments)
+                accepted_results.append(BatchOutcome(
+                    batchNumber=len(accepted_batches) - 1,
+                    sentiments=kept_sentiments,
+                    processingTime=result.processingTime,
+                    model=result.model,
+                    provider=result.provider,
+                    inputTokens=result.inputTokens,
+                    outputTokens=result.outputTokens
+                ))
+
+        return accepted_batches, accepted_results, escalated
+
+    def _escalation_reason(self, comment: CommentRecord, sentiment: SentimentRecord) -> Optional[str]:
+        if sentiment.Confidence is None or sentiment.Confidence < self.threshold:
+            return "low_confidence"
+        if sentiment.Sentiment == SentimentCategory.SARCASTIC_IRONIC:
+            return "sarcasm"
+        lexicon = RuleClassifier.classify(comment.comment)
+        if lexicon is not None and lexicon[0] != sentiment.Sentiment:
+            return "disagreement"
+        return None
@@ -0,0 +1,171 @@
+import base64
+import os
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import httpx
+from google import genai
+from google.genai import errors as genai_errors
+from google.genai import types
+
+from app.config import settings
+
+THROTTLE_STATUS = 429
+
+
+@dataclass(slots=True)
+class ImageInput:
+    data: bytes
+    mimeType: str
+
+
+@dataclass(slots=True)
+class Completion:
+    text: str
+    model: str
+    provider: str
+    inputTokens: int = 0
+    outputTokens: int = 0
+
+
+class ProviderError(Exception):
+    """A provider call failed (HTTP error, throttling, bad payload)."""
+
+    def __init__(self, provider: str, message: str, throttled: bool = False, retry_after: Optional[float] = None):
+        super().__init__(f"{provider}: {message}")
+        self.provider = provider
+        self.throttled = throttled
+        self.retry_after = retry_after
+
+
+class ModelProvider(ABC):
+    """One LLM backend. Callers pass the Gemini model name of the tier they want
+    (GEMINI_MODEL or CASCADE_CHEAP_MODEL); adapters map it to their own models."""
+
+    name = "base"
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    def model_for(self, model: str) -> str:
+        return model
+
+    @abstractmethod
+    async def generate(self, model: str, prompt: str, image: Optional[ImageInput] = None) -> Completion:
+        ...
+
+
+class GeminiProvider(ModelProvider):
+    """Gemini on Vertex AI through the google-genai async client."""
+
+    name = "gemini"
+
+    def __init__(self):
+        self._client: Optional[genai.Client] = None
+
+    @property
+    def client(self) -> genai.Client:
+        if self._client is None:
+            gcp_sa_json = os.environ.get("GCP_SERVICE_ACCOUNT_JSON")
+            if gcp_sa_json:
+                tmp_key_path = "/tmp/gcp_key.json"
+                with open(tmp_key_path, "w", encoding="utf-8") as f:
+                    f.write(gcp_sa_json)
+                os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = tmp_key_path
+
+            self._client = genai.Client(
+                vertexai=True,
+                project=settings.GCP_PROJECT_ID,
+                location=settings.GCP_LOCATION
+            )
+        return self._client
+
+    async def generate(self, model: str, prompt: str, image: Optional[ImageInput] = None) -> Completion:
+        contents = [prompt]
+        if image:
+            contents.append(types.Part.from_bytes(data=image.data, mime_type=image.mimeType))
+        try:
+            response = await self.client.aio.models.generate_content(model=model, contents=contents)
+        except genai_errors.APIError as e:
+            raise ProviderError(self.name, str(e), throttled=e.code == THROTTLE_STATUS) from e
+
+        usage = getattr(response, "usage_metadata", None)
+        return Completion(
+            text=response.text or "",
+            model=model,
+            provider=self.name,
+            inputTokens=(usage.prompt_token_count or 0) if usage else 0,
+            outputTokens=(usage.candidates_token_count or 0) if usage else 0
+        )
+
+
+class OpenAICompatibleProvider(ModelProvider):
+    """Any `/chat/completions` endpoint: OpenAI itself, Azure-style gateways, vLLM,
+    or a local stub (set OPENAI_BASE_URL)."""
+
+    name = "openai"
+
+    def __init__(self, api_key: Optional[str], base_url: str, default_model: Optional[str], model_map: Dict[str, str]):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.default_model = default_model
+        self.model_map = model_map
+
+    @property
+    def available(self) -> bool:
+        return bool(self.api_key and self.default_model)
+
+    def model_for(self, model: str) -> str:
+        return self.model_map.get(model, self.default_model)
+
+    async def generate(self, model: str, prompt: str, image: Optional[ImageInput] = None) -> Completion:
+        content = prompt
+        if image:
+            data_url = f"data:{image.mimeType};base64,{base64.b64encode(image.data).decode('ascii')}"
+            content = [
+                {"type": "text", "text": prompt},
+                {"type": "image_url", "image_url": {"url": data_url}}
+            ]
+        payload = {"model": model, "messages": [{"role": "user", "content": content}]}
+
+        # The router applies MODEL_CALL_TIMEOUT to the whole call
+        async with httpx.AsyncClient(timeout=None) as client:
+            try:
+                response = await client.post(
+                    f"{self.base_url}/chat/completions",
+                    json=payload,
+                    headers={"Authorization": f"Bearer {self.api_key}"}
+                )
+            except httpx.HTTPError as e:
+                raise ProviderError(self.name, f"{type(e).__name__}: {e}") from e
+
+        if response.status_code != 200:
+            raise ProviderError(
+                self.name,
+                f"HTTP {response.status_code}: {response.text[:200]}",
+                throttled=response.status_code == THROTTLE_STATUS,
+                retry_after=_retry_after(response)
+            )
+        try:
+            data = response.json()
+            text = data["choices"][0]["message"]["content"] or ""
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise ProviderError(self.name, f"unexpected response: {response.text[:200]}") from e
+
+        usage = data.get("usage") or {}
+        return Completion(
+            text=text,
+            model=model,
+            provider=self.name,
+            inputTokens=usage.get("prompt_tokens") or 0,
+            outputTokens=usage.get("completion_tokens") or 0
+        )
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    try:
+        return float(response.headers["retry-after"])
+    except (KeyError, ValueError):
+        return None
@@ -0,0 +1,183 @@
+import asyncio
+import time
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+import structlog
+
+from app.config import settings
+from app.services.model_providers import (
+    Completion,
+    GeminiProvider,
+    ImageInput,
+    ModelProvider,
+    OpenAICompatibleProvider,
+    ProviderError
+)
+from app.utils.budgets import model_budget
+from app.utils.circuit_breaker import BreakerState, CircuitBreaker, CircuitOpenError, get_breaker
+from app.utils.metrics import MODEL_LATENCY, REGISTRY
+
+logger = structlog.get_logger()
+
+PROVIDER_CALLS = REGISTRY.counter(
+    "model_provider_calls_total", "Model calls per provider and outcome", ["provider", "outcome"]
+)
+PROVIDER_FAILOVERS = REGISTRY.counter(
+    "model_provider_failovers_total", "Model calls retried on the next provider", ["provider", "reason"]
+)
+PROVIDER_SCORE = REGISTRY.gauge(
+    "model_provider_score_seconds", "Expected seconds per successful call (lower is preferred)", ["provider"]
+)
+
+
+class AllProvidersFailed(Exception):
+    pass
+
+
+class ProviderHealth:
+    """Rolling latency and error rate of one provider.
+
+    Samples expire after MODEL_ROUTER_WINDOW_SECONDS, so a provider that was
+    demoted by errors gets probed again once its bad samples age out.
+    """
+
+    def __init__(self, window: int, window_seconds: float):
+        self.window_seconds = window_seconds
+        self.samples: Deque[Tuple[float, float, bool]] = deque(maxlen=window)  # (at, seconds, ok)
+
+    def record(self, seconds: float, ok: bool) -> None:
+        self.samples.append((time.monotonic(), seconds, ok))
+
+    def score(self, timeout: float) -> Optional[float]:
+        """Mean successful latency divided by success rate; None without recent samples."""
+        cutoff = time.monotonic() - self.window_seconds
+        while self.samples and self.samples[0][0] < cutoff:
+            self.samples.popleft()
+        if not self.samples:
+            return None
+        latencies = [seconds for _, seconds, ok in self.samples if ok]
+        success_rate = len(latencies) / len(self.samples)
+        mean_latency = sum(latencies) / len(latencies) if latencies else timeout
+        return mean_latency / max(success_rate, 0.05)
+
+
+class ModelRouter:
+    """Sends each model call to the healthiest provider and fails over on errors.
+
+    Providers are ranked by expected seconds per successful call over a
+    rolling window. Providers without recent samples rank first (in
+    MODEL_PROVIDERS order) so every provider keeps a current estimate. A
+    call that times out, is throttled or errors is retried on the next
+    provider. Each provider/model pair has a circuit breaker: repeated
+    failures or a 429 open it, and open pairs are skipped (failing fast
+    when no provider is left) until a half-open probe succeeds.
+    """
+
+    def __init__(self, providers: List[ModelProvider], timeout: float):
+        self.providers = providers
+        self.timeout = timeout
+        self.health = {
+            provider.name: ProviderHealth(settings.MODEL_ROUTER_WINDOW, settings.MODEL_ROUTER_WINDOW_SECONDS)
+            for provider in providers
+        }
+
+    @staticmethod
+    def breaker(provider: ModelProvider, model: str) -> CircuitBreaker:
+        return get_breaker(f"model:{provider.name}:{provider.model_for(model)}")
+
+    def ranked(self, model: str) -> List[ModelProvider]:
+        def rank(item: Tuple[int, ModelProvider]):
+            position, provider = item
+            score = self.health[provider.name].score(self.timeout)
+            if score is not None:
+                PROVIDER_SCORE.set(score, provider=provider.name)
+            is_open = self.breaker(provider, model).state == BreakerState.OPEN
+            return (is_open, score is not None, score or 0.0, position)
+
+        return [provider for _, provider in sorted(enumerate(self.providers), key=rank)]
+
+    def ensure_available(self, model: str) -> None:
+        """Raise CircuitOpenError when every provider's breaker for `model` is open."""
+        breakers = [self.breaker(provider, model) for provider in self.providers]
+        if breakers and all(breaker.state == BreakerState.OPEN for breaker in breakers):
+            raise CircuitOpenError(f"model {model}", min(breaker.retry_after for breaker in breakers))
+
+    async def generate(self, model: str, prompt: str, image: Optional[ImageInput] = None) -> Completion:
+        """Run one prompt; `model` names the Gemini model of the wanted tier."""
+        if not self.providers:
+            raise AllProvidersFailed("No model provider is configured")
+        errors = []
+        rejected: List[CircuitOpenError] = []
+        ranked = self.ranked(model)
+        for attempt, provider in enumerate(ranked, start=1):
+            target = provider.model_for(model)
+            health = self.health[provider.name]
+            breaker = self.breaker(provider, model)
+            try:
+                breaker.before_call()
+            except CircuitOpenError as e:
+                rejected.append(e)
+                continue
+            open_for = None
+            async with model_budget:
+                start = time.perf_counter()
+                try:
+                    with MODEL_LATENCY.time(model=target):
+                        completion = await asyncio.wait_for(
+                            provider.generate(target, prompt, image), self.timeout
+                        )
+                except asyncio.CancelledError:
+                    breaker.record_cancelled()
+                    raise
+                except asyncio.TimeoutError:
+                    reason, error = "timeout", f"{provider.name}: no response in {self.timeout:g}s"
+                except ProviderError as e:
+                    reason, error = ("throttled" if e.throttled else "error"), str(e)
+                    if e.throttled:
+                        open_for = e.retry_after or settings.MODEL_ROUTER_THROTTLE_COOLDOWN
+                except Exception as e:
+                    reason, error = "error", f"{provider.name}: {e}"
+                else:
+                    breaker.record_success()
+                    health.record(time.perf_counter() - start, ok=True)
+                    PROVIDER_CALLS.inc(provider=provider.name, outcome="ok")
+                    return completion
+
+            breaker.record_failure(error, open_for=open_for)
+            health.record(time.perf_counter() - start, ok=False)
+            PROVIDER_CALLS.inc(provider=provider.name, outcome=reason)
+            if attempt < len(ranked):
+                PROVIDER_FAILOVERS.inc(provider=provider.name, reason=reason)
+            logger.warning("model_provider_failed",
+                          provider=provider.name,
+                          model=target,
+                          reason=reason,
+                          error=error)
+            errors.append(error)
+        if not errors:
+            raise CircuitOpenError(f"model {model}", min(e.retry_after for e in rejected))
+        raise AllProvidersFailed("; ".join(errors + [str(e) for e in rejected]))
+
+
+def build_providers() -> List[ModelProvider]:
+    available = {
+        "gemini": GeminiProvider(),
+        "openai": OpenAICompatibleProvider(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL,
+            default_model=settings.OPENAI_MODEL,
+            model_map=settings.OPENAI_MODEL_MAP
+        )
+    }
+    providers = []
+    for name in settings.MODEL_PROVIDERS:
+        provider = available.get(name)
+        if provider is None:
+            logger.warning("unknown_model_provider", provider=name)
+        elif provider.available:
+            providers.append(provider)
+    return providers
+
+
+model_router = ModelRouter(build_providers(), settings.MODEL_CALL_TIMEOUT)
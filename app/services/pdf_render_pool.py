@@ -0,0 +1,204 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Optional
+
+import structlog
+
+from app.config import settings
+from app.models.schemas import AnalysisResponse
+from app.services.pdf_service import PDFService
+from app.utils.metrics import REGISTRY
+
+logger = structlog.get_logger()
+
+PDF_QUEUE_DEPTH = REGISTRY.gauge(
+    "pdf_render_queue_depth", "PDF renders submitted and not yet finished"
+)
+PDF_RENDERS = REGISTRY.counter(
+    "pdf_renders_total", "PDF render requests by outcome", ["status"]
+)
+PDF_RENDER_LATENCY = REGISTRY.histogram(
+    "pdf_render_seconds", "PDF render latency including queueing"
+)
+
+
+class PDFPoolBusyError(Exception):
+    """Raised when the render queue is full and the request should be shed."""
+
+
+class PDFRenderTimeoutError(Exception):
+    """Raised when a render does not finish within the per-render timeout."""
+
+
+def _render_payload(payload: dict) -> bytes:
+    """Worker entry point: rebuild the response model and render it."""
+    return PDFService.generate_pdf(AnalysisResponse.model_validate(payload))
+
+
+def _render_combined_payload(payloads: List[dict]) -> bytes:
+    """Worker entry point for a combined multi-post report."""
+    return PDFService.generate_combined_pdf([
+        AnalysisResponse.model_validate(payload) for payload in payloads
+    ])
+
+
+def _warm_up() -> bool:
+    """Import fpdf2 and load fonts in the worker before real traffic arrives."""
+    PDFService.warm_up()
+    return True
+
+
+class PDFRenderPool:
+    """Bounded process pool that keeps fpdf2 rendering off the event loop.
+
+    With `max_workers=0` (e.g. serverless deployments where subprocesses are
+    not an option) renders fall back to a worker thread. A render holds its
+    queue slot until it really finishes, even after its caller timed out, and
+    a pool broken by a dying worker is replaced instead of failing every
+    later render.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, timeout: float):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.worker_count + self.max_queue
+
+    async def start(self) -> None:
+        """Spawn the workers and run a warm-up render on each of them."""
+        if self.max_workers <= 0:
+            return
+        self._executor = self._create_executor()
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            await asyncio.gather(*[
+                loop.run_in_executor(self._executor, _warm_up)
+                for _ in range(self.max_workers)
+            ])
+            logger.info("pdf_pool_ready",
+                       workers=self.max_workers,
+                       warm_up_time=time.perf_counter() - start)
+        except Exception as e:
+            logger.warning("pdf_pool_warm_up_failed", error=str(e))
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            # spawn avoids forking a process that already runs loop/watchdog threads
+            mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def _replace_broken(self, broken: ProcessPoolExecutor) -> None:
+        # Every render on a broken pool fails at once; only the first replaces it
+        if self._executor is broken:
+            logger.error("pdf_pool_broken", workers=self.max_workers)
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._create_executor()
+
+    async def shutdown(self) -> None:
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    @property
+    def worker_count(self) -> int:
+        return max(self.max_workers, 1)
+
+    def has_capacity(self, slots: int = 1) -> bool:
+        return self._in_flight + slots <= self.capacity
+
+    async def render(self, data: AnalysisResponse, shed: bool = True) -> bytes:
+        """Render a report, shedding load when the queue is full.
+
+        Callers that already checked `has_capacity` for a multi-report job pass
+        `shed=False` so a stream in progress is not cut off halfway.
+        """
+        return await self._run(
+            _render_payload, data.model_dump(mode="json"),
+            PDFService.generate_pdf, data,
+            shed=shed
+        )
+
+    async def render_combined(self, results: List[AnalysisResponse]) -> bytes:
+        """Render one combined report for several analyses."""
+        return await self._run(
+            _render_combined_payload, [data.model_dump(mode="json") for data in results],
+            PDFService.generate_combined_pdf, results,
+            timeout=self.timeout * max(len(results), 1)
+        )
+
+    async def _run(
+        self,
+        worker_func: Callable,
+        payload,
+        local_func: Callable,
+        local_arg,
+        shed: bool = True,
+        timeout: Optional[float] = None
+    ) -> bytes:
+        if shed and not self.has_capacity():
+            PDF_RENDERS.inc(status="rejected")
+            raise PDFPoolBusyError("PDF renderer is busy, please retry shortly")
+
+        timeout = timeout or self.timeout
+        start = time.perf_counter()
+        executor = self._executor
+        future: Optional[Future] = None
+        if executor:
+            try:
+                future = executor.submit(worker_func, payload)
+            except BrokenProcessPool:
+                self._replace_broken(executor)
+                executor = self._executor
+                future = executor.submit(worker_func, payload)
+            render = asyncio.wrap_future(future)
+        else:
+            render = asyncio.ensure_future(asyncio.to_thread(local_func, local_arg))
+        self._in_flight += 1
+        PDF_QUEUE_DEPTH.set(self._in_flight)
+        render.add_done_callback(self._release)
+
+        try:
+            # Shielded so a timeout leaves the render (and its slot) running
+            pdf_bytes = await asyncio.wait_for(asyncio.shield(render), timeout=timeout)
+        except asyncio.TimeoutError:
+            # Only a render still queued can be dropped; a started one keeps its
+            # worker, and its slot, until it finishes
+            if future:
+                future.cancel()
+            PDF_RENDERS.inc(status="timeout")
+            raise PDFRenderTimeoutError(f"PDF render exceeded {timeout}s")
+        except BrokenProcessPool:
+            self._replace_broken(executor)
+            PDF_RENDERS.inc(status="error")
+            raise
+        except Exception:
+            PDF_RENDERS.inc(status="error")
+            raise
+        finally:
+            PDF_RENDER_LATENCY.observe(time.perf_counter() - start)
+
+        PDF_RENDERS.inc(status="ok")
+        return pdf_bytes
+
+    def _release(self, render: asyncio.Future) -> None:
+        self._in_flight -= 1
+        PDF_QUEUE_DEPTH.set(self._in_flight)
+        if not render.cancelled():
+            render.exception()  # Retrieved here for renders whose caller gave up
+
+
+pdf_render_pool = PDFRenderPool(
+    max_workers=settings.PDF_WORKERS,
+    max_queue=settings.PDF_MAX_QUEUE,
+    timeout=settings.PDF_RENDER_TIMEOUT
+)
@@ -1,21 +1,162 @@
 import os
+import copy
 import math
+import threading
+from io import BytesIO
+from typing import Callable, List, Optional, Tuple
+from fontTools import ttLib
 from fpdf import FPDF
+from fpdf.fonts import SubsetMap
 from app.models.schemas import AnalysisResponse
 
+# Brand Colors
+# Voltage Yellow: #CCFF00 -> (204, 255, 0)
+# Navy: #000033 -> (0, 0, 51)
+BRAND_YELLOW = (204, 255, 0)
+BRAND_NAVY = (0, 0, 51)
+
+CATEGORY_COLORS = {
+    "supportive_empathetic": "#84cc16",
+    "appreciative_praising": "#22c55e",
+    "informative_neutral": "#94a3b8",
+    "sarcastic_ironic": "#a855f7",
+    "critical_disapproving": "#f59e0b",
+    "angry_hostile": "#ef4444"
+}
+
+FONT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static/fonts")
+DEJAVU_PATH = os.path.join(FONT_DIR, "DejaVuSans.ttf")
+SYSTEM_FONT_CANDIDATES = [
+    "/Library/Fonts/Arial Unicode.ttf",
+    "/System/Library/Fonts/Supplemental/Arial Unicode.ttf",
+    "/System/Library/Fonts/Supplemental/Arial.ttf"
+]
+
+
+class FontCache:
+    """Resolves and parses the report font once per process.
+
+    `add_font` parses the whole TTF (cmap, hmtx, ...) every time it is called.
+    Here the parsed font and its glyph width table are kept as a template and
+    each document gets a shallow copy with its own subset state, so line-width
+    computation and `split_only` wrapping reuse the cached metrics.
+
+    fpdf2 subsets and closes `font.ttfont` in place on output, so every copy
+    gets its own lazily-loaded TTFont over the cached file bytes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.family = "Helvetica"  # Default fallback
+        self.path: Optional[str] = None
+        self.unicode_available = False
+        self._template = None
+        self._font_bytes: Optional[bytes] = None
+
+    def load(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            # 1. Look for User-Provided "DejaVuSans.ttf" (Best for Emoji/Unicode)
+            # 2. Fallback to System Fonts (Good for Chinese/Accents, but NO Emojis usually)
+            candidates = [("DejaVu", DEJAVU_PATH, True)] + [
+                ("ArialUnicode", path, False) for path in SYSTEM_FONT_CANDIDATES
+            ]
+            for family, path, unicode_available in candidates:
+                if not os.path.exists(path):
+                    continue
+                try:
+                    probe = FPDF()
+                    probe.add_font(family, fname=path)
+                except Exception as e:
+                    print(f"Font loading error: {e}")
+                    continue
+                self.family = family
+                self.path = path
+                self.unicode_available = unicode_available
+                self._template = probe.fonts[family.lower()]
+                with open(path, "rb") as f:
+                    self._font_bytes = f.read()
+                break
+            self._loaded = True
+
+    def apply(self, pdf: FPDF) -> str:
+        """Register the cached font on `pdf` and return the family to use."""
+        self.load()
+        if self._template is None:
+            return self.family
+        fontkey = self.family.lower()
+        try:
+            font = copy.copy(self._template)
+            font.i = len(pdf.fonts) + 1
+            font.ttfont = ttLib.TTFont(BytesIO(self._font_bytes), recalcTimestamp=False, lazy=True)
+            font.subset = SubsetMap(font)
+            font.missing_glyphs = []
+            font.biggest_size_pt = 0
+            pdf.fonts[fontkey] = font
+        except Exception:
+            # Older fpdf2 layouts: fall back to a regular (uncached) parse
+            pdf.add_font(self.family, fname=self.path)
+        return self.family
+
+    def split_lines(self, pdf: FPDF, text: str, width: float) -> List[str]:
+        """Greedy word wrap using the cached glyph widths.
+
+        Equivalent to `multi_cell(split_only=True)` for single-paragraph text,
+        without fpdf2 re-measuring the whole line for every added character.
+        """
+        font = pdf.current_font
+        if self._template is None or getattr(font, "fontkey", None) != self.family.lower():
+            return pdf.multi_cell(width, 6, text, split_only=True)
+
+        cw = self._template.cw
+        scale = pdf.font_size_pt * 0.001 / pdf.k
+        max_w = (width - 2 * pdf.c_margin) / scale
+        space_w = cw[32]
+
+        lines: List[str] = []
+        current: List[str] = []
+        current_w = 0
+        for word in text.split():
+            word_w = sum(cw[ord(c)] for c in word)
+            gap = space_w if current else 0
+            if current and current_w + gap + word_w > max_w:
+                lines.append(" ".join(current))
+                current, current_w, gap = [], 0, 0
+            # Hard-break words that do not fit on a line of their own
+            while word_w > max_w:
+                head, head_w = "", 0
+                for c in word:
+                    c_w = cw[ord(c)]
+                    if head and head_w + c_w > max_w:
+                        break
+                    head += c
+                    head_w += c_w
+                lines.append(head)
+                word = word[len(head):]
+                word_w -= head_w
+            if word:
+                current.append(word)
+                current_w += gap + word_w
+        if current:
+            lines.append(" ".join(current))
+        return lines
+
+
+font_cache = FontCache()
+
 class ReportPDF(FPDF):
     def header(self):
-        # Brand Colors
-        # Voltage Yellow: #CCFF00 -> (204, 255, 0)
-        # Navy: #000033 -> (0, 0, 51)
-        
         # Yellow Top Bar
-        self.set_fill_color(204, 255, 0)
+        self.set_fill_color(*BRAND_YELLOW)
         self.rect(0, 0, 210, 20, 'F')
         
         # Logo / Brand Name
         self.set_font("Helvetica", "B", 16)
-        self.set_text_color(0, 0, 51)
+        self.set_text_color(*BRAND_NAVY)
         self.set_xy(10, 5)
         self.cell(0, 10, "EliminateContext", new_x="LMARGIN", new_y="NEXT", align='L')
         self.ln(10)
@@ -47,20 +188,11 @@ class PDFService:
         # Data Prep
         data = []
         total = 0
-        
-        color_map = {
-            "supportive_empathetic": "#84cc16",
-            "appreciative_praising": "#22c55e",
-            "informative_neutral": "#94a3b8",
-            "sarcastic_ironic": "#a855f7",
-            "critical_disapproving": "#f59e0b",
-            "angry_hostile": "#ef4444"
-        }
 
         for key, value in summary.items():
-            if key != "totalComments" and value > 0:
+            if key in CATEGORY_COLORS and value > 0:
                 short_label = key.split('_')[0].title()
-                hex_c = color_map.get(key, "#cccccc")
+                hex_c = CATEGORY_COLORS[key]
                 data.append({"label": short_label, "value": value, "color": hex_c})
                 total += value
         
@@ -172,40 +304,27 @@ class PDFService:
         return "".join(c for c in text if ord(c) <= 0xFFFF)
 
     @staticmethod
-    def generate_pdf(data: AnalysisResponse) -> bytes:
-        """Generate PDF report from analysis data."""
+    def warm_up() -> None:
+        """Render a throwaway page so fonts and fpdf2 internals are loaded."""
+        pdf = ReportPDF()
+        pdf.add_page()
+        pdf.set_font(font_cache.apply(pdf), "", 10)
+        pdf.cell(0, 10, "warm-up")
+        pdf.output()
+
+    @staticmethod
+    def _new_document() -> Tuple[ReportPDF, str, Callable[[str], str]]:
+        """Create a report document with fonts loaded and the text sanitizer to use."""
         pdf = ReportPDF()
         pdf.alias_nb_pages()
         pdf.add_page()
         pdf.set_auto_page_break(auto=True, margin=15)
         
-        # Font Loading Logic
-        # 1. Look for User-Provided "DejaVuSans.ttf" (Best for Emoji/Unicode)
-        base_dir = os.path.dirname(os.path.dirname(__file__)) # app/
-        font_dir = os.path.join(base_dir, "static/fonts")
-        dejavu_path = os.path.join(font_dir, "DejaVuSans.ttf")
-        
-        main_font = "Helvetica" # Default fallback
-        unicode_available = False
-
+        # Font Loading Logic (parsed once per process, see FontCache)
         try:
-            if os.path.exists(dejavu_path):
-                pdf.add_font("DejaVu", fname=dejavu_path)
-                main_font = "DejaVu"
-                unicode_available = True # We trust this font has emojis
-            else:
-                # 2. Fallback to System Fonts (Good for Chinese/Accents, but NO Emojis usually)
-                system_font_candidates = [
-                    "/Library/Fonts/Arial Unicode.ttf",
-                    "/System/Library/Fonts/Supplemental/Arial Unicode.ttf",
-                    "/System/Library/Fonts/Supplemental/Arial.ttf"
-                ]
-                for font_path in system_font_candidates:
-                    if os.path.exists(font_path):
-                        pdf.add_font("ArialUnicode", fname=font_path)
-                        main_font = "ArialUnicode"
-                        # unicode_available = False # Arial Unicode lacks emojis, so we keep this False to trigger sanitization
-                        break
+            main_font = font_cache.apply(pdf)
+            # We trust DejaVu to have emojis; Arial Unicode lacks them, so sanitize
+            unicode_available = font_cache.unicode_available
         except Exception as e:
             print(f"Font loading error: {e}")
             main_font = "Helvetica"
@@ -218,10 +337,76 @@ class PDFService:
             # Otherwise (System font or Helvetica), strip high-plane emojis to prevent warnings/artifacts.
             return txt if unicode_available else PDFService.sanitize_text(txt)
 
+        return pdf, main_font, clean
+
+    @staticmethod
+    def generate_pdf(data: AnalysisResponse) -> bytes:
+        """Generate PDF report from analysis data."""
+        pdf, main_font, clean = PDFService._new_document()
+        PDFService._render_report(pdf, data, main_font, clean)
+        return bytes(pdf.output())
+
+    @staticmethod
+    def generate_combined_pdf(results: List[AnalysisResponse]) -> bytes:
+        """Generate one report with a cross-post comparison page followed by each post."""
+        pdf, main_font, clean = PDFService._new_document()
+        PDFService._render_comparison(pdf, results, main_font, clean)
+        for data in results:
+            pdf.add_page()
+            PDFService._render_report(pdf, data, main_font, clean)
+        return bytes(pdf.output())
+
+    @staticmethod
+    def _render_comparison(pdf: ReportPDF, results: List[AnalysisResponse], main_font: str, clean) -> None:
+        """Render a table comparing sentiment distribution across posts."""
+        pdf.ln(5)
+        pdf.set_font(main_font, "", 24)
+        pdf.set_text_color(*BRAND_NAVY)
+        pdf.cell(0, 10, 'Cross-Post Comparison', new_x="LMARGIN", new_y="NEXT", align='L')
+        pdf.set_font(main_font, "", 10)
+        pdf.set_text_color(100, 100, 100)
+        pdf.cell(0, 8, f"{len(results)} posts analyzed", new_x="LMARGIN", new_y="NEXT", align='L')
+        pdf.ln(5)
+
+        categories = list(CATEGORY_COLORS.keys())
+        widths = [8, 22, 60, 20] + [80 / len(categories)] * len(categories)
+        short_labels = {
+            "supportive_empathetic": "Support",
+            "appreciative_praising": "Praise",
+            "informative_neutral": "Neutral",
+            "sarcastic_ironic": "Sarcasm",
+            "critical_disapproving": "Critical",
+            "angry_hostile": "Angry"
+        }
+        headers = ["#", "Platform", "Post", "Comments"] + [short_labels[key] for key in categories]
+
+        pdf.set_font(main_font, "", 8)
+        pdf.set_text_color(0, 0, 0)
+        pdf.set_fill_color(*BRAND_YELLOW)
+        for width, header in zip(widths, headers):
+            pdf.cell(width, 7, header, border=0, align='C', fill=True)
+        pdf.ln(7)
+
+        for idx, data in enumerate(results, start=1):
+            summary = data.summary.model_dump()
+            total = data.summary.totalComments or 1
+            post = data.postUrl if len(data.postUrl) <= 38 else data.postUrl[:35] + "..."
+            row = [str(idx), data.platform.value.title(), clean(post), str(data.summary.totalComments)] + [
+                f"{summary[key] / total * 100:.0f}%" for key in categories
+            ]
+            row_fill = (248, 248, 250) if idx % 2 else (255, 255, 255)
+            pdf.set_fill_color(*row_fill)
+            for i, (width, value) in enumerate(zip(widths, row)):
+                pdf.cell(width, 7, value, border=0, align='L' if i == 2 else 'C', fill=True)
+            pdf.ln(7)
+
+    @staticmethod
+    def _render_report(pdf: ReportPDF, data: AnalysisResponse, main_font: str, clean) -> None:
+        """Render the report sections for one analysis, starting at the cursor."""
         # 1. Report Title
         pdf.ln(5)
         pdf.set_font(main_font, "", 24) 
-        pdf.set_text_color(0, 0, 51)
+        pdf.set_text_color(*BRAND_NAVY)
         pdf.cell(0, 10, 'Analysis Report', new_x="LMARGIN", new_y="NEXT", align='L')
         
         pdf.set_font(main_font, "", 10)
@@ -287,18 +472,8 @@ class PDFService:
              
         pdf.ln(5)
         pdf.set_font(main_font, "", 14)
-        pdf.set_text_color(0, 0, 51)
+        pdf.set_text_color(*BRAND_NAVY)
         pdf.cell(0, 10, 'Key Insights (Top Comments)', new_x="LMARGIN", new_y="NEXT")
-        
-        # Color mapping (same as above)
-        color_map = {
-            "supportive_empathetic": "#84cc16",
-            "appreciative_praising": "#22c55e",
-            "informative_neutral": "#94a3b8",
-            "sarcastic_ironic": "#a855f7",
-            "critical_disapproving": "#f59e0b",
-            "angry_hostile": "#ef4444"
-        }
 
         for category, comments in data.topComments.items():
             if comments:
@@ -310,7 +485,7 @@ class PDFService:
                 for c in comments[:3]:
                     clean_c = c.replace('\n', ' ').strip()
                     clean_c = f"- {clean(clean_c)}"
-                    lines = pdf.multi_cell(180, 6, clean_c, split_only=True)
+                    lines = font_cache.split_lines(pdf, clean_c, 180)
                     comment_lines.append(lines)
                     total_height += len(lines) * 6
                 
@@ -324,9 +499,7 @@ class PDFService:
 
                 # 3. Get Color & Background
                 map_key = category.lower().replace(" ", "_").replace("/", "_")
-                hex_color = color_map.get(map_key, "#cccccc")
-                rgb = PDFService._hex_to_rgb(hex_color)
-                light_rgb = PDFService._lighten_color(*rgb, factor=0.80) 
+                light_rgb = CARD_BACKGROUNDS.get(map_key, DEFAULT_CARD_BACKGROUND)
 
                 start_x = 10
                 start_y_card = pdf.get_y()
@@ -356,4 +529,10 @@ class PDFService:
                 # Move cursor
                 pdf.set_y(start_y_card + total_height)
 
-        return bytes(pdf.output())
+
+# Card backgrounds are static per category; compute them once at import time
+CARD_BACKGROUNDS = {
+    key: PDFService._lighten_color(*PDFService._hex_to_rgb(hex_color), factor=0.80)
+    for key, hex_color in CATEGORY_COLORS.items()
+}
+DEFAULT_CARD_BACKGROUND = PDFService._lighten_color(*PDFService._hex_to_rgb("#cccccc"), factor=0.80)
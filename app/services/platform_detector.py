@@ -1,6 +1,9 @@
-from urllib.parse import urlparse
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 from app.models.schemas import Platform
 
+# Share/tracking query parameters that never change what is scraped
+TRACKING_PARAMS = {"si", "feature", "pp", "t", "s", "igsh", "igshid", "fbclid", "mibextid", "ref", "ref_src"}
+
 
 class PlatformDetector:
     @staticmethod
@@ -27,6 +30,25 @@ class PlatformDetector:
             
         raise ValueError(f"Unsupported platform: {domain}")
 
+    @staticmethod
+    def canonical_url(url: str) -> str:
+        """Normalize a post URL so share variants of one post scrape (and cache) alike.
+
+        Lowercases scheme and host, expands youtu.be links, drops the fragment
+        and share/tracking parameters, and sorts the rest.
+        """
+        parsed = urlparse(url.strip())
+        host = parsed.netloc.lower()
+        path = parsed.path or "/"
+        query = [
+            (name, value) for name, value in parse_qsl(parsed.query, keep_blank_values=True)
+            if name not in TRACKING_PARAMS and not name.startswith("utm_")
+        ]
+        if host in ("youtu.be", "www.youtu.be") and path.strip("/"):
+            host, query = "www.youtube.com", [("v", path.strip("/"))] + query
+            path = "/watch"
+        return urlunparse((parsed.scheme.lower(), host, path, "", urlencode(sorted(query)), ""))
+
     @staticmethod
     def detect_from_data(data: dict) -> Platform:
         """Detect platform from data structure fields."""
@@ -0,0 +1,207 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import zlib
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+import structlog
+
+from app.config import settings
+from app.models.records import CommentRecord, SentimentRecord
+from app.services.platform_detector import PlatformDetector
+from app.utils.timestamps import normalize_timestamps
+
+logger = structlog.get_logger()
+
+FINGERPRINT_SIZE = 8
+
+
+def comment_fingerprint(comment: CommentRecord) -> bytes:
+    """Stable identity of a comment across runs.
+
+    Uses the platform comment id when the actor provides one; otherwise the
+    text (relative timestamps like "3 hours ago" drift between runs).
+    """
+    key = f"{comment.platform}|{comment.commentId or comment.comment}"
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=FINGERPRINT_SIZE).digest()
+
+
+@dataclass(slots=True)
+class PostState:
+    """What earlier delta runs have already analyzed for one post."""
+    fingerprints: Set[bytes] = field(default_factory=set)
+    counts: Dict[str, int] = field(default_factory=dict)  # Per SentimentCategory value
+    total: int = 0
+    high_water_time: Optional[float] = None  # Epoch seconds of the newest analyzed comment
+    high_water_id: Optional[str] = None
+    runs: int = 0
+    last_run_at: Optional[float] = None
+
+    def split_new(self, comments: List[CommentRecord]) -> Tuple[List[CommentRecord], int, bool]:
+        """Return (unseen comments, number already seen, whether the scrape reached the last run).
+
+        The scrape reached the last run when it returned a comment analyzed
+        before, or one no newer than the high-water mark. Otherwise the thread
+        grew by more than the scrape limit and some new comments were missed.
+        """
+        fresh = [comment for comment in comments if comment_fingerprint(comment) not in self.fingerprints]
+        seen = len(comments) - len(fresh)
+        if not self.runs or seen:
+            return fresh, seen, True
+        if self.high_water_time is None:
+            return fresh, seen, False
+        times = normalize_timestamps([comment.timestamp for comment in comments])
+        return fresh, seen, bool(np.any(times <= self.high_water_time))
+
+    def record(self, labelled: Iterable[Tuple[CommentRecord, SentimentRecord]]) -> Dict[str, int]:
+        """Fold newly labelled comments into the state; return their counts per category."""
+        now = datetime.now(timezone.utc)
+        labelled = list(labelled)
+        new_counts: Dict[str, int] = {}
+        for comment, sentiment in labelled:
+            self.fingerprints.add(comment_fingerprint(comment))
+            category = sentiment.Sentiment.value
+            new_counts[category] = new_counts.get(category, 0) + 1
+
+        times = normalize_timestamps([comment.timestamp for comment, _ in labelled], now)
+        if labelled and not np.all(np.isnan(times)):
+            newest = int(np.nanargmax(times))
+            if self.high_water_time is None or times[newest] > self.high_water_time:
+                self.high_water_time = float(times[newest])
+                self.high_water_id = labelled[newest][0].commentId
+        for category, count in new_counts.items():
+            self.counts[category] = self.counts.get(category, 0) + count
+        self.total += sum(new_counts.values())
+        self.runs += 1
+        self.last_run_at = now.timestamp()
+        return new_counts
+
+
+class PostStateStore:
+    """Per-owner, per-post state for incremental (delta) re-analysis.
+
+    Kept in an in-memory LRU with an optional SQLite tier, like the result
+    store. Runs for the same post are serialized with a per-key lock so two
+    overlapping delta runs cannot both count the same new comments.
+    """
+
+    def __init__(self, max_entries: int, db_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._items: "OrderedDict[str, PostState]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._lock_users: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if db_path:
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS post_state ("
+                    "key TEXT PRIMARY KEY, meta TEXT, fingerprints BLOB)"
+                )
+
+    @staticmethod
+    def key(owner: str, url: str) -> str:
+        # Share variants of a post resolve to one state, as they do in the scrape cache
+        return f"{owner}|{PlatformDetector.canonical_url(url)}"
+
+    @asynccontextmanager
+    async def lock(self, key: str) -> AsyncIterator[None]:
+        """Hold the post's lock; it is dropped once nobody holds or waits for it."""
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        self._lock_users[key] = self._lock_users.get(key, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._lock_users[key] -= 1
+            if not self._lock_users[key]:
+                del self._lock_users[key]
+                del self._locks[key]
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=5.0)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    async def get(self, key: str) -> Optional[PostState]:
+        with self._lock:
+            state = self._items.get(key)
+            if state is not None:
+                self._items.move_to_end(key)
+                return state
+        if self.db_path:
+            state = await asyncio.to_thread(self._read_db, key)
+            if state is not None:
+                self._remember(key, state)
+        return state
+
+    async def save(self, key: str, state: PostState) -> None:
+        self._remember(key, state)
+        if self.db_path:
+            await asyncio.to_thread(self._write_db, key, state)
+
+    def _remember(self, key: str, state: PostState) -> None:
+        with self._lock:
+            self._items[key] = state
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def _write_db(self, key: str, state: PostState) -> None:
+        meta = json.dumps({
+            "counts": state.counts,
+            "total": state.total,
+            "high_water_time": state.high_water_time,
+            "high_water_id": state.high_water_id,
+            "runs": state.runs,
+            "last_run_at": state.last_run_at
+        })
+        fingerprints = zlib.compress(b"".join(sorted(state.fingerprints)))
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO post_state (key, meta, fingerprints) VALUES (?, ?, ?)",
+                    (key, meta, fingerprints)
+                )
+        except sqlite3.Error as e:
+            logger.warning("post_state_write_failed", key=key, error=str(e))
+
+    def _read_db(self, key: str) -> Optional[PostState]:
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT meta, fingerprints FROM post_state WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("post_state_read_failed", key=key, error=str(e))
+            return None
+        if not row:
+            return None
+        meta = json.loads(row[0])
+        blob = zlib.decompress(row[1])
+        return PostState(
+            fingerprints={blob[i:i + FINGERPRINT_SIZE] for i in range(0, len(blob), FINGERPRINT_SIZE)},
+            counts=meta["counts"],
+            total=meta["total"],
+            high_water_time=meta["high_water_time"],
+            high_water_id=meta["high_water_id"],
+            runs=meta["runs"],
+            last_run_at=meta["last_run_at"]
+        )
+
+
+post_state_store = PostStateStore(
+    max_entries=settings.POST_STATE_MAX_ENTRIES,
+    db_path=settings.POST_STATE_DB
+)
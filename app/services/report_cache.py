@@ -0,0 +1,41 @@
+import hashlib
+import json
+from typing import List
+
+from app.config import settings
+from app.models.schemas import AnalysisResponse
+from app.services.pdf_service import font_cache
+from app.utils.cache import DiskCache, LRUCache, TieredCache
+
+# Bump when the report layout changes so stale cached PDFs are not served
+REPORT_LAYOUT_VERSION = "1"
+
+# Fields that end up in the rendered report
+REPORT_FIELDS = {"timestamp", "postUrl", "platform", "postContext", "summary", "topComments"}
+
+
+def report_cache_key(data: AnalysisResponse) -> str:
+    """Stable content hash of everything that affects the rendered PDF."""
+    font_cache.load()
+    payload = {
+        "layout": REPORT_LAYOUT_VERSION,
+        "font": font_cache.family,
+        "report": data.model_dump(mode="json", include=REPORT_FIELDS)
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+
+def combined_cache_key(results: List[AnalysisResponse]) -> str:
+    """Key for a combined multi-post report, derived from the per-post keys."""
+    keys = ",".join(report_cache_key(data) for data in results)
+    return hashlib.sha256(f"combined:{keys}".encode("utf-8")).hexdigest()
+
+
+report_cache = TieredCache(
+    "pdf_report",
+    memory=LRUCache(settings.PDF_CACHE_MAX_BYTES),
+    disk=DiskCache(settings.PDF_CACHE_DIR, settings.PDF_CACHE_DISK_MAX_BYTES, suffix=".pdf")
+    if settings.PDF_CACHE_DIR else None
+)
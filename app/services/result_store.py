@@ -0,0 +1,179 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import structlog
+
+from app.config import settings
+from app.models.schemas import AnalysisResponse
+from app.utils.metrics import CACHE_HITS, CACHE_MISSES
+from app.utils.shared_state import SharedCache, shared_cache
+
+logger = structlog.get_logger()
+
+
+class ResultStore:
+    """Short-lived store of analysis results, addressed by an opaque result id.
+
+    Results stay in an in-memory LRU as validated models, so exports by id skip
+    both the upload and pydantic validation. Per-comment rows (with
+    justification, timestamp and original index) are kept next to the
+    response for row-level exports. An optional SQLite tier keeps both across
+    restarts and LRU eviction (stored as compressed JSON), and a shared tier
+    (SHARED_STATE_BACKEND) makes results exportable from any worker process.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float,
+        db_path: Optional[str] = None,
+        shared: Optional[SharedCache] = None
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self.shared = shared
+        self._items: "OrderedDict[str, Tuple[float, str, AnalysisResponse, List[Dict]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        if db_path:
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS results ("
+                    "id TEXT PRIMARY KEY, owner TEXT, expires_at REAL, payload BLOB, rows BLOB)"
+                )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=5.0)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    async def save(
+        self,
+        response: AnalysisResponse,
+        owner: Optional[str] = None,
+        rows: Optional[List[Dict]] = None
+    ) -> str:
+        """Store a result (and optionally its per-comment rows) and return its id.
+
+        The id is set on `response` before it is persisted, so copies read back
+        from the SQLite or shared tier carry it too.
+        """
+        result_id = uuid.uuid4().hex
+        response.resultId = result_id
+        expires_at = time.time() + self.ttl
+        entry = (expires_at, owner or "", response, rows or [])
+        with self._lock:
+            self._items[result_id] = entry
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+        if self.db_path:
+            await asyncio.to_thread(self._write_db, result_id, entry)
+        if self.shared:
+            await asyncio.to_thread(self._write_shared, result_id, entry)
+        return result_id
+
+    async def get(self, result_id: str, owner: Optional[str] = None) -> Optional[AnalysisResponse]:
+        """Fetch a result if it exists, has not expired and belongs to `owner`."""
+        entry = await self._lookup(result_id, owner)
+        return entry[2] if entry else None
+
+    async def get_rows(self, result_id: str, owner: Optional[str] = None) -> Optional[List[Dict]]:
+        """Fetch the per-comment rows stored with a result."""
+        entry = await self._lookup(result_id, owner)
+        return entry[3] if entry else None
+
+    async def _lookup(self, result_id: str, owner: Optional[str]):
+        now = time.time()
+        with self._lock:
+            entry = self._items.get(result_id)
+            if entry is not None:
+                if entry[0] < now:
+                    del self._items[result_id]
+                    entry = None
+                else:
+                    self._items.move_to_end(result_id)
+        if entry is None:
+            if self.db_path:
+                entry = await asyncio.to_thread(self._read_db, result_id, now)
+            if entry is None and self.shared:
+                entry = await asyncio.to_thread(self._read_shared, result_id, now)
+            if entry is not None:
+                with self._lock:
+                    self._items[result_id] = entry
+                    while len(self._items) > self.max_entries:
+                        self._items.popitem(last=False)
+        if entry is None or (owner is not None and entry[1] != owner):
+            CACHE_MISSES.inc(cache="result_store")
+            return None
+        CACHE_HITS.inc(cache="result_store")
+        return entry
+
+    def _write_db(self, result_id: str, entry: Tuple) -> None:
+        expires_at, owner, response, rows = entry
+        payload = zlib.compress(response.model_dump_json().encode("utf-8"))
+        rows_blob = zlib.compress(json.dumps(rows, ensure_ascii=False).encode("utf-8"))
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO results (id, owner, expires_at, payload, rows) VALUES (?, ?, ?, ?, ?)",
+                    (result_id, owner, expires_at, payload, rows_blob)
+                )
+                conn.execute("DELETE FROM results WHERE expires_at < ?", (time.time(),))
+        except sqlite3.Error as e:
+            logger.warning("result_store_write_failed", result_id=result_id, error=str(e))
+
+    def _read_db(self, result_id: str, now: float) -> Optional[Tuple]:
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT expires_at, owner, payload, rows FROM results WHERE id = ? AND expires_at >= ?",
+                    (result_id, now)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("result_store_read_failed", result_id=result_id, error=str(e))
+            return None
+        if not row:
+            return None
+        response = AnalysisResponse.model_validate_json(zlib.decompress(row[2]))
+        rows = json.loads(zlib.decompress(row[3])) if row[3] else []
+        return row[0], row[1], response, rows
+
+    def _write_shared(self, result_id: str, entry: Tuple) -> None:
+        expires_at, owner, response, rows = entry
+        payload = json.dumps({
+            "expiresAt": expires_at,
+            "owner": owner,
+            "response": response.model_dump(mode="json"),
+            "rows": rows
+        }, ensure_ascii=False)
+        self.shared.set(result_id, zlib.compress(payload.encode("utf-8")), self.ttl)
+
+    def _read_shared(self, result_id: str, now: float) -> Optional[Tuple]:
+        blob = self.shared.get(result_id)
+        if blob is None:
+            return None
+        data = json.loads(zlib.decompress(blob))
+        if data["expiresAt"] < now:
+            return None
+        response = AnalysisResponse.model_validate(data["response"])
+        return data["expiresAt"], data["owner"], response, data["rows"]
+
+
+result_store = ResultStore(
+    max_entries=settings.RESULT_STORE_MAX_ENTRIES,
+    ttl=settings.RESULT_STORE_TTL,
+    db_path=settings.RESULT_STORE_DB,
+    shared=shared_cache("result_store")
+)
@@ -0,0 +1,168 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from app.models.records import CommentRecord, SentimentRecord
+from app.models.schemas import Language, SentimentCategory
+
+S = SentimentCategory
+
+# Single words that settle a short comment on their own, with a confidence.
+# Laughter and irony markers are deliberately low: they are as often sarcastic
+# as they are appreciative, so the model should see them.
+WORD_LEXICON: Dict[str, Tuple[SentimentCategory, float]] = {
+    "nice": (S.APPRECIATIVE_PRAISING, 0.95),
+    "great": (S.APPRECIATIVE_PRAISING, 0.95),
+    "awesome": (S.APPRECIATIVE_PRAISING, 0.95),
+    "amazing": (S.APPRECIATIVE_PRAISING, 0.95),
+    "excellent": (S.APPRECIATIVE_PRAISING, 0.95),
+    "beautiful": (S.APPRECIATIVE_PRAISING, 0.95),
+    "brilliant": (S.APPRECIATIVE_PRAISING, 0.95),
+    "perfect": (S.APPRECIATIVE_PRAISING, 0.9),
+    "love": (S.APPRECIATIVE_PRAISING, 0.9),
+    "loved": (S.APPRECIATIVE_PRAISING, 0.9),
+    "best": (S.APPRECIATIVE_PRAISING, 0.9),
+    "legend": (S.APPRECIATIVE_PRAISING, 0.9),
+    "fantastic": (S.APPRECIATIVE_PRAISING, 0.95),
+    "superb": (S.APPRECIATIVE_PRAISING, 0.95),
+    "wonderful": (S.APPRECIATIVE_PRAISING, 0.95),
+    "cool": (S.APPRECIATIVE_PRAISING, 0.85),
+    "wow": (S.APPRECIATIVE_PRAISING, 0.8),  # Often sarcastic, left to the model at the default threshold
+    "thanks": (S.APPRECIATIVE_PRAISING, 0.95),
+    "thank": (S.APPRECIATIVE_PRAISING, 0.95),
+    "congrats": (S.SUPPORTIVE_EMPATHETIC, 0.9),
+    "congratulations": (S.SUPPORTIVE_EMPATHETIC, 0.9),
+    "rip": (S.SUPPORTIVE_EMPATHETIC, 0.95),
+    "condolences": (S.SUPPORTIVE_EMPATHETIC, 0.95),
+    "prayers": (S.SUPPORTIVE_EMPATHETIC, 0.95),
+    "strong": (S.SUPPORTIVE_EMPATHETIC, 0.9),
+    "trash": (S.CRITICAL_DISAPPROVING, 0.9),
+    "worst": (S.CRITICAL_DISAPPROVING, 0.9),
+    "terrible": (S.CRITICAL_DISAPPROVING, 0.9),
+    "awful": (S.CRITICAL_DISAPPROVING, 0.9),
+    "boring": (S.CRITICAL_DISAPPROVING, 0.9),
+    "cringe": (S.CRITICAL_DISAPPROVING, 0.9),
+    "bad": (S.CRITICAL_DISAPPROVING, 0.85),
+    "disappointing": (S.CRITICAL_DISAPPROVING, 0.9),
+    "fake": (S.CRITICAL_DISAPPROVING, 0.85),
+    "hate": (S.ANGRY_HOSTILE, 0.85),
+    "disgusting": (S.ANGRY_HOSTILE, 0.9),
+    "stupid": (S.ANGRY_HOSTILE, 0.85),
+    "idiot": (S.ANGRY_HOSTILE, 0.9),
+    "lol": (S.SARCASTIC_IRONIC, 0.5),
+    "lmao": (S.SARCASTIC_IRONIC, 0.5),
+    "sure": (S.SARCASTIC_IRONIC, 0.5),
+    "first": (S.INFORMATIVE_NEUTRAL, 0.9),
+    "same": (S.INFORMATIVE_NEUTRAL, 0.8),
+}
+
+# Words that carry no sentiment of their own in a short comment
+FILLER_WORDS = {
+    "so", "very", "really", "too", "such", "this", "that", "it", "is", "was",
+    "a", "an", "the", "you", "u", "ya", "man", "bro", "video", "post", "one",
+    "just", "soo", "sooo", "much", "i", "my", "for", "of", "and", "stay", "in",
+    "peace", "ever", "all", "guys", "content", "work", "job"
+}
+
+EMOJI_LEXICON: Dict[str, Tuple[SentimentCategory, float]] = {
+    "❤": (S.APPRECIATIVE_PRAISING, 0.95),
+    "😍": (S.APPRECIATIVE_PRAISING, 0.95),
+    "🥰": (S.APPRECIATIVE_PRAISING, 0.95),
+    "😘": (S.APPRECIATIVE_PRAISING, 0.9),
+    "👏": (S.APPRECIATIVE_PRAISING, 0.95),
+    "🔥": (S.APPRECIATIVE_PRAISING, 0.9),
+    "💯": (S.APPRECIATIVE_PRAISING, 0.9),
+    "👍": (S.APPRECIATIVE_PRAISING, 0.9),
+    "🙌": (S.APPRECIATIVE_PRAISING, 0.9),
+    "💖": (S.APPRECIATIVE_PRAISING, 0.95),
+    "💕": (S.APPRECIATIVE_PRAISING, 0.95),
+    "😊": (S.APPRECIATIVE_PRAISING, 0.85),
+    "🙏": (S.SUPPORTIVE_EMPATHETIC, 0.9),
+    "😢": (S.SUPPORTIVE_EMPATHETIC, 0.85),
+    "😭": (S.SUPPORTIVE_EMPATHETIC, 0.6),
+    "💔": (S.SUPPORTIVE_EMPATHETIC, 0.9),
+    "🤗": (S.SUPPORTIVE_EMPATHETIC, 0.9),
+    "👎": (S.CRITICAL_DISAPPROVING, 0.95),
+    "🤮": (S.CRITICAL_DISAPPROVING, 0.9),
+    "🥱": (S.CRITICAL_DISAPPROVING, 0.9),
+    "😡": (S.ANGRY_HOSTILE, 0.95),
+    "🤬": (S.ANGRY_HOSTILE, 0.95),
+    "😠": (S.ANGRY_HOSTILE, 0.95),
+    "😂": (S.SARCASTIC_IRONIC, 0.4),
+    "🤣": (S.SARCASTIC_IRONIC, 0.4),
+    "🙄": (S.SARCASTIC_IRONIC, 0.85),
+    "🤡": (S.SARCASTIC_IRONIC, 0.85),
+    "😏": (S.SARCASTIC_IRONIC, 0.85),
+}
+
+# Modifiers that ride along with an emoji: variation selector, ZWJ, skin tones
+EMOJI_MODIFIERS = {"\uFE0F", "\u200D", "\U0001F3FB", "\U0001F3FC", "\U0001F3FD", "\U0001F3FE", "\U0001F3FF"}
+
+TOKEN_PATTERN = re.compile(r"[^\W\d_]+|\S")
+LETTERS = re.compile(r"[^\W\d_]")
+PUNCTUATION = set("!.,?;:'\"-~*()")
+
+# Beyond this many tokens a comment is no longer "trivial"
+MAX_TOKENS = 8
+
+
+class RuleClassifier:
+    """Local lexicon/emoji classifier for comments too simple to need the model.
+
+    Only very short comments made entirely of known words, filler, emoji and
+    punctuation are scored; any unknown word, or votes for different
+    categories, leaves the comment for the model. The lexicon is English, so
+    comments tagged with another language are only scored when they hold no
+    words at all (emoji and punctuation).
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+
+    @staticmethod
+    def classify(text: str) -> Optional[Tuple[SentimentCategory, float]]:
+        """Return (category, confidence) for a trivially classifiable text, else None."""
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        if not tokens or len(tokens) > MAX_TOKENS:
+            return None
+
+        category = None
+        confidence = 0.0
+        for token in tokens:
+            hit = WORD_LEXICON.get(token) or EMOJI_LEXICON.get(token)
+            if hit is None:
+                if token in FILLER_WORDS or token in PUNCTUATION or token in EMOJI_MODIFIERS:
+                    continue
+                return None
+            if category is not None and hit[0] != category:
+                return None
+            category = hit[0]
+            confidence = max(confidence, hit[1])
+
+        if category is None:
+            return None
+        return category, confidence
+
+    def partition(
+        self,
+        comments: List[CommentRecord]
+    ) -> Tuple[List[CommentRecord], List[SentimentRecord], List[CommentRecord]]:
+        """Split comments into (locally classified, their sentiments, rest for the model)."""
+        local_comments = []
+        local_sentiments = []
+        remaining = []
+        for comment in comments:
+            if comment.language not in (None, Language.ENGLISH) and LETTERS.search(comment.comment):
+                remaining.append(comment)
+                continue
+            result = self.classify(comment.comment)
+            if result is None or result[1] < self.threshold:
+                remaining.append(comment)
+                continue
+            category, confidence = result
+            local_comments.append(comment)
+            local_sentiments.append(SentimentRecord(
+                Comment=comment.comment,
+                Sentiment=category,
+                Justification=f"Rule-based: short comment matched the {category.value} lexicon (confidence {confidence:.2f})"
+            ))
+        return local_comments, local_sentiments, remaining
@@ -0,0 +1,136 @@
+import math
+import random
+from collections import defaultdict
+from statistics import NormalDist
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.models.records import CommentRecord, SentimentRecord
+from app.models.schemas import ProportionEstimate, SentimentCategory
+from app.utils.timestamps import normalize_timestamps
+
+TIME_BUCKETS = 4
+# Upper bounds (characters) of the short and medium length strata
+LENGTH_BOUNDS = (40, 160)
+
+Stratum = Tuple[int, int]
+
+
+def _z_score(confidence_level: float) -> float:
+    return NormalDist().inv_cdf(0.5 + confidence_level / 2)
+
+
+def required_sample_size(population: int, margin_of_error: float, confidence_level: float) -> int:
+    """Sample size for estimating a proportion within +/- margin (worst case p=0.5).
+
+    Applies the finite population correction, so small threads need fewer.
+    """
+    z = _z_score(confidence_level)
+    n0 = (z * z * 0.25) / (margin_of_error * margin_of_error)
+    return min(population, math.ceil(n0 / (1 + (n0 - 1) / population))) if population else 0
+
+
+def assign_strata(comments: List[CommentRecord]) -> Dict[int, Stratum]:
+    """Map originalIndex -> (time bucket, length bucket).
+
+    Time buckets are quantiles of comment age; comments without a usable
+    timestamp share their own bucket.
+    """
+    times = normalize_timestamps([comment.timestamp for comment in comments]).tolist()
+    # Newest first, i.e. by increasing age
+    dated = sorted(
+        (-posted_at, comment.originalIndex)
+        for posted_at, comment in zip(times, comments)
+        if not math.isnan(posted_at)
+    )
+
+    time_bucket: Dict[int, int] = {}
+    for rank, (_, index) in enumerate(dated):
+        time_bucket[index] = rank * TIME_BUCKETS // len(dated)
+
+    strata = {}
+    for comment in comments:
+        length = len(comment.comment)
+        length_bucket = sum(length > bound for bound in LENGTH_BOUNDS)
+        strata[comment.originalIndex] = (time_bucket.get(comment.originalIndex, TIME_BUCKETS), length_bucket)
+    return strata
+
+
+def stratified_sample(
+    comments: List[CommentRecord],
+    strata: Dict[int, Stratum],
+    sample_size: int,
+    seed: Optional[int] = None
+) -> List[CommentRecord]:
+    """Proportional-allocation stratified random sample (largest remainder rounding)."""
+    if sample_size >= len(comments):
+        return list(comments)
+
+    groups: Dict[Stratum, List[CommentRecord]] = defaultdict(list)
+    for comment in comments:
+        groups[strata[comment.originalIndex]].append(comment)
+
+    population = len(comments)
+    quotas = {key: sample_size * len(members) / population for key, members in groups.items()}
+    allocation = {key: int(quota) for key, quota in quotas.items()}
+    leftover = sample_size - sum(allocation.values())
+    for key in sorted(quotas, key=lambda k: quotas[k] - allocation[k], reverse=True)[:leftover]:
+        allocation[key] += 1
+
+    rng = random.Random(seed)
+    sample = []
+    for key, members in groups.items():
+        sample.extend(rng.sample(members, min(allocation[key], len(members))))
+    sample.sort(key=lambda comment: comment.originalIndex)
+    return sample
+
+
+def estimate_proportions(
+    labelled: Iterable[Tuple[int, SentimentRecord]],
+    strata: Dict[int, Stratum],
+    confidence_level: float
+) -> Dict[str, ProportionEstimate]:
+    """Stratified estimates of each category's share of the whole thread.
+
+    `labelled` pairs a sampled comment's originalIndex with its label; only
+    the first label of an index counts. Stratum weights come from the full
+    scraped population in `strata`; the variance uses the finite population
+    correction per stratum.
+    """
+    population_sizes: Dict[Stratum, int] = defaultdict(int)
+    for stratum in strata.values():
+        population_sizes[stratum] += 1
+    population = len(strata)
+
+    counts: Dict[Stratum, Dict[SentimentCategory, int]] = defaultdict(lambda: defaultdict(int))
+    sample_sizes: Dict[Stratum, int] = defaultdict(int)
+    seen = set()
+    for index, sentiment in labelled:
+        stratum = strata.get(index)
+        if stratum is None or index in seen:
+            continue
+        seen.add(index)
+        counts[stratum][sentiment.Sentiment] += 1
+        sample_sizes[stratum] += 1
+
+    # Strata that ended up without labels are left out and the rest reweighted
+    covered = sum(population_sizes[stratum] for stratum in sample_sizes)
+    z = _z_score(confidence_level)
+    estimates = {}
+    for category in SentimentCategory:
+        proportion = 0.0
+        variance = 0.0
+        for stratum, n_h in sample_sizes.items():
+            weight = population_sizes[stratum] / covered
+            p_h = counts[stratum][category] / n_h
+            proportion += weight * p_h
+            if n_h > 1:
+                fpc = max(0.0, 1 - n_h / population_sizes[stratum])
+                variance += weight * weight * fpc * p_h * (1 - p_h) / (n_h - 1)
+        half_width = z * math.sqrt(variance)
+        estimates[category.value] = ProportionEstimate(
+            proportion=round(proportion, 4),
+            lower=round(max(0.0, proportion - half_width), 4),
+            upper=round(min(1.0, proportion + half_width), 4),
+            estimatedCount=round(proportion * population)
+        )
+    return estimates
@@ -0,0 +1,113 @@
+import asyncio
+import hashlib
+import json
+import struct
+import time
+import zlib
+from typing import Any, Optional
+
+import structlog
+
+from app.config import settings
+from app.models.schemas import Platform
+from app.utils.cache import DiskCache, LRUCache
+from app.utils.metrics import CACHE_BYTES_SAVED, CACHE_HITS, CACHE_MISSES
+from app.utils.shared_state import SharedCache, shared_cache
+
+logger = structlog.get_logger()
+
+# Bump when the stored layout changes so old entries are ignored
+SCRAPE_CACHE_VERSION = "1"
+
+# Expiry (unix seconds) in front of the compressed JSON
+EXPIRY = struct.Struct(">d")
+
+
+class ScrapeCache:
+    """Scraped Apify responses, reused until the platform's TTL runs out.
+
+    Entries are keyed by actor id and a hash of the actor input (which
+    carries the canonical post URL), stored as zlib-compressed JSON behind
+    their expiry time. A size-bounded memory LRU sits in front of an
+    optional disk tier (SCRAPE_CACHE_DIR) that survives restarts, and a
+    shared tier (SHARED_STATE_BACKEND) that other worker processes fill too.
+    """
+
+    def __init__(
+        self,
+        memory: LRUCache,
+        disk: Optional[DiskCache] = None,
+        shared: Optional[SharedCache] = None
+    ):
+        self.name = "apify_scrape"
+        self.memory = memory
+        self.disk = disk
+        self.shared = shared
+
+    @staticmethod
+    def key(actor_id: str, payload: dict) -> str:
+        encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        digest = hashlib.sha256(f"{SCRAPE_CACHE_VERSION}:{actor_id}:{encoded}".encode("utf-8")).hexdigest()
+        return f"{actor_id.replace('~', '_')}-{digest}"
+
+    @staticmethod
+    def ttl_for(platform: Platform) -> int:
+        if not settings.SCRAPE_CACHE_ENABLED:
+            return 0
+        return settings.SCRAPE_CACHE_TTLS.get(platform.value, 0)
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Cached value for `key`, or None when missing or expired."""
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: Any, ttl: int) -> None:
+        if ttl > 0:
+            await asyncio.to_thread(self._set, key, value, ttl)
+
+    def _get(self, key: str) -> Optional[Any]:
+        blob = self.memory.get(key)
+        if blob is None and self.disk:
+            blob = self.disk.get(key)
+            if blob is not None:
+                self.memory.set(key, blob)
+        if blob is None and self.shared:
+            blob = self.shared.get(key)
+            if blob is not None:
+                self.memory.set(key, blob)
+        if blob is not None:
+            try:
+                (expires_at,) = EXPIRY.unpack_from(blob)
+                if expires_at > time.time():
+                    value = json.loads(zlib.decompress(blob[EXPIRY.size:]))
+                    CACHE_HITS.inc(cache=self.name)
+                    CACHE_BYTES_SAVED.inc(len(blob), cache=self.name)
+                    return value
+            except (struct.error, zlib.error, ValueError) as e:
+                logger.warning("scrape_cache_entry_unreadable", key=key, error=str(e))
+            self._delete(key)
+        CACHE_MISSES.inc(cache=self.name)
+        return None
+
+    def _set(self, key: str, value: Any, ttl: int) -> None:
+        encoded = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        blob = EXPIRY.pack(time.time() + ttl) + zlib.compress(encoded, 6)
+        self.memory.set(key, blob)
+        if self.disk:
+            self.disk.set(key, blob)
+        if self.shared:
+            self.shared.set(key, blob, ttl)
+
+    def _delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.disk:
+            self.disk.delete(key)
+        if self.shared:
+            self.shared.delete(key)
+
+
+scrape_cache = ScrapeCache(
+    memory=LRUCache(settings.SCRAPE_CACHE_MAX_BYTES),
+    disk=DiskCache(settings.SCRAPE_CACHE_DIR, settings.SCRAPE_CACHE_DISK_MAX_BYTES, suffix=".json.z")
+    if settings.SCRAPE_CACHE_DIR else None,
+    shared=shared_cache("apify_scrape")
+)
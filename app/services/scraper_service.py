@@ -1,19 +1,66 @@
+import asyncio
 import platform
 import httpx
 import structlog
 import re
 from typing import List, Tuple, Dict, Optional
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import AsyncRetrying, RetryCallState, stop_after_attempt, wait_exponential
 
 from app.config import settings
-from app.models.schemas import Platform, PostContext, CleanedComment
+from app.models.schemas import Platform, PostContext
+from app.models.records import CommentRecord
+from app.services.apify_runs import apify_run_client
+from app.services.platform_detector import PlatformDetector
+from app.services.scrape_cache import scrape_cache
 from app.utils.comment_cleaner import CommentCleaner
+from app.utils.budgets import apify_budget
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError, get_breaker
+from app.utils.metrics import APIFY_LATENCY, APIFY_REQUESTS, RETRIES
 
 logger = structlog.get_logger()
 
+TWEET_ID_PATTERN = re.compile(r'/status(?:es)?/(\d+)')
+
+# Platforms whose comment actors can sort newest first; the others return
+# their default order, so delta re-runs may spend the limit on seen comments
+NEWEST_FIRST_PLATFORMS = {Platform.YOUTUBE, Platform.FACEBOOK}
+
+# Platforms that fetch a fresh view count even when a cached post context is
+# reused; elsewhere the reused context keeps the view count it was scraped with
+LIVE_VIEW_PLATFORMS = {Platform.YOUTUBE, Platform.TWITTER}
+
+
+def _is_client_error(error: BaseException) -> bool:
+    """4xx other than 429: the request was wrong, the actor itself is fine."""
+    return (
+        isinstance(error, httpx.HTTPStatusError)
+        and 400 <= error.response.status_code < 500
+        and error.response.status_code != 429
+    )
+
+
+def _describe(error: BaseException) -> str:
+    """Error summary for breaker state; HTTP errors carry the token in their URL."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"HTTP {error.response.status_code}"
+    return f"{type(error).__name__}: {error}"
+
+
+def _throttled_for(error: BaseException) -> Optional[float]:
+    """Retry-After of a 429, if any."""
+    if isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 429:
+        try:
+            return float(error.response.headers["retry-after"])
+        except (KeyError, ValueError):
+            return None
+    return None
+
+
 class ScraperService:
-    def __init__(self):
-        self.base_url = "https://api.apify.com/v2/acts"
+    def __init__(self, force_refresh: bool = False):
+        # Skip cached scrapes (fresh results still refresh the cache)
+        self.force_refresh = force_refresh
+        self.base_url = f"{settings.APIFY_API_URL.rstrip('/')}/acts"
         self.token = settings.APIFY_API_TOKEN
         self.timeout = settings.REQUEST_TIMEOUT
 
@@ -34,11 +81,73 @@ class ScraperService:
         except (ValueError, TypeError):
             return str(count)
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=4, max=10))
-    async def _make_apify_request(self, actor_id: str, payload: dict) -> List[dict]:
-        """Make request to Apify API with retries."""
+    async def _make_apify_request(self, actor_id: str, payload: dict, platform: Platform) -> List[dict]:
+        """Make request to Apify API with retries, reusing a cached response.
+
+        Responses are cached for the platform's SCRAPE_CACHE_TTLS entry. Fails fast with CircuitOpenError while the actor's breaker is open.
+        Failures are retried (up to APIFY_MAX_ATTEMPTS) only while the
+        breaker stays closed and the actor's retry budget has tokens.
+        """
+        ttl = scrape_cache.ttl_for(platform)
+        key = scrape_cache.key(actor_id, payload)
+        if ttl and not self.force_refresh:
+            items = await scrape_cache.get(key)
+            if items is not None:
+                logger.info("apify_scrape_cached", actor_id=actor_id, items=len(items))
+                return items
+
+        breaker = get_breaker(f"apify:{actor_id}")
+        breaker.retry_budget.deposit()
+
+        def should_retry(state: RetryCallState) -> bool:
+            error = state.outcome.exception()
+            return (
+                isinstance(error, Exception)  # Never retry a cancelled request
+                and not isinstance(error, CircuitOpenError)
+                and not _is_client_error(error)
+                and state.attempt_number < settings.APIFY_MAX_ATTEMPTS
+                and breaker.allows_retry()
+            )
+
+        retrying = AsyncRetrying(
+            retry=should_retry,
+            stop=stop_after_attempt(settings.APIFY_MAX_ATTEMPTS),
+            wait=wait_exponential(min=4, max=10),
+            before_sleep=lambda _: RETRIES.inc(target="apify"),
+            reraise=True
+        )
+        async for attempt in retrying:
+            with attempt:
+                items = await self._call_actor(actor_id, payload, breaker)
+        await scrape_cache.set(key, items, ttl)
+        return items
+
+    async def _call_actor(self, actor_id: str, payload: dict, breaker: CircuitBreaker) -> List[dict]:
+        breaker.before_call()
+        try:
+            async with apify_budget:
+                with APIFY_LATENCY.time(actor_id=actor_id):
+                    if settings.APIFY_RUN_MODE == "async":
+                        items = await apify_run_client.run(actor_id, payload, reuse=not self.force_refresh)
+                    else:
+                        items = await self._run_sync(actor_id, payload)
+        except asyncio.CancelledError:
+            breaker.record_cancelled()
+            raise
+        except Exception as e:
+            APIFY_REQUESTS.inc(actor_id=actor_id, status="error")
+            if _is_client_error(e):
+                breaker.record_success()
+            else:
+                breaker.record_failure(_describe(e), open_for=_throttled_for(e))
+            raise
+        APIFY_REQUESTS.inc(actor_id=actor_id, status="ok")
+        breaker.record_success()
+        return items
+
+    async def _run_sync(self, actor_id: str, payload: dict) -> List[dict]:
+        """One run-sync-get-dataset-items call: open for the whole run, dataset buffered whole."""
         url = f"{self.base_url}/{actor_id}/run-sync-get-dataset-items"
-        
         async with httpx.AsyncClient(timeout=self.timeout) as client:
             response = await client.post(
                 url,
@@ -48,29 +157,71 @@ class ScraperService:
             response.raise_for_status()
             return response.json()
 
-    async def scrape_youtube(self, url: str) -> Tuple[PostContext, List[CleanedComment]]:
+    async def scrape_youtube(
+        self,
+        url: str,
+        max_comments: Optional[int] = None,
+        newest_first: bool = False,
+        post_context: Optional[PostContext] = None
+    ) -> Tuple[PostContext, List[CommentRecord]]:
         """Scrape YouTube video info and comments."""
-        # Get video info and transcripts
-        transcript_data = await self._make_apify_request(
-            "karamelo~youtube-transcripts",
-            {
-                "urls": [url],
-                "descriptionBoolean": True,
-                "channelNameBoolean": True
-            }
-        )
+        # Get video info and transcripts (unless a cached context is reused)
+        transcript_data = None
+        if post_context is None:
+            transcript_data = await self._make_apify_request(
+                "karamelo~youtube-transcripts",
+                {
+                    "urls": [url],
+                    "descriptionBoolean": True,
+                    "channelNameBoolean": True
+                },
+                Platform.YOUTUBE
+            )
 
         # Get comments
         comment_data = await self._make_apify_request(
             "streamers~youtube-comments-scraper",
             {
-                "commentsSortBy": "0",
-                "maxComments": settings.YOUTUBE_MAX_COMMENTS,
+                "commentsSortBy": "1" if newest_first else "0",
+                "maxComments": max_comments or settings.YOUTUBE_MAX_COMMENTS,
                 "startUrls": [{"url": url, "method": "GET"}]
-            }
+            },
+            Platform.YOUTUBE
+        )
+
+        view_count = await self._youtube_view_count(url)
+
+        # Create post context (a reused one only gets the fresh view count)
+        if post_context is not None:
+            post_context = post_context.model_copy(
+                update={"totalViews": self._format_count(view_count) or post_context.totalViews}
+            )
+        else:
+            video_info = transcript_data[0] if transcript_data else {}
+            post_context = PostContext(
+                platform=Platform.YOUTUBE,
+                title=video_info.get("title"),
+                description=video_info.get("description"),
+                captions=video_info.get("transcript", ""),
+                totalViews=self._format_count(view_count)
+            )
+
+        # Process comments
+        cleaned_comments = await CommentCleaner.process_comments_async(
+            comment_data, Platform.YOUTUBE
         )
 
-        # Try to extract view count directly from page source
+        return post_context, cleaned_comments
+
+    async def _youtube_view_count(self, url: str) -> Optional[str]:
+        """Extract the view count directly from the page source (cached like actor responses)."""
+        ttl = scrape_cache.ttl_for(Platform.YOUTUBE)
+        key = scrape_cache.key("youtube-page-views", {"url": url})
+        if ttl and not self.force_refresh:
+            cached = await scrape_cache.get(key)
+            if cached is not None:
+                return cached["viewCount"]
+
         view_count = None
         try:
             async with httpx.AsyncClient(timeout=self.timeout) as client:
@@ -84,76 +235,90 @@ class ScraperService:
                         view_count = match2.group(1)
         except Exception as e:
             logger.warning("youtube_view_count_extraction_failed", error=str(e))
-            
-        # Create post context
-        video_info = transcript_data[0] if transcript_data else {}
-        post_context = PostContext(
-            platform=Platform.YOUTUBE,
-            title=video_info.get("title"),
-            description=video_info.get("description"),
-            captions=video_info.get("transcript", ""),
-            totalViews=self._format_count(view_count)
-        )
-
-        # Process comments
-        cleaned_comments = CommentCleaner.process_comments(
-            comment_data, Platform.YOUTUBE
-        )
-
-        return post_context, cleaned_comments
+            return None
+        await scrape_cache.set(key, {"viewCount": view_count}, ttl)
+        return view_count
 
-    async def scrape_facebook(self, url: str) -> Tuple[PostContext, List[CleanedComment]]:
+    async def scrape_facebook(
+        self,
+        url: str,
+        max_comments: Optional[int] = None,
+        newest_first: bool = False,
+        post_context: Optional[PostContext] = None
+    ) -> Tuple[PostContext, List[CommentRecord]]:
         """Scrape Facebook post info and comments."""
-        # Get post info
-        post_data = await self._make_apify_request(
-            "apify~facebook-posts-scraper",
-            {
-                "captionText": True,
-                "resultsLimit": 20,
-                "startUrls": [{"url": url}]
-            }
-        )
+        # Get post info (unless a cached context is reused)
+        post_data = None
+        if post_context is None:
+            post_data = await self._make_apify_request(
+                "apify~facebook-posts-scraper",
+                {
+                    "captionText": True,
+                    "resultsLimit": 20,
+                    "startUrls": [{"url": url}]
+                },
+                Platform.FACEBOOK
+            )
 
         # Get comments
+        comment_input = {
+            "includeNestedComments": False,
+            "resultsLimit": max_comments or settings.FACEBOOK_MAX_COMMENTS,
+            "startUrls": [{"url": url}]
+        }
+        if newest_first:
+            comment_input["viewOption"] = "RECENT_ACTIVITY"
         comment_data = await self._make_apify_request(
             "apify~facebook-comments-scraper",
-            {
-                "includeNestedComments": False,
-                "resultsLimit": settings.FACEBOOK_MAX_COMMENTS,
-                "startUrls": [{"url": url}]
-            }
+            comment_input,
+            Platform.FACEBOOK
         )
 
         # Create post context
-        post_info = post_data[0] if post_data else {}
-        post_context = PostContext(
-            platform=Platform.FACEBOOK,
-            text=post_info.get("text"),
-            media=post_info.get("media", []),
-            totalViews=self._format_count(post_info.get("playCount") or post_info.get("likesCount"))
-        )
+        if post_context is None:
+            post_info = post_data[0] if post_data else {}
+            post_context = PostContext(
+                platform=Platform.FACEBOOK,
+                text=post_info.get("text"),
+                media=post_info.get("media", []),
+                totalViews=self._format_count(post_info.get("playCount") or post_info.get("likesCount"))
+            )
 
         # Process comments
-        cleaned_comments = CommentCleaner.process_comments(
+        cleaned_comments = await CommentCleaner.process_comments_async(
             comment_data, Platform.FACEBOOK
         )
 
         return post_context, cleaned_comments
 
-    async def scrape_twitter(self, url: str) -> Tuple[PostContext, List[CleanedComment]]:
+    async def scrape_twitter(
+        self,
+        url: str,
+        max_comments: Optional[int] = None,
+        newest_first: bool = False,
+        post_context: Optional[PostContext] = None
+    ) -> Tuple[PostContext, List[CommentRecord]]:
         """Scrape Twitter/X post info and replies."""
-        # Get tweet info
-        post_data = await self._make_apify_request(
-            "apidojo~twitter-scraper-lite",
-            {
-                "maxItems": 1,
-                "startUrls": [url]
-            }
-        )
+        # With a cached context the tweet id comes from the URL; the reply
+        # actor returns the main tweet (and its view count) anyway
+        match = TWEET_ID_PATTERN.search(url) if post_context is not None else None
+        if match:
+            post = {"fullText": post_context.text, "media": post_context.media or []}
+            post_id = match.group(1)
+        else:
+            # Get tweet info
+            post_data = await self._make_apify_request(
+                "apidojo~twitter-scraper-lite",
+                {
+                    "maxItems": 1,
+                    "startUrls": [url]
+                },
+                Platform.TWITTER
+            )
 
-        # Get post ID and replies
-        post = post_data[0] if post_data and isinstance(post_data[0], dict) else {}
-        post_id = post.get("id")
+            # Get post ID and replies
+            post = post_data[0] if post_data and isinstance(post_data[0], dict) else {}
+            post_id = post.get("id")
 
         # If we can't get an ID, we can't get replies, so we exit.
         if not post_id:
@@ -161,8 +326,9 @@ class ScraperService:
         reply_data = await self._make_apify_request(
             "kaitoeasyapi~twitter-reply",
             {   "conversation_ids": [post_id], 
-                "max_items_per_conversation": settings.TWITTER_MAX_ITEMS
-            }
+                "max_items_per_conversation": max_comments or settings.TWITTER_MAX_ITEMS
+            },
+            Platform.TWITTER
             )
         main_tweet_details = reply_data[0] if reply_data and isinstance(reply_data[0], dict) else post
         comments_only = reply_data[1:] if len(reply_data) > 1 else []
@@ -176,27 +342,36 @@ class ScraperService:
         )
 
         # Process ONLY the comments
-        cleaned_comments = CommentCleaner.process_comments(
+        cleaned_comments = await CommentCleaner.process_comments_async(
             comments_only, Platform.TWITTER
         )
 
         return post_context, cleaned_comments
 
-    async def scrape_instagram(self, url: str) -> Tuple[PostContext, List[CleanedComment]]:
+    async def scrape_instagram(
+        self,
+        url: str,
+        max_comments: Optional[int] = None,
+        newest_first: bool = False,
+        post_context: Optional[PostContext] = None
+    ) -> Tuple[PostContext, List[CommentRecord]]:
         """Scrape Instagram Reel/Post info and comments."""
-        # Get post info using the reel scraper
+        # Get post info using the reel scraper (unless a cached context is reused)
         # Using 'apify/instagram-reel-scraper' as requested
-        post_data = await self._make_apify_request(
-            "apify~instagram-reel-scraper",
-            {
-                "username": [url],
-                "includeTranscript": True,
-                "resultsLimit": 1,
-                "includeDownloadedVideo": False,
-                "includeSharesCount": False,
-                "skipPinnedPosts": False
-            }
-        )
+        post_data = None
+        if post_context is None:
+            post_data = await self._make_apify_request(
+                "apify~instagram-reel-scraper",
+                {
+                    "username": [url],
+                    "includeTranscript": True,
+                    "resultsLimit": 1,
+                    "includeDownloadedVideo": False,
+                    "includeSharesCount": False,
+                    "skipPinnedPosts": False
+                },
+                Platform.INSTAGRAM
+            )
 
         # Get comments
         # We'll continue using the general instagram-scraper for comments as it's reliable for that
@@ -216,9 +391,14 @@ class ScraperService:
             {
                 "directUrls": [url],
                 "resultsType": "comments",
-                "resultsLimit": settings.INSTAGRAM_MAX_COMMENTS
-            }
+                "resultsLimit": max_comments or settings.INSTAGRAM_MAX_COMMENTS
+            },
+            Platform.INSTAGRAM
         )
+        if post_context is not None:
+            return post_context, await CommentCleaner.process_comments_async(
+                comment_data, Platform.INSTAGRAM
+            )
 
         # Create post context
         post_info = post_data[0] if post_data else {}
@@ -249,15 +429,30 @@ class ScraperService:
         )
 
         # Process comments
-        cleaned_comments = CommentCleaner.process_comments(
+        cleaned_comments = await CommentCleaner.process_comments_async(
             comment_data, Platform.INSTAGRAM
         )
 
         return post_context, cleaned_comments
 
-    async def scrape_platform(self, url: str, platform: Platform) -> Tuple[PostContext, List[CleanedComment]]:
-        """Route scraping to appropriate platform handler."""
-        logger.info("starting_scrape", platform=platform.value, url=url)
+    async def scrape_platform(
+        self,
+        url: str,
+        platform: Platform,
+        max_comments: Optional[int] = None,
+        newest_first: bool = False,
+        post_context: Optional[PostContext] = None
+    ) -> Tuple[PostContext, List[CommentRecord]]:
+        """Route scraping to appropriate platform handler.
+
+        `max_comments` overrides the platform limit; `newest_first` asks actors
+        that support it for the most recent comments (used by delta runs).
+        A cached `post_context` skips the post/transcript actor run where the
+        comments can be scraped without it. Actors get the canonical URL, so
+        share variants of a post hit the same scrape cache entries.
+        """
+        url = PlatformDetector.canonical_url(url)
+        logger.info("starting_scrape", platform=platform.value, url=url, force_refresh=self.force_refresh)
 
         scraper_map = {
             Platform.YOUTUBE: self.scrape_youtube,
@@ -269,8 +464,10 @@ class ScraperService:
         scraper = scraper_map.get(platform)
         if not scraper:
             raise ValueError(f"Unsupported platform: {platform}")
+        if newest_first and platform not in NEWEST_FIRST_PLATFORMS:
+            logger.warning("newest_first_unsupported", platform=platform.value, url=url)
 
-        post_context, comments = await scraper(url)
+        post_context, comments = await scraper(url, max_comments, newest_first, post_context)
         
         logger.info("scraping_complete",
                    platform=platform.value,
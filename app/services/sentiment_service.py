@@ -1,20 +1,13 @@
-import os
 import time
 import structlog
 import httpx
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from collections import defaultdict
 from datetime import datetime
 
-from google import genai
-from google.genai import types
-
 from app.config import settings
 from app.models.schemas import (
     PostContext,
-    CleanedComment,
-    CommentSentiment,
-    BatchResult,
     AnalysisResponse,
     Platform,
     SentimentSummary,
@@ -23,8 +16,18 @@ from app.models.schemas import (
     SentimentCategory,
     Language
 )
+from app.models.records import BatchOutcome, CommentRecord, SentimentRecord
 from app.utils.comment_cleaner import CommentCleaner
 from app.utils.ai_agent_logger import AIAgentLogger
+from app.services.language_id import LanguageDetector
+from app.services.model_providers import Completion, ImageInput
+from app.services.model_router import model_router
+from app.utils.metrics import (
+    span,
+    MODEL_TOKENS,
+    BATCHES,
+    PARSE_FAILURES
+)
 
 logger = structlog.get_logger()
 
@@ -57,33 +60,40 @@ class SentimentService:
     """
 
     def __init__(self):
-        gcp_sa_json = os.environ.get("GCP_SERVICE_ACCOUNT_JSON")
-        if gcp_sa_json:
-            tmp_key_path = "/tmp/gcp_key.json"
-            with open(tmp_key_path, "w", encoding="utf-8") as f:
-                f.write(gcp_sa_json)
-            os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = tmp_key_path
-
-        self.client = genai.Client(
-            vertexai=True,
-            project=settings.GCP_PROJECT_ID,
-            location=settings.GCP_LOCATION
-        )
+        # Provider clients and their health live in the process-wide router
+        self.router = model_router
         self.ai_logger = AIAgentLogger()
 
-    async def _download_image(self, url: str) -> Optional[types.Part]:
-        """Download image from URL and convert to a genai Part."""
+    async def _download_image(self, url: str) -> Optional[ImageInput]:
+        """Download image from URL for multimodal analysis."""
         try:
             async with httpx.AsyncClient() as http_client:
                 response = await http_client.get(url, timeout=10.0)
                 if response.status_code == 200:
                     content_type = response.headers.get("content-type", "image/jpeg")
-                    return types.Part.from_bytes(data=response.content, mime_type=content_type)
+                    return ImageInput(data=response.content, mimeType=content_type)
         except Exception as e:
             logger.warning("image_download_failed", url=url, error=str(e))
         return None
 
-    def _build_batch_prompt(self, post_context: PostContext, comment_batch: List[CleanedComment], language: Language = Language.ENGLISH) -> str:
+    CONFIDENCE_INSTRUCTION = (
+        "Also add a Confidence field to each object: a number from 0.0 to 1.0 for how "
+        "certain you are of the Sentiment. Use low values for ambiguous, sarcastic or "
+        "context-dependent comments.\n"
+    )
+
+    # How a language is named in the prompt, where its value alone is ambiguous
+    LANGUAGE_NAMES = {
+        Language.HINGLISH: "Hinglish (Hindi written in Latin script, often mixed with English)"
+    }
+
+    def _build_batch_prompt(
+        self,
+        post_context: PostContext,
+        comment_batch: List[CommentRecord],
+        language: Language = Language.ENGLISH,
+        with_confidence: bool = False
+    ) -> str:
         """Build prompt with post context and comments."""
         context_section = ""
         
@@ -118,12 +128,13 @@ class SentimentService:
         return (
             f"{context_section}\n\n"
             f"Comments to analyze:\n{comments_str}\n\n"
-            f"The comments are likely in {language.value}. Analyze them respecting the cultural context, but strictly classify them into the provided English Sentiment categories.\n"
-            "Analyze each comment and return a JSON array of results."
+            f"The comments are likely in {self.LANGUAGE_NAMES.get(language, language.value)}. Analyze them respecting the cultural context, but strictly classify them into the provided English Sentiment categories.\n"
+            + (self.CONFIDENCE_INSTRUCTION if with_confidence else "")
+            + "Analyze each comment and return a JSON array of results."
         )
 
-    def _parse_json_response(self, text: str) -> List[CommentSentiment]:
-        """Parse Gemini response into CommentSentiment objects."""
+    def _parse_json_response(self, text: str) -> List[SentimentRecord]:
+        """Parse Gemini response into SentimentRecord objects."""
         import json
         import re
         
@@ -144,81 +155,111 @@ class SentimentService:
             data = json.loads(json_str)
             # Handle single dict or array
             items = [data] if isinstance(data, dict) else data
-            return [CommentSentiment(**item) for item in items]
+            return [SentimentRecord.from_model_output(item) for item in items]
         except Exception as e:
+            PARSE_FAILURES.inc()
             logger.error("json_parse_error",
                         error=str(e),
                         text=text[:200] + "...")
             raise
 
+    @staticmethod
+    def _record_token_usage(completion: Completion) -> Tuple[int, int]:
+        """Record and return the prompt/completion token counts reported by the model."""
+        MODEL_TOKENS.inc(completion.inputTokens, model=completion.model, direction="in")
+        MODEL_TOKENS.inc(completion.outputTokens, model=completion.model, direction="out")
+        return completion.inputTokens, completion.outputTokens
+
     async def analyze_batch_with_gemini(
         self,
         post_context: PostContext,
-        comment_batch: List[CleanedComment],
+        comment_batch: List[CommentRecord],
         batch_number: int,
         url: str = None,  # Added URL parameter for logging
-        language: Language = Language.ENGLISH
-    ) -> BatchResult:
-        """Analyze a batch of comments using Gemini."""
+        language: Optional[Language] = None,
+        model: Optional[str] = None,
+        with_confidence: bool = False
+    ) -> BatchOutcome:
+        """Analyze a batch of comments (`model` defaults to GEMINI_MODEL).
+
+        The model router picks the provider; `model` names the tier's Gemini
+        model, which other providers map to their own equivalent. The prompt
+        names the batch's detected language, else `language`, else English.
+        """
         start_time = time.time()
+        model = model or settings.GEMINI_MODEL
+        language = LanguageDetector.batch_language(comment_batch, language) or Language.ENGLISH
+        provider = None
+        input_tokens = output_tokens = 0
         
         try:
             # Build and send prompt
-            prompt = self._build_batch_prompt(post_context, comment_batch, language)
-            full_prompt = f"{self.SYSTEM_PROMPT}\n\n{prompt}"
-            
-            # Prepare content parts
-            content_parts = [full_prompt]
+            with span("prompt_build"):
+                prompt = self._build_batch_prompt(post_context, comment_batch, language, with_confidence)
+                full_prompt = f"{self.SYSTEM_PROMPT}\n\n{prompt}"
             
             # Check for image content for multimodal analysis (specifically for Instagram)
+            image = None
             if post_context.platform == Platform.INSTAGRAM and post_context.images:
                 # Use the first image
                 image_url = post_context.images[0]
                 image = await self._download_image(image_url)
                 if image:
-                    content_parts.append(image)
                     logger.info("attached_image_for_analysis", url=image_url)
             
-            response = self.client.models.generate_content(
-                model=settings.GEMINI_MODEL,
-                contents=content_parts
-            )
+            with span("model"):
+                completion = await self.router.generate(model, full_prompt, image)
+            model, provider = completion.model, completion.provider
+            input_tokens, output_tokens = self._record_token_usage(completion)
             
             # Parse response
-            sentiments = self._parse_json_response(response.text)
+            with span("parse"):
+                sentiments = self._parse_json_response(completion.text)
             processing_time = time.time() - start_time
             
             # Log the analysis session
             if url:
-                self.ai_logger.log_analysis_session(
-                    url=url,
-                    post_context=post_context,
-                    comment_batch=comment_batch,
-                    sentiments=sentiments,
-                    prompt=full_prompt,
-                    processing_time=processing_time
-                )
+                with span("log"):
+                    self.ai_logger.log_analysis_session(
+                        url=url,
+                        post_context=post_context,
+                        comment_batch=comment_batch,
+                        sentiments=sentiments,
+                        prompt=full_prompt,
+                        processing_time=processing_time
+                    )
             
             logger.info("batch_analysis_complete",
                        batch_number=batch_number,
                        comments_analyzed=len(sentiments),
+                       provider=provider,
                        processing_time=processing_time)
+            BATCHES.inc(status="ok")
                        
-            return BatchResult(
+            return BatchOutcome(
                 batchNumber=batch_number,
                 sentiments=sentiments,
-                processingTime=processing_time
+                processingTime=processing_time,
+                model=model,
+                provider=provider,
+                inputTokens=input_tokens,
+                outputTokens=output_tokens
             )
             
         except Exception as e:
             logger.error("batch_analysis_error",
                         batch_number=batch_number,
                         error=str(e))
-            return BatchResult(
+            BATCHES.inc(status="error")
+            return BatchOutcome(
                 batchNumber=batch_number,
                 sentiments=[],
                 processingTime=time.time() - start_time,
-                error=str(e)
+                error=str(e),
+                model=model,
+                provider=provider,
+                inputTokens=input_tokens,
+                outputTokens=output_tokens
             )
 
     def create_summary_response(
@@ -226,13 +267,13 @@ class SentimentService:
         post_url: str,
         platform: Platform,
         post_context: PostContext,
-        sentiments: List[CommentSentiment],
+        sentiments: List[SentimentRecord],
         processing_time: float,
         batches_count: int
     ) -> AnalysisResponse:
         """Create final analysis response with summaries."""
         # Group comments by sentiment
-        grouped: Dict[str, List[str]] = defaultdict(list)
+        grouped: Dict[SentimentCategory, List[str]] = defaultdict(list)
         for sentiment in sentiments:
             grouped[sentiment.Sentiment].append(sentiment.Comment)
             
@@ -251,12 +292,12 @@ class SentimentService:
         
         # Create top and all comments dicts
         top_comments = {
-            category: comments[:10]
+            category.value: comments[:10]
             for category, comments in grouped.items()
         }
         
         all_comments = {
-            category: comments
+            category.value: comments
             for category, comments in grouped.items()
         }
         
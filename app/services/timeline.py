@@ -0,0 +1,50 @@
+from datetime import datetime, timezone
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+from app.models.records import CommentRecord, SentimentRecord
+from app.models.schemas import SentimentCategory, SentimentTimeline, TimelineGranularity
+from app.utils.timestamps import normalize_timestamps
+
+BUCKET_SECONDS = {
+    TimelineGranularity.HOUR: 3600,
+    TimelineGranularity.DAY: 86400
+}
+CATEGORIES = list(SentimentCategory)
+CATEGORY_CODES = {category: code for code, category in enumerate(CATEGORIES)}
+
+
+def build_timeline(
+    labelled: Iterable[Tuple[CommentRecord, SentimentRecord]],
+    granularity: TimelineGranularity,
+    now: Optional[datetime] = None
+) -> SentimentTimeline:
+    """Count labelled comments per time bucket and category in one pass.
+
+    Each comment gets a single (bucket, category) cell index, so the whole
+    table is one bincount regardless of how many comments there are.
+    """
+    timestamps = []
+    codes = []
+    for source, sentiment in labelled:
+        timestamps.append(source.timestamp)
+        codes.append(CATEGORY_CODES[sentiment.Sentiment])
+
+    times = normalize_timestamps(timestamps, now)
+    dated = ~np.isnan(times)
+    width = BUCKET_SECONDS[granularity]
+    keys = np.floor(times[dated] / width).astype(np.int64)
+    buckets, inverse = np.unique(keys, return_inverse=True)
+
+    n_categories = len(CATEGORIES)
+    cells = inverse * n_categories + np.asarray(codes, dtype=np.int64)[dated]
+    table = np.bincount(cells, minlength=len(buckets) * n_categories).reshape(len(buckets), n_categories)
+
+    return SentimentTimeline(
+        granularity=granularity,
+        bucketStarts=[datetime.fromtimestamp(key * width, timezone.utc) for key in buckets.tolist()],
+        totals=table.sum(axis=1).tolist(),
+        counts={category.value: table[:, code].tolist() for code, category in enumerate(CATEGORIES)},
+        undated=int(len(times) - dated.sum())
+    )
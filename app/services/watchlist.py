@@ -0,0 +1,441 @@
+import asyncio
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Set
+
+import structlog
+
+from app.config import settings
+from app.models.schemas import (
+    AnalysisResponse,
+    Language,
+    Platform,
+    PostContext,
+    SentimentCategory,
+    SummaryPoint,
+    WatchItem
+)
+from app.services.platform_detector import PlatformDetector
+from app.services.scraper_service import LIVE_VIEW_PLATFORMS
+from app.utils.metrics import REGISTRY
+
+logger = structlog.get_logger()
+
+WATCHLIST_RUNS = REGISTRY.counter(
+    "watchlist_runs_total", "Scheduled watchlist analyses by outcome", ["status"]
+)
+WATCHLIST_LAG = REGISTRY.histogram(
+    "watchlist_start_lag_seconds", "Delay between a watchlist run falling due and starting"
+)
+WATCHLIST_ITEMS = REGISTRY.gauge(
+    "watchlist_items", "Enabled watchlist items"
+)
+
+# One integer column per category keeps each snapshot row small
+CATEGORY_COLUMNS = {category.name.lower(): category for category in SentimentCategory}
+
+ITEM_COLUMNS = (
+    "id", "owner", "url", "platform", "language", "interval", "delta", "enabled",
+    "created_at", "next_run_at", "last_run_at", "last_error", "runs"
+)
+
+Runner = Callable[..., Awaitable[AnalysisResponse]]
+
+
+class WatchlistLimitError(ValueError):
+    """Raised when an owner already tracks WATCHLIST_MAX_ITEMS_PER_OWNER posts."""
+
+
+@dataclass(slots=True)
+class WatchEntry:
+    id: str
+    owner: str
+    url: str
+    platform: Platform
+    language: Optional[Language]  # Hint for comments the detector can't place
+    interval: int
+    delta: bool
+    enabled: bool
+    created_at: float
+    next_run_at: float
+    last_run_at: Optional[float] = None
+    last_error: Optional[str] = None
+    runs: int = 0
+    # Post context of the last run, reused until WATCHLIST_CONTEXT_TTL (memory only)
+    context: Optional[PostContext] = None
+    context_at: float = 0.0
+
+    def to_schema(self) -> WatchItem:
+        return WatchItem(
+            id=self.id,
+            url=self.url,
+            platform=self.platform,
+            language=self.language,
+            intervalSeconds=self.interval,
+            delta=self.delta,
+            enabled=self.enabled,
+            createdAt=_as_datetime(self.created_at),
+            nextRunAt=_as_datetime(self.next_run_at) if self.enabled else None,
+            lastRunAt=_as_datetime(self.last_run_at),
+            lastError=self.last_error,
+            runs=self.runs
+        )
+
+
+def _as_datetime(epoch: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(epoch, timezone.utc) if epoch is not None else None
+
+
+class WatchlistScheduler:
+    """In-process scheduler that re-analyzes tracked posts on an interval.
+
+    Every run is rescheduled with jitter so items added together drift apart
+    instead of firing in bursts, and at most WATCHLIST_MAX_CONCURRENT_RUNS run
+    at once. Model and Apify calls go through the same process-wide
+    concurrency budgets as API requests. Items and a compact series of
+    summary snapshots live in SQLite.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        max_concurrent_runs: int,
+        jitter: float,
+        startup_spread: float,
+        context_ttl: float
+    ):
+        self.db_path = db_path
+        self.max_concurrent_runs = max_concurrent_runs
+        self.jitter = jitter
+        self.startup_spread = startup_spread
+        self.context_ttl = context_ttl
+        self._items: Dict[str, WatchEntry] = {}
+        self._running: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+        self._runner: Optional[Runner] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=5.0)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self) -> None:
+        category_columns = ", ".join(f"{column} INTEGER" for column in CATEGORY_COLUMNS)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS watch_items ("
+                "id TEXT PRIMARY KEY, owner TEXT, url TEXT, platform TEXT, language TEXT, "
+                "interval INTEGER, delta INTEGER, enabled INTEGER, created_at REAL, "
+                "next_run_at REAL, last_run_at REAL, last_error TEXT, runs INTEGER)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS summary_snapshots ("
+                "watch_id TEXT, taken_at REAL, total INTEGER, new_comments INTEGER, "
+                f"{category_columns}, views TEXT, result_id TEXT)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS summary_snapshots_watch "
+                "ON summary_snapshots (watch_id, taken_at)"
+            )
+
+    async def start(self, runner: Runner) -> None:
+        """Load the watchlist and start scheduling; `runner` analyzes one URL."""
+        self._runner = runner
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.max_concurrent_runs)
+        await asyncio.to_thread(self._init_db)
+        entries = await asyncio.to_thread(self._load_items)
+
+        # Items that fell due while the process was down would otherwise all
+        # fire on the first tick
+        now = time.time()
+        for entry in entries:
+            if entry.next_run_at < now:
+                entry.next_run_at = now + random.uniform(0, min(entry.interval, self.startup_spread))
+            self._items[entry.id] = entry
+        self._update_gauge()
+        self._loop_task = asyncio.create_task(self._loop())
+        logger.info("watchlist_started", items=len(entries))
+
+    async def stop(self) -> None:
+        if self._loop_task:
+            self._loop_task.cancel()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._loop_task = None
+
+    # Management
+
+    def list_items(self, owner: str) -> List[WatchItem]:
+        with self._lock:
+            entries = [entry for entry in self._items.values() if entry.owner == owner]
+        return [entry.to_schema() for entry in sorted(entries, key=lambda e: e.created_at)]
+
+    def get_item(self, owner: str, watch_id: str) -> Optional[WatchEntry]:
+        entry = self._items.get(watch_id)
+        return entry if entry is not None and entry.owner == owner else None
+
+    async def add(self, owner: str, url: str, language: Optional[Language], interval: int, delta: bool) -> WatchItem:
+        self._check_interval(interval)
+        platform = PlatformDetector.detect_platform(url)
+        with self._lock:
+            owned = sum(1 for entry in self._items.values() if entry.owner == owner)
+            if owned >= settings.WATCHLIST_MAX_ITEMS_PER_OWNER:
+                raise WatchlistLimitError(
+                    f"Watchlist limit reached ({settings.WATCHLIST_MAX_ITEMS_PER_OWNER} posts)"
+                )
+            now = time.time()
+            entry = WatchEntry(
+                id=uuid.uuid4().hex,
+                owner=owner,
+                url=url,
+                platform=platform,
+                language=language,
+                interval=interval,
+                delta=delta,
+                enabled=True,
+                created_at=now,
+                # First run lands somewhere in the first interval, not right away
+                next_run_at=now + random.uniform(0, min(interval, self.startup_spread))
+            )
+            self._items[entry.id] = entry
+        await asyncio.to_thread(self._write_item, entry)
+        self._changed()
+        return entry.to_schema()
+
+    async def update(
+        self,
+        entry: WatchEntry,
+        language: Optional[Language] = None,
+        interval: Optional[int] = None,
+        enabled: Optional[bool] = None,
+        clear_language: bool = False
+    ) -> WatchItem:
+        if interval is not None:
+            self._check_interval(interval)
+            # Pull a far-off run closer when the interval shrinks
+            entry.next_run_at = min(entry.next_run_at, time.time() + self._jittered(interval))
+            entry.interval = interval
+        if clear_language:
+            entry.language = None
+        elif language is not None:
+            entry.language = language
+        if enabled is not None:
+            if enabled and not entry.enabled:
+                entry.next_run_at = time.time() + random.uniform(0, min(entry.interval, self.startup_spread))
+            entry.enabled = enabled
+        await asyncio.to_thread(self._write_item, entry)
+        self._changed()
+        return entry.to_schema()
+
+    async def remove(self, entry: WatchEntry) -> None:
+        with self._lock:
+            self._items.pop(entry.id, None)
+        await asyncio.to_thread(self._delete_item, entry.id)
+        self._changed()
+
+    def run_now(self, entry: WatchEntry) -> WatchItem:
+        entry.next_run_at = time.time()
+        self._changed()
+        return entry.to_schema()
+
+    async def series(
+        self,
+        entry: WatchEntry,
+        since: Optional[datetime] = None,
+        limit: int = 1000
+    ) -> List[SummaryPoint]:
+        return await asyncio.to_thread(
+            self._read_series, entry.id, since.timestamp() if since else 0.0, limit
+        )
+
+    def _check_interval(self, interval: int) -> None:
+        if interval < settings.WATCHLIST_MIN_INTERVAL:
+            raise ValueError(f"intervalSeconds must be at least {settings.WATCHLIST_MIN_INTERVAL}")
+
+    def _changed(self) -> None:
+        self._update_gauge()
+        if self._wakeup:
+            self._wakeup.set()
+
+    def _update_gauge(self) -> None:
+        WATCHLIST_ITEMS.set(sum(1 for entry in self._items.values() if entry.enabled))
+
+    def _jittered(self, interval: float) -> float:
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    # Scheduling
+
+    async def _loop(self) -> None:
+        while True:
+            now = time.time()
+            next_due = None
+            with self._lock:
+                entries = list(self._items.values())
+            for entry in entries:
+                if not entry.enabled or entry.id in self._running:
+                    continue
+                if entry.next_run_at <= now:
+                    WATCHLIST_LAG.observe(now - entry.next_run_at)
+                    # Schedule from the due time, not the start time, so start lag
+                    # doesn't accumulate; a run a whole interval behind restarts
+                    # from now instead of firing back to back
+                    next_run_at = entry.next_run_at + self._jittered(entry.interval)
+                    entry.next_run_at = next_run_at if next_run_at > now else now + self._jittered(entry.interval)
+                    self._running.add(entry.id)
+                    task = asyncio.create_task(self._run(entry))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                elif next_due is None or entry.next_run_at < next_due:
+                    next_due = entry.next_run_at
+
+            self._wakeup.clear()
+            timeout = 60.0 if next_due is None else min(60.0, max(0.0, next_due - now))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run(self, entry: WatchEntry) -> None:
+        try:
+            async with self._slots:
+                fresh_context = time.time() - entry.context_at < self.context_ttl
+                start = time.time()
+                try:
+                    response = await self._runner(
+                        entry.url,
+                        SimpleNamespace(clerk_id=entry.owner),
+                        entry.language,
+                        delta=entry.delta,
+                        cached_context=entry.context if fresh_context else None,
+                        force_refresh=True  # Each point of the series is a fresh scrape
+                    )
+                except Exception as e:
+                    WATCHLIST_RUNS.inc(status="error")
+                    logger.error("watchlist_run_failed", watch_id=entry.id, url=entry.url, error=str(e))
+                    entry.last_error = str(e)
+                else:
+                    WATCHLIST_RUNS.inc(status="ok")
+                    entry.last_error = None
+                    entry.context = response.postContext
+                    if not fresh_context:
+                        entry.context_at = start
+                    if entry.id in self._items:
+                        # A reused context's view count is stale on some platforms
+                        live_views = not fresh_context or entry.platform in LIVE_VIEW_PLATFORMS
+                        await asyncio.to_thread(self._write_snapshot, entry.id, start, response, live_views)
+                entry.last_run_at = start
+                entry.runs += 1
+                # Removed while running: don't resurrect the row
+                if entry.id in self._items:
+                    await asyncio.to_thread(self._write_item, entry)
+        finally:
+            self._running.discard(entry.id)
+
+    # SQLite
+
+    def _load_items(self) -> List[WatchEntry]:
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT {', '.join(ITEM_COLUMNS)} FROM watch_items").fetchall()
+        return [
+            WatchEntry(
+                id=row[0], owner=row[1], url=row[2], platform=Platform(row[3]),
+                language=Language(row[4]) if row[4] else None, interval=row[5], delta=bool(row[6]),
+                enabled=bool(row[7]), created_at=row[8], next_run_at=row[9],
+                last_run_at=row[10], last_error=row[11], runs=row[12]
+            )
+            for row in rows
+        ]
+
+    def _write_item(self, entry: WatchEntry) -> None:
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO watch_items ({', '.join(ITEM_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(ITEM_COLUMNS))})",
+                    (
+                        entry.id, entry.owner, entry.url, entry.platform.value,
+                        entry.language.value if entry.language else None,
+                        entry.interval, int(entry.delta), int(entry.enabled), entry.created_at,
+                        entry.next_run_at, entry.last_run_at, entry.last_error, entry.runs
+                    )
+                )
+        except sqlite3.Error as e:
+            logger.warning("watchlist_write_failed", watch_id=entry.id, error=str(e))
+
+    def _delete_item(self, watch_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM watch_items WHERE id = ?", (watch_id,))
+            conn.execute("DELETE FROM summary_snapshots WHERE watch_id = ?", (watch_id,))
+
+    def _write_snapshot(
+        self,
+        watch_id: str,
+        taken_at: float,
+        response: AnalysisResponse,
+        live_views: bool = True
+    ) -> None:
+        summary = response.summary
+        values = [watch_id, taken_at, summary.totalComments, response.delta.newComments if response.delta else None]
+        values.extend(getattr(summary, column) for column in CATEGORY_COLUMNS)
+        values.extend([summary.totalViews if live_views else None, response.resultId])
+        cutoff = time.time() - settings.WATCHLIST_RETENTION_DAYS * 86400
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    f"INSERT INTO summary_snapshots VALUES ({', '.join('?' * len(values))})",
+                    values
+                )
+                conn.execute(
+                    "DELETE FROM summary_snapshots WHERE watch_id = ? AND taken_at < ?",
+                    (watch_id, cutoff)
+                )
+        except sqlite3.Error as e:
+            logger.warning("watchlist_snapshot_failed", watch_id=watch_id, error=str(e))
+
+    def _read_series(self, watch_id: str, since: float, limit: int) -> List[SummaryPoint]:
+        columns = ", ".join(CATEGORY_COLUMNS)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT taken_at, total, new_comments, {columns}, views, result_id "
+                "FROM summary_snapshots WHERE watch_id = ? AND taken_at >= ? "
+                "ORDER BY taken_at DESC LIMIT ?",
+                (watch_id, since, limit)
+            ).fetchall()
+        categories = list(CATEGORY_COLUMNS.values())
+        return [
+            SummaryPoint(
+                takenAt=_as_datetime(row[0]),
+                totalComments=row[1],
+                newComments=row[2],
+                counts={category.value: count for category, count in zip(categories, row[3:-2])},
+                totalViews=row[-2],
+                resultId=row[-1]
+            )
+            for row in reversed(rows)
+        ]
+
+
+watchlist_scheduler = WatchlistScheduler(
+    db_path=settings.WATCHLIST_DB,
+    max_concurrent_runs=settings.WATCHLIST_MAX_CONCURRENT_RUNS,
+    jitter=settings.WATCHLIST_JITTER,
+    startup_spread=settings.WATCHLIST_STARTUP_SPREAD,
+    context_ttl=settings.WATCHLIST_CONTEXT_TTL
+)
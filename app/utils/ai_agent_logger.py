@@ -4,7 +4,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any
 
-from app.models.schemas import PostContext, CleanedComment, CommentSentiment
+from app.models.schemas import PostContext
+from app.models.records import CommentRecord, SentimentRecord
 
 class AIAgentLogger:
     def __init__(self):
@@ -42,8 +43,8 @@ class AIAgentLogger:
         self,
         url: str,
         post_context: PostContext,
-        comment_batch: List[CleanedComment],
-        sentiments: List[CommentSentiment],
+        comment_batch: List[CommentRecord],
+        sentiments: List[SentimentRecord],
         prompt: str,
         processing_time: float
     ) -> None:
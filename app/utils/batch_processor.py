@@ -1,32 +1,97 @@
 import asyncio
+import time
+import uuid
 import structlog
-from typing import List, Callable, TypeVar
-from app.models.schemas import CleanedComment, BatchResult, PostContext, CommentSentiment
+from collections import deque
+from typing import Deque, Dict, Iterator, List, Callable, Optional, Tuple, TypeVar
+from app.config import settings
+from app.models.schemas import PostContext
+from app.models.records import BatchOutcome, CommentRecord, SentimentRecord
+from app.services.batch_queue import decode_outcome, encode_comments, get_batch_queue
+from app.utils.metrics import BATCHES, REGISTRY
 
 logger = structlog.get_logger()
 
 T = TypeVar('T')
 
+DEADLINE_ERROR = "Deadline exceeded"
+
+HEDGES = REGISTRY.counter(
+    "batch_hedges_total", "Hedged duplicate batch calls by which call answered first", ["winner"]
+)
+
+
+class LatencyTracker:
+    """Rolling batch latencies of one model; a high quantile is the hedge delay."""
+
+    def __init__(self, window: int = 200):
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.hedged: Deque[bool] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging a call, or None to not hedge it."""
+        if len(self.samples) < settings.HEDGE_MIN_SAMPLES:
+            return None
+        # Caps the extra load when the whole backend slows down, not just the tail
+        if sum(self.hedged) >= settings.HEDGE_MAX_RATE * self.hedged.maxlen:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(int(len(ordered) * settings.HEDGE_QUANTILE), len(ordered) - 1)]
+
+
+_latency_trackers: Dict[str, LatencyTracker] = {}
+
+
+def latency_tracker(key: str) -> LatencyTracker:
+    """Process-wide tracker for one model, so hedge delays learn across requests."""
+    if key not in _latency_trackers:
+        _latency_trackers[key] = LatencyTracker()
+    return _latency_trackers[key]
+
+
 class BatchProcessor:
     @staticmethod
     async def process_batches_parallel(
-        batches: List[List[CleanedComment]],
+        batches: List[List[CommentRecord]],
         processor_func: Callable,
         post_context: PostContext,
-        max_concurrent: int
-    ) -> List[BatchResult]:
-        """Process batches of comments in parallel with rate limiting."""
+        max_concurrent: int,
+        deadline: Optional[float] = None,
+        latency: Optional[LatencyTracker] = None
+    ) -> List[BatchOutcome]:
+        """Process batches of comments in parallel with rate limiting.
+
+        `deadline` (a `time.monotonic()` value) bounds every batch: whatever
+        is still running or queued then is cancelled and returned as a
+        DEADLINE_ERROR outcome, so callers can answer with partial results.
+        With a `latency` tracker and HEDGE_ENABLED, a batch still running
+        after the tracker's hedge delay gets a duplicate call; the first
+        successful answer wins and the other call is cancelled.
+        """
         semaphore = asyncio.Semaphore(max_concurrent)
+        hedge = latency if settings.HEDGE_ENABLED else None
         
-        async def process_with_semaphore(batch: List[CleanedComment], batch_number: int) -> BatchResult:
+        async def process_with_semaphore(batch: List[CommentRecord], batch_number: int) -> BatchOutcome:
             async with semaphore:
+                remaining = None if deadline is None else deadline - time.monotonic()
                 try:
-                    return await processor_func(post_context, batch, batch_number)
+                    if remaining is not None and remaining <= 0:
+                        raise asyncio.TimeoutError
+                    return await asyncio.wait_for(
+                        BatchProcessor._call_hedged(processor_func, post_context, batch, batch_number, latency, hedge),
+                        remaining
+                    )
+                except asyncio.TimeoutError:
+                    BATCHES.inc(status="deadline")
+                    return BatchOutcome(batchNumber=batch_number, error=DEADLINE_ERROR)
                 except Exception as e:
                     logger.error("batch_processing_error", 
                                batch_number=batch_number, 
                                error=str(e))
-                    return BatchResult(
+                    return BatchOutcome(
                         batchNumber=batch_number,
                         sentiments=[],
                         processingTime=0.0,
@@ -45,7 +110,7 @@ class BatchProcessor:
         # Filter out any unexpected exceptions
         valid_results = [
             result for result in batch_results
-            if isinstance(result, BatchResult)
+            if isinstance(result, BatchOutcome)
         ]
         
         logger.info("batch_processing_complete",
@@ -55,7 +120,112 @@ class BatchProcessor:
         return valid_results
 
     @staticmethod
-    def merge_batch_results(batch_results: List[BatchResult]) -> List[CommentSentiment]:
+    async def process_batches_distributed(
+        batches: List[List[CommentRecord]],
+        post_context: PostContext,
+        job: dict,
+        deadline: Optional[float] = None
+    ) -> List[BatchOutcome]:
+        """Publish batches to the shared queue and gather their outcomes.
+
+        `job` carries the analysis arguments (url, language hint, model,
+        withConfidence) that queue workers pass to the sentiment service.
+        Outcomes are matched back by request id and batch number; the first
+        outcome of a redelivered batch wins. Batches without an outcome by
+        `deadline` (or BATCH_QUEUE_RESULT_TIMEOUT) come back as errors, and
+        their queued copies are cancelled.
+        """
+        queue = get_batch_queue()
+        request_id = uuid.uuid4().hex
+        await queue.enqueue(
+            request_id,
+            post_context.model_dump_json(),
+            [
+                {**job, "batchNumber": batch_number, "comments": encode_comments(batch)}
+                for batch_number, batch in enumerate(batches)
+            ]
+        )
+        wait_until = time.monotonic() + settings.BATCH_QUEUE_RESULT_TIMEOUT
+        if deadline is not None:
+            wait_until = min(wait_until, deadline)
+
+        outcomes: Dict[int, BatchOutcome] = {}
+        try:
+            while len(outcomes) < len(batches):
+                remaining = wait_until - time.monotonic()
+                if remaining <= 0:
+                    break
+                encoded = await queue.next_result(request_id, remaining)
+                if encoded is not None:
+                    outcome = decode_outcome(encoded)
+                    outcomes.setdefault(outcome.batchNumber, outcome)
+        finally:
+            if len(outcomes) < len(batches):
+                await queue.cancel(request_id)
+            await queue.release(request_id)
+
+        timed_out = deadline is not None and wait_until == deadline
+        for batch_number in range(len(batches)):
+            if batch_number not in outcomes:
+                BATCHES.inc(status="deadline" if timed_out else "error")
+                outcomes[batch_number] = BatchOutcome(
+                    batchNumber=batch_number,
+                    error=DEADLINE_ERROR if timed_out else "No batch worker answered in time"
+                )
+        logger.info("distributed_batches_complete",
+                   request_id=request_id,
+                   total_batches=len(batches),
+                   answered=sum(1 for outcome in outcomes.values() if not outcome.error))
+        return [outcomes[batch_number] for batch_number in range(len(batches))]
+
+    @staticmethod
+    async def _call_hedged(
+        processor_func: Callable,
+        post_context: PostContext,
+        batch: List[CommentRecord],
+        batch_number: int,
+        latency: Optional[LatencyTracker],
+        hedge: Optional[LatencyTracker]
+    ) -> BatchOutcome:
+        started: Dict[asyncio.Task, float] = {}
+
+        def launch() -> asyncio.Task:
+            task = asyncio.ensure_future(processor_func(post_context, batch, batch_number))
+            started[task] = time.monotonic()
+            return task
+
+        def finished(task: asyncio.Task) -> BatchOutcome:
+            result = task.result()
+            if latency and not result.error:
+                latency.record(time.monotonic() - started[task])
+            return result
+
+        primary = launch()
+        try:
+            delay = hedge.hedge_delay() if hedge else None
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if hedge:
+                hedge.hedged.append(not done)
+            if done:
+                return finished(primary)
+
+            logger.info("batch_hedged", batch_number=batch_number, delay=delay)
+            pending = {primary, launch()}
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Both calls can finish in the same wait; a success wins over an error
+                outcomes = sorted(((task, finished(task)) for task in done), key=lambda item: bool(item[1].error))
+                for task, result in outcomes:
+                    # An error only counts once the other call has failed too
+                    if not result.error or not pending:
+                        HEDGES.inc(winner="primary" if task is primary else "hedge")
+                        return result
+        finally:
+            for task in started:
+                task.cancel()
+
+    @staticmethod
+    def merge_batch_results(batch_results: List[BatchOutcome]) -> List[SentimentRecord]:
         """Merge results from successful batches."""
         # Filter out failed batches
         successful_batches = [
@@ -75,4 +245,79 @@ class BatchProcessor:
                    failed_batches=len(batch_results) - len(successful_batches),
                    total_sentiments=len(all_sentiments))
                    
-        return all_sentiments
\ No newline at end of file
+        return all_sentiments
+
+    @staticmethod
+    def pair_with_comments(
+        batch: List[CommentRecord],
+        result: BatchOutcome
+    ) -> List[Tuple[Optional[CommentRecord], SentimentRecord]]:
+        """Join a batch's model results back to the comments they label.
+
+        Each comment labels at most one result: the model echoes the comment
+        text, so results take the untaken comments with their text in order,
+        then fall back to an untaken comment at their position when the text
+        was rewritten. Extra echoes of an already labelled text are dropped.
+        """
+        by_text: Dict[str, Deque[int]] = {}
+        for index, comment in enumerate(batch):
+            by_text.setdefault(comment.comment, deque()).append(index)
+        matched: Dict[int, int] = {}  # Result position -> batch index
+        for position, sentiment in enumerate(result.sentiments):
+            indexes = by_text.get(sentiment.Comment)
+            if indexes:
+                matched[position] = indexes.popleft()
+        taken = set(matched.values())
+        pairs = []
+        for position, sentiment in enumerate(result.sentiments):
+            index = matched.get(position)
+            if index is None:
+                if sentiment.Comment in by_text:
+                    continue
+                if position < len(batch) and position not in taken:
+                    index = position
+                    taken.add(index)
+            pairs.append((batch[index] if index is not None else None, sentiment))
+        return pairs
+
+    @staticmethod
+    def iter_labelled(
+        batches: List[List[CommentRecord]],
+        batch_results: List[BatchOutcome]
+    ) -> Iterator[Tuple[Optional[CommentRecord], SentimentRecord]]:
+        """Yield (source comment, sentiment) for every successful batch."""
+        for result in batch_results:
+            if result.error or result.batchNumber >= len(batches):
+                continue
+            yield from BatchProcessor.pair_with_comments(batches[result.batchNumber], result)
+
+    @staticmethod
+    def count_labelled(
+        batches: List[List[CommentRecord]],
+        batch_results: List[BatchOutcome]
+    ) -> int:
+        """Number of source comments that a successful batch labelled."""
+        return sum(
+            1 for source, _ in BatchProcessor.iter_labelled(batches, batch_results)
+            if source is not None
+        )
+
+    @staticmethod
+    def build_comment_rows(
+        batches: List[List[CommentRecord]],
+        batch_results: List[BatchOutcome],
+        url: str
+    ) -> List[Dict]:
+        """Join model results back to their source comments, one row per comment."""
+        return [
+            {
+                "text": sentiment.Comment,
+                "sentiment": sentiment.Sentiment.value,
+                "justification": sentiment.Justification,
+                "timestamp": source.timestamp if source else None,
+                "originalIndex": source.originalIndex if source else None,
+                "platform": source.platform if source else None,
+                "url": url
+            }
+            for source, sentiment in BatchProcessor.iter_labelled(batches, batch_results)
+        ]
\ No newline at end of file
@@ -0,0 +1,101 @@
+import asyncio
+import random
+import uuid
+from typing import Dict, Tuple
+
+import structlog
+
+from app.config import settings
+from app.utils.metrics import REGISTRY
+from app.utils.shared_state import get_shared_state
+
+logger = structlog.get_logger()
+
+BUDGET_IN_USE = REGISTRY.gauge(
+    "concurrency_budget_in_use", "Upstream calls currently holding a budget slot", ["budget"]
+)
+BUDGET_WAITING = REGISTRY.gauge(
+    "concurrency_budget_waiting", "Upstream calls queued for a budget slot", ["budget"]
+)
+
+
+class ConcurrencyBudget:
+    """Process-wide cap on concurrent calls to one upstream.
+
+    API requests and scheduled watchlist runs draw from the same budget, so
+    background monitoring cannot push the process past the upstream limits.
+    With a shared state backend every slot is also a lease in the shared
+    store, so the limit holds across all worker processes; leases are
+    renewed while held and lapse if their worker dies. An unreachable store
+    falls back to the per-process cap.
+    """
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self._semaphore = asyncio.Semaphore(limit)
+        self._leases: Dict[asyncio.Task, Tuple[str, asyncio.Task]] = {}
+
+    async def __aenter__(self) -> "ConcurrencyBudget":
+        BUDGET_WAITING.inc(budget=self.name)
+        try:
+            await self._semaphore.acquire()
+            try:
+                await self._acquire_lease()
+            except BaseException:
+                self._semaphore.release()
+                raise
+        finally:
+            BUDGET_WAITING.dec(budget=self.name)
+        BUDGET_IN_USE.inc(budget=self.name)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        BUDGET_IN_USE.dec(budget=self.name)
+        try:
+            await self._release_lease()
+        finally:
+            self._semaphore.release()
+
+    async def _acquire_lease(self) -> None:
+        shared_state = get_shared_state()
+        if shared_state is None:
+            return
+        holder = uuid.uuid4().hex
+        delay = 0.01
+        try:
+            while not await asyncio.to_thread(
+                shared_state.acquire, self.name, holder, self.limit, settings.SHARED_BUDGET_LEASE
+            ):
+                await asyncio.sleep(delay + random.uniform(0, delay))
+                delay = min(delay * 2, settings.SHARED_BUDGET_POLL_INTERVAL)
+        except Exception as e:
+            logger.warning("shared_budget_unavailable", budget=self.name, error=str(e))
+            return
+        renewal = asyncio.create_task(self._renew(holder))
+        self._leases[asyncio.current_task()] = (holder, renewal)
+
+    async def _renew(self, holder: str) -> None:
+        shared_state = get_shared_state()
+        while True:
+            await asyncio.sleep(settings.SHARED_BUDGET_LEASE / 3)
+            try:
+                await asyncio.to_thread(shared_state.renew, self.name, holder, settings.SHARED_BUDGET_LEASE)
+            except Exception as e:
+                logger.warning("shared_budget_renew_failed", budget=self.name, error=str(e))
+
+    async def _release_lease(self) -> None:
+        lease = self._leases.pop(asyncio.current_task(), None)
+        if lease is None:
+            return
+        holder, renewal = lease
+        renewal.cancel()
+        try:
+            await asyncio.to_thread(get_shared_state().release, self.name, holder)
+        except Exception as e:
+            # The lease lapses on its own
+            logger.warning("shared_budget_release_failed", budget=self.name, error=str(e))
+
+
+model_budget = ConcurrencyBudget("model", settings.MODEL_MAX_CONCURRENCY)
+apify_budget = ConcurrencyBudget("apify", settings.APIFY_MAX_CONCURRENCY)
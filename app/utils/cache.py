@@ -0,0 +1,217 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+import structlog
+
+from app.utils.metrics import CACHE_HITS, CACHE_MISSES, CACHE_BYTES_SAVED
+
+logger = structlog.get_logger()
+
+
+class LRUCache:
+    """In-memory LRU of byte strings bounded by total size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._items[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+# Seconds between directory listings; writes by other processes sharing the
+# directory only count towards the size limit from the next listing
+DISK_CACHE_RESCAN_INTERVAL = 60.0
+
+
+class DiskCache:
+    """File-per-key store bounded by total size (least recently used evicted first).
+
+    Hits bump the file's mtime, which orders eviction. The total size is
+    tracked as files are written and deleted; the directory is only listed
+    when the limit is crossed or the last scan is over a minute old.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, suffix: str = ".bin"):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self._size = 0
+        self._scanned_at = 0.0
+        with self._lock:
+            self._scan()
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / f"{key}{self.suffix}"
+
+    def get_path(self, key: str) -> Optional[Path]:
+        path = self.path_for(key)
+        return path if self._touch(path) else None
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self.path_for(key)
+        try:
+            value = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        self._touch(path)
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        path = self.path_for(key)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        old_size = self._file_size(path)
+        try:
+            tmp_path.write_bytes(value)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("disk_cache_write_failed", path=str(path), error=str(e))
+            return
+        with self._lock:
+            self._size += len(value) - old_size
+            if self._size > self.max_bytes or time.monotonic() - self._scanned_at > DISK_CACHE_RESCAN_INTERVAL:
+                self._evict()
+
+    def delete(self, key: str) -> None:
+        path = self.path_for(key)
+        size = self._file_size(path)
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return
+        with self._lock:
+            self._size -= size
+
+    @staticmethod
+    def _touch(path: Path) -> bool:
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        except OSError:
+            pass  # Read-only cache: recency is lost, the hit still counts
+        return True
+
+    @staticmethod
+    def _file_size(path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _scan(self) -> List[Tuple[float, int, Path]]:
+        entries = []
+        total = 0
+        for path in self.directory.glob(f"*{self.suffix}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        self._size = total
+        self._scanned_at = time.monotonic()
+        return entries
+
+    def _evict(self) -> None:
+        entries = self._scan()
+        if self._size <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            self._size -= size
+            if self._size <= self.max_bytes:
+                break
+
+
+class TieredCache:
+    """Memory LRU in front of an optional disk tier, with hit/miss metrics.
+
+    `lookup` returns the cached bytes from memory or, for disk hits, the file
+    path so callers can stream it without loading it into memory.
+    """
+
+    def __init__(self, name: str, memory: LRUCache, disk: Optional[DiskCache] = None):
+        self.name = name
+        self.memory = memory
+        self.disk = disk
+
+    def lookup(self, key: str) -> Optional[Union[bytes, Path]]:
+        value = self.memory.get(key)
+        if value is not None:
+            self._record_hit(len(value))
+            return value
+        if self.disk:
+            path = self.disk.get_path(key)
+            if path is not None:
+                try:
+                    self._record_hit(path.stat().st_size)
+                except FileNotFoundError:
+                    path = None
+                if path is not None:
+                    return path
+        CACHE_MISSES.inc(cache=self.name)
+        return None
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Like `lookup`, but always returns bytes (disk hits are promoted)."""
+        value = self.lookup(key)
+        if isinstance(value, Path):
+            try:
+                data = value.read_bytes()
+            except FileNotFoundError:
+                return None
+            self.memory.set(key, data)
+            return data
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        self.memory.set(key, value)
+        if self.disk:
+            self.disk.set(key, value)
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.disk:
+            self.disk.delete(key)
+
+    def _record_hit(self, size: int) -> None:
+        CACHE_HITS.inc(cache=self.name)
+        CACHE_BYTES_SAVED.inc(size, cache=self.name)
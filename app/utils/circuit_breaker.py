@@ -0,0 +1,180 @@
+import time
+from enum import Enum
+from typing import Dict, Optional
+
+import structlog
+
+from app.config import settings
+from app.utils.metrics import REGISTRY
+
+logger = structlog.get_logger()
+
+BREAKER_STATE = REGISTRY.gauge(
+    "circuit_breaker_state", "Breaker state (0 closed, 1 half-open, 2 open)", ["breaker"]
+)
+BREAKER_TRANSITIONS = REGISTRY.counter(
+    "circuit_breaker_transitions_total", "Breaker state changes", ["breaker", "state"]
+)
+BREAKER_REJECTIONS = REGISTRY.counter(
+    "circuit_breaker_rejections_total", "Calls failed fast by an open breaker", ["breaker"]
+)
+RETRIES_DENIED = REGISTRY.counter(
+    "retries_denied_total", "Retries skipped because the breaker or retry budget disallowed them", ["breaker"]
+)
+
+
+class BreakerState(str, Enum):
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+
+STATE_VALUES = {BreakerState.CLOSED: 0, BreakerState.HALF_OPEN: 1, BreakerState.OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} is unavailable (circuit open), retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class RetryBudget:
+    """Token bucket that keeps retries to a fraction of first attempts.
+
+    Each call deposits `ratio` tokens and each retry spends one, so a failing
+    upstream sees at most ~(1 + ratio)x its normal load instead of the
+    attempt count times it. `min_tokens` lets low-traffic upstreams retry.
+    """
+
+    def __init__(self, ratio: float, min_tokens: float, max_tokens: float):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = min_tokens
+
+    def deposit(self) -> None:
+        self.tokens = min(self.tokens + self.ratio, self.max_tokens)
+
+    def withdraw(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class CircuitBreaker:
+    """Per-upstream breaker with half-open probing.
+
+    Opens after BREAKER_FAILURE_THRESHOLD consecutive failures (or at once
+    when the upstream says it is throttling), fails calls fast while open,
+    and after BREAKER_RESET_TIMEOUT lets BREAKER_HALF_OPEN_PROBES calls
+    through: a successful probe closes it, a failed one re-opens it.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.failure_threshold = settings.BREAKER_FAILURE_THRESHOLD
+        self.reset_timeout = settings.BREAKER_RESET_TIMEOUT
+        self.half_open_probes = settings.BREAKER_HALF_OPEN_PROBES
+        self.retry_budget = RetryBudget(
+            settings.RETRY_BUDGET_RATIO, settings.RETRY_BUDGET_MIN_TOKENS, settings.RETRY_BUDGET_MAX_TOKENS
+        )
+        self._state = BreakerState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_until = 0.0
+        self.probes_in_flight = 0
+        self.last_error: Optional[str] = None
+        BREAKER_STATE.set(0, breaker=name)
+
+    @property
+    def state(self) -> BreakerState:
+        if self._state == BreakerState.OPEN and time.monotonic() >= self.opened_until:
+            self._transition(BreakerState.HALF_OPEN)
+        return self._state
+
+    @property
+    def retry_after(self) -> float:
+        return max(self.opened_until - time.monotonic(), 0.0)
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may go through now."""
+        state = self.state
+        if state == BreakerState.CLOSED:
+            return
+        if state == BreakerState.HALF_OPEN and self.probes_in_flight < self.half_open_probes:
+            self.probes_in_flight += 1
+            return
+        BREAKER_REJECTIONS.inc(breaker=self.name)
+        raise CircuitOpenError(self.name, self.retry_after or self.reset_timeout)
+
+    def allows_retry(self) -> bool:
+        """Retry only while closed and within the retry budget."""
+        allowed = self.state == BreakerState.CLOSED and self.retry_budget.withdraw()
+        if not allowed:
+            RETRIES_DENIED.inc(breaker=self.name)
+        return allowed
+
+    def record_success(self) -> None:
+        self._release_probe()
+        self.consecutive_failures = 0
+        if self._state != BreakerState.CLOSED:
+            self._transition(BreakerState.CLOSED)
+
+    def record_failure(self, error: Optional[str] = None, open_for: Optional[float] = None) -> None:
+        """Count a failed call; `open_for` (e.g. a Retry-After) opens the breaker right away."""
+        self._release_probe()
+        self.consecutive_failures += 1
+        self.last_error = error
+        if (
+            open_for is not None
+            or self._state == BreakerState.HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            self.opened_until = max(self.opened_until, time.monotonic() + (open_for or self.reset_timeout))
+            if self._state != BreakerState.OPEN:
+                self._transition(BreakerState.OPEN)
+
+    def record_cancelled(self) -> None:
+        """The call was abandoned by its caller (deadline, hedge loser): no verdict."""
+        self._release_probe()
+
+    def snapshot(self) -> dict:
+        state = self.state
+        return {
+            "state": state.value,
+            "consecutiveFailures": self.consecutive_failures,
+            "retryAfter": round(self.retry_after, 1) if state == BreakerState.OPEN else None,
+            "lastError": self.last_error
+        }
+
+    def _release_probe(self) -> None:
+        if self.probes_in_flight:
+            self.probes_in_flight -= 1
+
+    def _transition(self, state: BreakerState) -> None:
+        self._state = state
+        self.probes_in_flight = 0
+        BREAKER_STATE.set(STATE_VALUES[state], breaker=self.name)
+        BREAKER_TRANSITIONS.inc(breaker=self.name, state=state.value)
+        log = logger.warning if state == BreakerState.OPEN else logger.info
+        log("circuit_breaker_transition",
+            breaker=self.name,
+            state=state.value,
+            consecutive_failures=self.consecutive_failures,
+            error=self.last_error)
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Process-wide breaker for one upstream, e.g. "apify:streamers~youtube-comments-scraper"."""
+    if name not in _breakers:
+        _breakers[name] = CircuitBreaker(name)
+    return _breakers[name]
+
+
+def breaker_states() -> Dict[str, dict]:
+    return {name: breaker.snapshot() for name, breaker in sorted(_breakers.items())}
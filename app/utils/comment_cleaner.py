@@ -1,11 +1,108 @@
+import asyncio
+import multiprocessing
 import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from typing import List, Optional
-from app.models.schemas import Platform, CleanedComment
+from app.config import settings
+from app.models.schemas import Platform
+from app.models.records import CommentRecord
+from app.utils.metrics import span
+
+# Where each platform's scraper puts the comment text
+PLATFORM_TEXT_FIELDS = {
+    Platform.YOUTUBE: "comment",
+    Platform.FACEBOOK: "text",
+    Platform.TWITTER: "text",
+    Platform.INSTAGRAM: "text"
+}
+TIMESTAMP_FIELDS = ("date", "publishedTimeText", "created_at")
+ID_FIELDS = {
+    Platform.YOUTUBE: "cid",
+    Platform.FACEBOOK: "id",
+    Platform.TWITTER: "id",
+    Platform.INSTAGRAM: "id"
+}
+
+# Repeated emoji (with optional variation selector / skin tone) collapse to one
+EMOJI_RUN_PATTERN = re.compile(
+    r'([\U0001F300-\U0001FAFF\u2600-\u27BF][\uFE0F\U0001F3FB-\U0001F3FF]?)\1+'
+)
+MENTION_PATTERN = re.compile(r'(?<!\w)@\w+')
+HASHTAG_PATTERN = re.compile(r'(?<!\w)#(\w+)')
+
+
+@dataclass(slots=True)
+class CleaningOptions:
+    normalize_emoji: bool = False     # "😂😂😂" -> "😂"
+    normalize_mentions: bool = False  # "@someone" -> "@user"
+    normalize_hashtags: bool = False  # "#GreatVideo" -> "GreatVideo"
+    min_length: int = 3
+
+    @classmethod
+    def from_settings(cls) -> "CleaningOptions":
+        return cls(
+            normalize_emoji=settings.CLEAN_NORMALIZE_EMOJI,
+            normalize_mentions=settings.CLEAN_NORMALIZE_MENTIONS,
+            normalize_hashtags=settings.CLEAN_NORMALIZE_HASHTAGS
+        )
+
+
+def _clean_texts(texts: List[Optional[str]], options: CleaningOptions) -> List[Optional[str]]:
+    """Clean a chunk of raw texts; invalid ones come back as None.
+
+    Module-level so chunks can be shipped to a process pool. Only plain
+    strings cross the process boundary, never the raw scraper items.
+    """
+    url_sub = CommentCleaner.URL_PATTERN.sub
+    emoji_sub = EMOJI_RUN_PATTERN.sub if options.normalize_emoji else None
+    mention_sub = MENTION_PATTERN.sub if options.normalize_mentions else None
+    hashtag_sub = HASHTAG_PATTERN.sub if options.normalize_hashtags else None
+    min_length = options.min_length
+
+    cleaned = []
+    append = cleaned.append
+    for text in texts:
+        if not text:
+            append(None)
+            continue
+        # Most comments carry no link, so skip the URL regex for them
+        if "http" in text:
+            text = url_sub('', text)
+        if emoji_sub:
+            text = emoji_sub(r'\1', text)
+        if mention_sub:
+            text = mention_sub('@user', text)
+        if hashtag_sub:
+            text = hashtag_sub(r'\1', text)
+        # split() uses the same whitespace set as `\s`, and strips in the same pass
+        text = " ".join(text.split())
+        append(text if len(text) >= min_length else None)
+    return cleaned
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_executor() -> Optional[ProcessPoolExecutor]:
+    global _executor
+    if _executor is None and settings.CLEAN_WORKERS > 0:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.CLEAN_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def shutdown_pool() -> None:
+    global _executor
+    if _executor:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
 
 
 class CommentCleaner:
     URL_PATTERN = re.compile(r'https?://[^\s]+')
-    WHITESPACE_PATTERN = re.compile(r'\s+')
 
     @staticmethod
     def extract_comment_text(data: dict, platform: Platform) -> Optional[str]:
@@ -14,7 +111,7 @@ class CommentCleaner:
             return data.get("comment")
         elif platform in [Platform.FACEBOOK, Platform.TWITTER, Platform.INSTAGRAM]:
             return data.get("text")
-        
+
         # Fallback checks
         for field in ["comment", "text", "content", "message"]:
             if field in data and isinstance(data[field], str):
@@ -24,14 +121,7 @@ class CommentCleaner:
     @staticmethod
     def clean_text(text: str) -> str:
         """Clean text by removing URLs and normalizing whitespace."""
-        # Remove URLs
-        text = CommentCleaner.URL_PATTERN.sub('', text)
-        
-        # Normalize whitespace
-        text = CommentCleaner.WHITESPACE_PATTERN.sub(' ', text)
-        
-        # Strip leading/trailing whitespace
-        return text.strip()
+        return _clean_texts([text], CleaningOptions(min_length=0))[0] or ""
 
     @staticmethod
     def is_valid_comment(text: str, min_length: int = 3) -> bool:
@@ -41,48 +131,98 @@ class CommentCleaner:
         return len(text.strip()) >= min_length
 
     @staticmethod
-    def process_comments(items: List[dict], platform: Platform) -> List[CleanedComment]:
+    def process_comments(
+        items: List[dict],
+        platform: Platform,
+        options: Optional[CleaningOptions] = None
+    ) -> List[CommentRecord]:
         """Process raw comments into cleaned, validated comments."""
-        cleaned_comments = []
-        
-        for idx, item in enumerate(items):
-            # Extract comment text
-            text = CommentCleaner.extract_comment_text(item, platform)
-            if not text:
-                continue
-                
-            # Clean and validate text
-            cleaned_text = CommentCleaner.clean_text(text)
-            if not CommentCleaner.is_valid_comment(cleaned_text):
-                continue
-            
-            # Extract timestamp
-            timestamp = (
-                item.get("date") or 
-                item.get("publishedTimeText") or 
-                item.get("created_at")
-            )
-            
-            # Create cleaned comment
-            comment = CleanedComment(
-                comment=cleaned_text,
-                platform=platform.value,
-                originalIndex=idx,
-                timestamp=timestamp
+        with span("clean"):
+            options = options or CleaningOptions.from_settings()
+            texts, timestamps, ids = CommentCleaner._extract(items, platform)
+            return CommentCleaner._build_records(_clean_texts(texts, options), timestamps, ids, platform)
+
+    @staticmethod
+    async def process_comments_async(
+        items: List[dict],
+        platform: Platform,
+        options: Optional[CleaningOptions] = None
+    ) -> List[CommentRecord]:
+        """Like `process_comments`, but keeps large inputs off the event loop.
+
+        Inputs above CLEAN_PARALLEL_THRESHOLD are cleaned in chunks on a
+        process pool (or a worker thread when CLEAN_WORKERS is 0).
+        """
+        if len(items) < settings.CLEAN_PARALLEL_THRESHOLD:
+            return CommentCleaner.process_comments(items, platform, options)
+
+        with span("clean"):
+            options = options or CleaningOptions.from_settings()
+            texts, timestamps, ids = CommentCleaner._extract(items, platform)
+            executor = _get_executor()
+            if executor is None:
+                cleaned = await asyncio.to_thread(_clean_texts, texts, options)
+            else:
+                loop = asyncio.get_running_loop()
+                chunk_size = settings.CLEAN_CHUNK_SIZE
+                chunks = await asyncio.gather(*[
+                    loop.run_in_executor(executor, _clean_texts, texts[i:i + chunk_size], options)
+                    for i in range(0, len(texts), chunk_size)
+                ])
+                cleaned = [text for chunk in chunks for text in chunk]
+            return CommentCleaner._build_records(cleaned, timestamps, ids, platform)
+
+    @staticmethod
+    def _extract(items: List[dict], platform: Platform):
+        """Pull texts, timestamps and ids with field names resolved once per call."""
+        field = PLATFORM_TEXT_FIELDS.get(platform)
+        if field:
+            texts = [item.get(field) for item in items]
+        else:
+            texts = [CommentCleaner.extract_comment_text(item, platform) for item in items]
+
+        # An actor uses one timestamp key for all its items; probe only the first
+        timestamp_field = next((f for f in TIMESTAMP_FIELDS if items and items[0].get(f)), None)
+        if timestamp_field:
+            timestamps = [item.get(timestamp_field) for item in items]
+        else:
+            timestamps = [
+                item.get("date") or item.get("publishedTimeText") or item.get("created_at")
+                for item in items
+            ]
+        id_field = ID_FIELDS.get(platform, "id")
+        ids = [item.get(id_field) for item in items]
+        return texts, timestamps, ids
+
+    @staticmethod
+    def _build_records(
+        cleaned: List[Optional[str]],
+        timestamps: List[Optional[str]],
+        ids: List[Optional[str]],
+        platform: Platform
+    ) -> List[CommentRecord]:
+        platform_value = platform.value
+        return [
+            CommentRecord(
+                text,
+                platform_value,
+                idx,
+                timestamps[idx],
+                str(ids[idx]) if ids[idx] is not None else None
             )
-            cleaned_comments.append(comment)
-            
-        return cleaned_comments
+            for idx, text in enumerate(cleaned)
+            if text is not None
+        ]
 
     @staticmethod
-    def aggregate_comments(comments: List[CleanedComment]) -> str:
+    def aggregate_comments(comments: List[CommentRecord]) -> str:
         """Join comment texts for batch processing."""
         return ", ".join(comment.comment for comment in comments)
 
     @staticmethod
-    def chunk_comments(comments: List[CleanedComment], batch_size: int) -> List[List[CleanedComment]]:
+    def chunk_comments(comments: List[CommentRecord], batch_size: int) -> List[List[CommentRecord]]:
         """Split comments into batches."""
         return [
-            comments[i:i + batch_size] 
+            comments[i:i + batch_size]
             for i in range(0, len(comments), batch_size)
         ]
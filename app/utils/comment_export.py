@@ -0,0 +1,60 @@
+import csv
+import io
+import json
+from typing import Dict, Iterable, Iterator, List
+
+COMMENT_EXPORT_FIELDS = ["text", "sentiment", "justification", "timestamp", "originalIndex", "platform", "url"]
+
+# Rows per yielded chunk; keeps the number of tiny writes down without buffering the export
+CHUNK_ROWS = 500
+
+
+def iter_csv(rows: Iterable[Dict]) -> Iterator[str]:
+    """Yield CSV text in chunks, one row per comment."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=COMMENT_EXPORT_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_ndjson(rows: Iterable[Dict]) -> Iterator[str]:
+    """Yield newline-delimited JSON in chunks, one object per comment."""
+    chunk: List[str] = []
+    for row in rows:
+        chunk.append(json.dumps({field: row.get(field) for field in COMMENT_EXPORT_FIELDS}, ensure_ascii=False))
+        if len(chunk) >= CHUNK_ROWS:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+
+def write_parquet(rows: List[Dict], row_group_size: int = 50_000) -> bytes:
+    """Write rows as a Parquet file (requires the optional `pyarrow` package)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("text", pa.string()),
+        ("sentiment", pa.dictionary(pa.int8(), pa.string())),
+        ("justification", pa.string()),
+        ("timestamp", pa.string()),
+        ("originalIndex", pa.int64()),
+        ("platform", pa.dictionary(pa.int8(), pa.string())),
+        ("url", pa.dictionary(pa.int32(), pa.string()))
+    ])
+    sink = io.BytesIO()
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+        for start in range(0, len(rows), row_group_size):
+            chunk = rows[start:start + row_group_size]
+            columns = {field: [row.get(field) for row in chunk] for field in COMMENT_EXPORT_FIELDS}
+            # Scrapers pass timestamps through as-is (text, or epoch numbers)
+            columns["timestamp"] = [str(value) if value is not None else None for value in columns["timestamp"]]
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+    return sink.getvalue()
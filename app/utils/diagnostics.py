@@ -0,0 +1,180 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from typing import Deque, Dict, List, Optional
+
+import structlog
+
+from app.utils.metrics import REGISTRY
+
+logger = structlog.get_logger()
+
+LOOP_LAG = REGISTRY.histogram(
+    "event_loop_lag_seconds",
+    "Delay between scheduled and actual event loop wake-ups",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+LOOP_STALLS = REGISTRY.counter(
+    "event_loop_stalls_total", "Event loop stalls longer than the block threshold"
+)
+
+
+class LoopMonitor:
+    """Measures event-loop lag and captures the stack of whatever blocks it.
+
+    A heartbeat coroutine ticks every `interval` seconds, or a quarter of
+    `block_threshold` if that is shorter, and records how late it wakes up.
+    Any block longer than the threshold therefore keeps the loop from ticking
+    for longer than the threshold. A watchdog thread checks the heartbeat and,
+    while such a gap is in progress, snapshots the loop thread's current stack,
+    which is the code holding the loop at that moment. The heartbeat records
+    the gaps the watchdog did not catch in time, without a stack.
+    """
+
+    def __init__(self, interval: float = 0.5, block_threshold: float = 0.25, history: int = 50):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.stalls: Deque[Dict] = deque(maxlen=history)
+        self.max_lag = 0.0
+        self.last_lag = 0.0
+        self._last_beat = time.perf_counter()
+        self._reported_beat: Optional[float] = None
+        self._open_stall: Optional[Dict] = None
+        self._stall_lock = threading.Lock()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info("loop_monitor_started",
+                   interval=self.interval,
+                   block_threshold=self.block_threshold)
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog:
+            self._watchdog.join(timeout=1.0)
+
+    @property
+    def tick(self) -> float:
+        return min(self.interval, self.block_threshold / 4)
+
+    async def _heartbeat(self) -> None:
+        tick = self.tick
+        while True:
+            expected = time.perf_counter() + tick
+            await asyncio.sleep(tick)
+            now = time.perf_counter()
+            lag = max(0.0, now - expected)
+            beat = self._last_beat
+            self._last_beat = now
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            LOOP_LAG.observe(lag)
+            if now - beat >= self.block_threshold:
+                self._close_stall(beat, now - beat)
+
+    def _close_stall(self, beat: float, blocked_for: float) -> None:
+        """Settle the gap that ended at this tick: finish the watchdog's record or add one."""
+        with self._stall_lock:
+            if beat == self._reported_beat and self._open_stall is not None:
+                self._open_stall["blockedFor"] = round(blocked_for, 4)
+                self._open_stall = None
+                return
+            self._reported_beat = beat
+        self.stalls.append({"timestamp": time.time(), "blockedFor": round(blocked_for, 4), "stack": []})
+        LOOP_STALLS.inc()
+        logger.warning("event_loop_blocked", blocked_for=round(blocked_for, 4))
+
+    def _watch(self) -> None:
+        poll = max(self.tick / 2, 0.01)
+        while not self._stop.wait(poll):
+            beat = self._last_beat
+            blocked_for = time.perf_counter() - beat
+            # Report each stall once, while it is still in progress
+            if blocked_for < self.block_threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = traceback.format_stack(frame) if frame else []
+            stall = {
+                "timestamp": time.time(),
+                "blockedFor": round(blocked_for, 4),
+                "stack": [line.rstrip() for line in stack]
+            }
+            with self._stall_lock:
+                if beat == self._reported_beat or beat != self._last_beat:
+                    continue
+                self._reported_beat = beat
+                self._open_stall = stall
+            self.stalls.append(stall)
+            LOOP_STALLS.inc()
+            logger.warning("event_loop_blocked",
+                          blocked_for=stall["blockedFor"],
+                          stack="".join(stack[-8:]))
+
+    def snapshot(self) -> Dict:
+        return {
+            "lastLag": self.last_lag,
+            "maxLag": self.max_lag,
+            "interval": self.interval,
+            "tick": self.tick,
+            "blockThreshold": self.block_threshold,
+            "recentStalls": list(self.stalls)
+        }
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def sample_stacks(duration: float, interval: float = 0.005) -> str:
+    """Sample all thread stacks for `duration` seconds.
+
+    Returns collapsed stacks (`thread;outer;...;inner count` per line), the
+    input format of flamegraph.pl and speedscope.
+    """
+    own_id = threading.get_ident()
+    names = {t.ident: t.name for t in threading.enumerate()}
+    counts: Counter = Counter()
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack: List[str] = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(names.get(thread_id, str(thread_id)).replace(" ", "_"))
+            counts[";".join(reversed(stack))] += 1
+        time.sleep(interval)
+    return "\n".join(f"{stack} {count}" for stack, count in counts.most_common()) + "\n"
+
+
+loop_monitor: Optional[LoopMonitor] = None
+
+
+def start_loop_monitor(interval: float, block_threshold: float) -> LoopMonitor:
+    """Start the process-wide loop monitor on the running loop."""
+    global loop_monitor
+    loop_monitor = LoopMonitor(interval=interval, block_threshold=block_threshold)
+    loop_monitor.start()
+    return loop_monitor
@@ -0,0 +1,62 @@
+import json
+import re
+from typing import Any, List
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class JSONArrayStream:
+    """Incremental parser for one top-level JSON array arriving in chunks.
+
+    `feed()` returns the elements completed by each chunk, so a large array
+    (e.g. an Apify dataset page) is decoded while it downloads instead of
+    being buffered whole first. Elements are decoded with the stdlib
+    decoder; only an element still incomplete at the end of a chunk is kept
+    in the buffer.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._started = False
+        self._finished = False
+
+    @property
+    def finished(self) -> bool:
+        return self._finished
+
+    def feed(self, chunk: str) -> List[Any]:
+        buffer = self._buffer + chunk
+        items = []
+        position = 0
+        while not self._finished:
+            position = WHITESPACE.match(buffer, position).end()
+            if position == len(buffer):
+                break
+            char = buffer[position]
+            if not self._started:
+                if char != "[":
+                    raise ValueError(f"Expected a JSON array, got {char!r}")
+                self._started = True
+                position += 1
+            elif char == "]":
+                self._finished = True
+                position += 1
+            elif char == ",":
+                position += 1
+            else:
+                try:
+                    item, end = self._decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    break  # Element continues in the next chunk
+                if end == len(buffer) and not isinstance(item, (dict, list)):
+                    break  # A number or literal may be cut off mid-token
+                items.append(item)
+                position = end
+        self._buffer = buffer[position:]
+        return items
+
+    def close(self) -> None:
+        """Raise if the array was truncated."""
+        if not self._finished:
+            raise ValueError("Truncated JSON array")
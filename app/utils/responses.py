@@ -0,0 +1,51 @@
+from typing import Any, Dict, Optional
+
+from fastapi import Response
+from pydantic import BaseModel
+
+FieldSpec = Dict[str, Any]
+
+
+def parse_field_paths(value: Optional[str]) -> Optional[FieldSpec]:
+    """Turn `allComments,postContext.captions` into a pydantic include/exclude dict."""
+    if not value:
+        return None
+    spec: FieldSpec = {}
+    for path in value.split(","):
+        parts = [part for part in path.strip().split(".") if part]
+        if not parts:
+            continue
+        node = spec
+        for part in parts[:-1]:
+            child = node.get(part)
+            if child is True:
+                break
+            node = node.setdefault(part, {})
+        else:
+            node[parts[-1]] = True
+    return spec or None
+
+
+class ModelJSONResponse(Response):
+    """JSON response rendered straight from a pydantic model.
+
+    Uses pydantic's compiled `model_dump_json`, skipping the dict round trip
+    through `jsonable_encoder` and the stdlib encoder that FastAPI's default
+    response path does for `response_model` endpoints.
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: BaseModel,
+        include: Optional[FieldSpec] = None,
+        exclude: Optional[FieldSpec] = None,
+        **kwargs
+    ):
+        self.include = include
+        self.exclude = exclude
+        super().__init__(content, **kwargs)
+
+    def render(self, content: BaseModel) -> bytes:
+        return content.model_dump_json(include=self.include, exclude=self.exclude).encode("utf-8")
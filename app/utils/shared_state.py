@@ -0,0 +1,257 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import structlog
+
+from app.config import settings
+
+logger = structlog.get_logger()
+
+
+class SharedState(ABC):
+    """State shared by every worker process of a multi-worker deployment.
+
+    Holds expiring byte-string entries (cache tiers), expiring counters
+    (usage limits) and leased slots (concurrency budgets). Calls block, so
+    async code runs them in a thread.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def incr(self, key: str, ttl: float, initial: int = 0) -> int:
+        """Add one to a counter (created at `initial`, expiring after `ttl`) and return it."""
+
+    @abstractmethod
+    def acquire(self, name: str, holder: str, limit: int, lease: float) -> bool:
+        """Take one of `limit` slots of `name` for `lease` seconds, if one is free."""
+
+    @abstractmethod
+    def renew(self, name: str, holder: str, lease: float) -> None:
+        ...
+
+    @abstractmethod
+    def release(self, name: str, holder: str) -> None:
+        ...
+
+
+class SQLiteSharedState(SharedState):
+    """Shared state in one SQLite file, for the workers of a single host.
+
+    Slot and counter updates run in immediate transactions, which SQLite
+    serializes across processes; WAL mode keeps readers off the writers' lock.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB, expires_at REAL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_expiry ON entries (expires_at)")
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (key TEXT PRIMARY KEY, value INTEGER, expires_at REAL)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS slots ("
+                "name TEXT, holder TEXT, expires_at REAL, PRIMARY KEY (name, holder))"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=5.0)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM entries WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, now + ttl)
+            )
+            conn.execute("DELETE FROM entries WHERE expires_at < ?", (now,))
+
+    def delete(self, key: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def incr(self, key: str, ttl: float, initial: int = 0) -> int:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM counters WHERE expires_at < ?", (now,))
+            conn.execute(
+                "INSERT OR IGNORE INTO counters (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, initial, now + ttl)
+            )
+            conn.execute("UPDATE counters SET value = value + 1 WHERE key = ?", (key,))
+            return conn.execute("SELECT value FROM counters WHERE key = ?", (key,)).fetchone()[0]
+
+    def acquire(self, name: str, holder: str, limit: int, lease: float) -> bool:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM slots WHERE name = ? AND expires_at < ?", (name, now))
+            (held,) = conn.execute("SELECT COUNT(*) FROM slots WHERE name = ?", (name,)).fetchone()
+            if held >= limit:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO slots (name, holder, expires_at) VALUES (?, ?, ?)",
+                (name, holder, now + lease)
+            )
+            return True
+
+    def renew(self, name: str, holder: str, lease: float) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE slots SET expires_at = ? WHERE name = ? AND holder = ?",
+                (time.time() + lease, name, holder)
+            )
+
+    def release(self, name: str, holder: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM slots WHERE name = ? AND holder = ?", (name, holder))
+
+
+# Creates a counter at ARGV[1] unless it exists, then increments it
+INCR_SCRIPT = """
+redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2])
+return redis.call('INCR', KEYS[1])
+"""
+
+# Drops lapsed leases, then adds the holder if the budget has a free slot
+ACQUIRE_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then return 0 end
+redis.call('ZADD', KEYS[1], tonumber(ARGV[1]) + tonumber(ARGV[4]), ARGV[2])
+redis.call('PEXPIRE', KEYS[1], math.ceil(tonumber(ARGV[4]) * 1000))
+return 1
+"""
+
+
+class RedisSharedState(SharedState):
+    """Shared state on a Redis-compatible server, for workers on several hosts
+    (needs the optional `redis` package).
+
+    Entries and counters are plain keys with a TTL; each budget is a sorted
+    set of holders scored by their lease expiry.
+    """
+
+    def __init__(self, prefix: str):
+        import redis
+
+        self.redis = redis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=settings.REDIS_DB,
+            password=settings.REDIS_PASSWORD
+        )
+        self.prefix = prefix
+        self._incr = self.redis.register_script(INCR_SCRIPT)
+        self._acquire = self.redis.register_script(ACQUIRE_SCRIPT)
+
+    def _key(self, kind: str, name: str) -> str:
+        return f"{self.prefix}:{kind}:{name}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.redis.get(self._key("entry", key))
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.redis.set(self._key("entry", key), value, px=max(int(ttl * 1000), 1))
+
+    def delete(self, key: str) -> None:
+        self.redis.delete(self._key("entry", key))
+
+    def incr(self, key: str, ttl: float, initial: int = 0) -> int:
+        return int(self._incr(keys=[self._key("counter", key)], args=[initial, max(int(ttl * 1000), 1)]))
+
+    def acquire(self, name: str, holder: str, limit: int, lease: float) -> bool:
+        return bool(self._acquire(keys=[self._key("slots", name)], args=[time.time(), holder, limit, lease]))
+
+    def renew(self, name: str, holder: str, lease: float) -> None:
+        self.redis.zadd(self._key("slots", name), {holder: time.time() + lease}, xx=True)
+
+    def release(self, name: str, holder: str) -> None:
+        self.redis.zrem(self._key("slots", name), holder)
+
+
+class SharedCache:
+    """Cache tier on the shared state under one namespace.
+
+    Backend errors are logged and count as misses, so an unreachable store
+    degrades to per-process caching instead of failing requests.
+    """
+
+    def __init__(self, state: SharedState, namespace: str):
+        self.state = state
+        self.namespace = namespace
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self.state.get(f"{self.namespace}:{key}")
+        except Exception as e:
+            logger.warning("shared_cache_read_failed", cache=self.namespace, error=str(e))
+            return None
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        try:
+            self.state.set(f"{self.namespace}:{key}", value, ttl)
+        except Exception as e:
+            logger.warning("shared_cache_write_failed", cache=self.namespace, error=str(e))
+
+    def delete(self, key: str) -> None:
+        try:
+            self.state.delete(f"{self.namespace}:{key}")
+        except Exception as e:
+            logger.warning("shared_cache_delete_failed", cache=self.namespace, error=str(e))
+
+
+_shared_state: Optional[SharedState] = None
+_shared_state_lock = threading.Lock()
+
+
+def get_shared_state() -> Optional[SharedState]:
+    """The shared state for SHARED_STATE_BACKEND; None for "local" (per-process state)."""
+    global _shared_state
+    if settings.SHARED_STATE_BACKEND == "local":
+        return None
+    with _shared_state_lock:
+        if _shared_state is None:
+            if settings.SHARED_STATE_BACKEND == "sqlite":
+                db_path = settings.SHARED_STATE_DB or os.path.join(tempfile.gettempdir(), "sentiment_shared_state.db")
+                _shared_state = SQLiteSharedState(db_path)
+            elif settings.SHARED_STATE_BACKEND == "redis":
+                _shared_state = RedisSharedState(settings.SHARED_STATE_PREFIX)
+            else:
+                raise ValueError(f"Unknown shared state backend: {settings.SHARED_STATE_BACKEND}")
+    return _shared_state
+
+
+def shared_cache(namespace: str) -> Optional[SharedCache]:
+    """A shared cache tier for `namespace`, or None without a shared backend."""
+    state = get_shared_state()
+    return SharedCache(state, namespace) if state else None
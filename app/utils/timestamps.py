@@ -0,0 +1,190 @@
+import re
+from datetime import datetime, timezone
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+# "3 hours ago", "2 days ago (edited)", "Streamed 1 week ago"
+RELATIVE_TIME_PATTERN = re.compile(r'(\d+)\s*(second|minute|hour|day|week|month|year)s?\s+ago', re.I)
+UNIT_SECONDS = {
+    "second": 1, "minute": 60, "hour": 3600, "day": 86400,
+    "week": 7 * 86400, "month": 30 * 86400, "year": 365 * 86400
+}
+MONTH_NAMES = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+# Three-letter month names packed into one integer each, sorted for searchsorted
+_MONTH_KEYS = np.array([(ord(a) << 16) | (ord(b) << 8) | ord(c) for a, b, c in MONTH_NAMES])
+_MONTH_ORDER = np.argsort(_MONTH_KEYS)
+
+# Columns kept per timestamp: enough for ISO with a nanosecond fraction and
+# offset, and for Twitter's "Wed Oct 10 20:19:24 +0000 2018". Longer strings
+# are truncated and never parse as ISO
+WIDTH = 40
+TWITTER_LENGTH = 30
+
+
+def normalize_timestamps(
+    timestamps: Sequence[Optional[str]],
+    now: Optional[datetime] = None
+) -> np.ndarray:
+    """Convert scraped timestamps to epoch seconds (float64, NaN when unusable).
+
+    Handles ISO 8601 ("2024-05-01T10:00:00.000Z", offsets, date-only),
+    Twitter-style, relative ("3 hours ago") and numeric epoch values. The
+    fixed-layout formats are parsed all at once from a matrix of code points
+    with array arithmetic; only the rest (relative strings, which repeat
+    heavily) go through a regex, once per distinct string. Relative values
+    resolve against `now`, so they are only as precise as their unit.
+    """
+    if not len(timestamps):
+        return np.empty(0)
+    now_epoch = (now or datetime.now(timezone.utc)).timestamp()
+
+    # Characters by position: chars[i] is character i of every string (zero
+    # padded, truncated to WIDTH, non-ASCII folded to 0x7F), so each step
+    # below is one contiguous vector op
+    texts = [ts or "" for ts in timestamps]
+    code_points = np.array(texts, dtype=f"<U{WIDTH}").view(np.uint32).reshape(len(texts), WIDTH)
+    chars = np.ascontiguousarray(np.minimum(code_points, 0x7F).astype(np.uint8).T)
+    values = _parse_iso(chars)
+    rest = np.isnan(values)
+    if rest.any():
+        values[rest] = _parse_twitter(chars[:, rest])
+
+    rest = np.flatnonzero(np.isnan(values))
+    if len(rest):
+        parsed: Dict[str, float] = {}
+        values[rest] = [
+            parsed[ts] if ts in parsed else parsed.setdefault(ts, _parse_other(str(ts), now_epoch))
+            for ts in map(texts.__getitem__, rest.tolist())
+        ]
+    return values
+
+
+def _parse_other(ts: str, now_epoch: float) -> float:
+    match = RELATIVE_TIME_PATTERN.search(ts)
+    if match:
+        return now_epoch - int(match.group(1)) * UNIT_SECONDS[match.group(2).lower()]
+    if ts.isdigit():
+        epoch = int(ts)
+        return epoch / 1000 if epoch > 10**11 else epoch  # Milliseconds
+    return np.nan
+
+
+def _digits(chars: np.ndarray, start: int, stop: int):
+    """Return (characters start..stop-1 are all digits, their integer value)."""
+    valid = np.ones(chars.shape[1], dtype=bool)
+    value = np.zeros(chars.shape[1], dtype=np.int64)
+    for position in range(start, stop):
+        digit = chars[position] - ord("0")  # Unsigned: wraps around below "0"
+        valid &= digit <= 9
+        value = value * 10 + digit
+    return valid, value
+
+
+def _epoch_seconds(year, month, day, hour, minute, second) -> np.ndarray:
+    """Vectorized UTC epoch seconds; NaN where a field is out of range."""
+    months = ((year - 1970) * 12 + np.clip(month, 1, 12) - 1).astype("datetime64[M]")
+    month_start = months.astype("datetime64[D]").astype(np.int64)
+    month_length = (months + 1).astype("datetime64[D]").astype(np.int64) - month_start
+    valid = (
+        (month >= 1) & (month <= 12) & (day >= 1) & (day <= month_length)
+        & (hour < 24) & (minute < 60) & (second < 61)
+    )
+    days = month_start + day - 1
+    seconds = (days * 86400 + hour * 3600 + minute * 60 + second).astype(np.float64)
+    seconds[~valid] = np.nan
+    return seconds
+
+
+def _parse_iso(chars: np.ndarray) -> np.ndarray:
+    """ISO 8601 dates and date-times (fractions ignored, offsets applied); NaN otherwise."""
+    year_ok, year = _digits(chars, 0, 4)
+    month_ok, month = _digits(chars, 5, 7)
+    day_ok, day = _digits(chars, 8, 10)
+    is_date = year_ok & month_ok & day_ok & (chars[4] == ord("-")) & (chars[7] == ord("-"))
+
+    hour_ok, hour = _digits(chars, 11, 13)
+    minute_ok, minute = _digits(chars, 14, 16)
+    has_time = (
+        is_date & ((chars[10] == ord("T")) | (chars[10] == ord(" ")))
+        & hour_ok & minute_ok & (chars[13] == ord(":"))
+    )
+    second_ok, second = _digits(chars, 17, 19)
+    has_second = has_time & second_ok & (chars[16] == ord(":"))
+    date_only = is_date & (chars[10] == 0)
+
+    seconds = _epoch_seconds(
+        year, month, day,
+        np.where(has_time, hour, 0), np.where(has_time, minute, 0), np.where(has_second, second, 0)
+    )
+    seconds[~(has_time | date_only) | (chars[WIDTH - 1] != 0)] = np.nan
+
+    # After the time: an optional ".fraction", then "Z", "+05:30", "+0530",
+    # "+05" or nothing (UTC), then the end of the string
+    index = np.flatnonzero(has_time & ~np.isnan(seconds))
+    if not len(index):
+        return seconds
+
+    def char(at: np.ndarray) -> np.ndarray:
+        return chars[np.minimum(at, WIDTH - 1), index]
+
+    def is_digit(at: np.ndarray) -> np.ndarray:
+        return (char(at) - ord("0")).astype(np.uint8) <= 9
+
+    def number(at: np.ndarray) -> np.ndarray:
+        return (char(at).astype(np.int64) - ord("0")) * 10 + char(at + 1) - ord("0")
+
+    at = np.where(has_second[index], 19, 16)
+    in_fraction = char(at) == ord(".")
+    at = at + in_fraction
+    while in_fraction.any():
+        in_fraction &= is_digit(at)
+        at = at + in_fraction
+
+    is_zulu = char(at) == ord("Z")
+    is_sign = (char(at) == ord("+")) | (char(at) == ord("-"))
+    hours_ok = is_digit(at + 1) & is_digit(at + 2)
+    colon = char(at + 3) == ord(":")
+    minute_at = at + 3 + colon
+    has_minutes = is_digit(minute_at) & is_digit(minute_at + 1)
+    offset_hours = number(at + 1)
+    offset_minutes = np.where(has_minutes, number(minute_at), 0)
+    offset_end = np.where(has_minutes, minute_at + 2, at + 3)
+    offset_ok = (
+        is_sign & hours_ok & (has_minutes | ~colon)
+        & (offset_hours < 24) & (offset_minutes < 60) & (char(offset_end) == 0)
+    )
+    valid = (char(at) == 0) | (is_zulu & (char(at + 1) == 0)) | offset_ok
+
+    direction = np.where(char(at) == ord("+"), 1, -1)
+    offset = np.where(offset_ok, direction * (offset_hours * 3600 + offset_minutes * 60), 0)
+    seconds[index] = np.where(valid, seconds[index] - offset, np.nan)
+    return seconds
+
+
+def _parse_twitter(chars: np.ndarray) -> np.ndarray:
+    """Twitter v1 "Wed Oct 10 20:19:24 +0000 2018"; NaN otherwise."""
+    day_ok, day = _digits(chars, 8, 10)
+    hour_ok, hour = _digits(chars, 11, 13)
+    minute_ok, minute = _digits(chars, 14, 16)
+    second_ok, second = _digits(chars, 17, 19)
+    offset_ok, offset = _digits(chars, 21, 25)
+    year_ok, year = _digits(chars, 26, 30)
+
+    month_key = (chars[4].astype(np.int64) << 16) | (chars[5].astype(np.int64) << 8) | chars[6]
+    sorted_keys = _MONTH_KEYS[_MONTH_ORDER]
+    position = np.minimum(np.searchsorted(sorted_keys, month_key), len(MONTH_NAMES) - 1)
+    month_ok = sorted_keys[position] == month_key
+    month = _MONTH_ORDER[position] + 1
+
+    is_twitter = (
+        day_ok & hour_ok & minute_ok & second_ok & offset_ok & year_ok & month_ok
+        & (chars[TWITTER_LENGTH - 1] != 0) & (chars[TWITTER_LENGTH] == 0)
+        & (chars[13] == ord(":")) & (chars[16] == ord(":"))
+        & ((chars[20] == ord("+")) | (chars[20] == ord("-")))
+    )
+    seconds = _epoch_seconds(year, month, day, hour, minute, second)
+    direction = np.where(chars[20] == ord("+"), 1, -1)
+    seconds -= direction * ((offset // 100) * 3600 + (offset % 100) * 60)
+    seconds[~is_twitter] = np.nan
+    return seconds
@@ -0,0 +1,37 @@
+import zipfile
+from typing import AsyncIterator, List, Tuple
+
+
+class _ChunkSink:
+    """Write-only, unseekable file object that collects written chunks.
+
+    zipfile detects the missing tell/seek and falls back to streaming mode
+    (local headers with data descriptors), so the archive can be sent as it
+    is built.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def stream_zip(entries: AsyncIterator[Tuple[str, bytes]]) -> AsyncIterator[bytes]:
+    """Yield a ZIP archive incrementally as `(name, data)` entries arrive."""
+    sink = _ChunkSink()
+    # PDFs are already compressed internally, so entries are stored as-is
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        async for name, data in entries:
+            archive.writestr(name, data)
+            yield sink.drain()
+    yield sink.drain()
@@ -0,0 +1,31 @@
+"""Batch worker process for BATCH_QUEUE_BACKEND=redis: `python -m app.worker`.
+
+Consumes model batches published by API processes. Workers hold no request
+state, so any number can run against the same queue.
+"""
+import asyncio
+import signal
+
+import structlog
+
+from app.config import settings
+from app.services.batch_queue import get_batch_queue
+from app.services.batch_worker import BatchWorker
+
+logger = structlog.get_logger()
+
+
+async def main() -> None:
+    worker = BatchWorker(get_batch_queue(), settings.BATCH_WORKER_CONCURRENCY)
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+    await worker.start()
+    await stopping.wait()
+    # Batches still running are not acked and get redelivered to other workers
+    await worker.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,223 @@
+"""Load test for the multi-worker runtime in gunicorn.conf.py.
+
+Starts gunicorn on the real app with the Apify scrape and the model call
+faked, drives it with concurrent /analyze requests, then reads a sample of
+the stored results back through fresh connections (any worker may answer).
+Prints one line per worker count and shared state backend:
+
+    python benchmarks/multiworker_load.py --workers 1 2 4 8 --backends local sqlite
+
+The fake model call awaits --model-delay seconds and counts concurrent calls
+across all workers, so with the defaults the run is bound by
+--model-concurrency (MODEL_MAX_CONCURRENCY). A high --model-concurrency with
+a short --model-delay loads the CPU instead (cleaning, language ID and the
+summary), which is the run that shows scaling across cores. Nothing leaves
+the machine; the redis backend needs a server at REDIS_HOST.
+"""
+import argparse
+import asyncio
+import fcntl
+import json
+import os
+import random
+import signal
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATS_FORMAT = "3q"  # In-flight model calls, their peak, total calls
+WORDS = ["great", "bad", "wow", "lol", "nice", "terrible", "love", "hate", "the", "video", "is", "😀", "👍"]
+
+
+def _bump(delta: int) -> None:
+    with open(os.environ["BENCH_STATS"], "r+b") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        current, peak, total = struct.unpack(STATS_FORMAT, f.read(struct.calcsize(STATS_FORMAT)))
+        current += delta
+        f.seek(0)
+        f.write(struct.pack(STATS_FORMAT, current, max(peak, current), total + (delta > 0)))
+
+
+def create_app():
+    """The app with fake scrapes and model calls; gunicorn calls this in each worker."""
+    from app.api.auth import get_current_user
+    from app.main import app
+    from app.models.schemas import Platform, PostContext, SentimentCategory
+    from app.services.model_providers import Completion, ImageInput, ModelProvider
+    from app.services.model_router import model_router
+    from app.services.scraper_service import ScraperService
+    from app.utils.ai_agent_logger import AIAgentLogger
+    from app.utils.comment_cleaner import CommentCleaner
+
+    model_delay = float(os.environ["BENCH_MODEL_DELAY"])
+    comment_count = int(os.environ["BENCH_COMMENTS"])
+    categories = [category.value for category in SentimentCategory]
+
+    class BenchmarkProvider(ModelProvider):
+        name = "gemini"
+
+        async def generate(self, model: str, prompt: str, image: Optional[ImageInput] = None) -> Completion:
+            _bump(1)
+            try:
+                await asyncio.sleep(model_delay)
+            finally:
+                _bump(-1)
+            body = prompt.split("Comments to analyze:\n", 1)[1].split("\n\n", 1)[0]
+            results = [
+                {"Comment": text, "Sentiment": categories[hash(text) % len(categories)], "Justification": "benchmark"}
+                for text in body.split(", ")
+            ]
+            return Completion(
+                text=json.dumps(results, ensure_ascii=False),
+                model=model,
+                provider=self.name,
+                inputTokens=len(prompt) // 4,
+                outputTokens=20 * len(results)
+            )
+
+    async def scrape_platform(self, url, platform, *args, **kwargs):
+        rng = random.Random(url)
+        items = [
+            {
+                "comment": " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 25))) + f" #{index}",
+                "publishedTimeText": f"{rng.randint(1, 23)} hours ago",
+                "cid": str(index)
+            }
+            for index in range(comment_count)
+        ]
+        context = PostContext(platform=Platform.YOUTUBE, title="Benchmark", description="", captions="")
+        return context, CommentCleaner.process_comments(items, Platform.YOUTUBE)
+
+    model_router.providers = [BenchmarkProvider()]
+    ScraperService.scrape_platform = scrape_platform
+    AIAgentLogger.log_analysis_session = lambda self, **kwargs: None
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(
+        clerk_id="benchmark", email="benchmark@example.com", plan_type="free"
+    )
+    return app
+
+
+async def _load(base: str, args: argparse.Namespace) -> dict:
+    import httpx
+
+    async with httpx.AsyncClient(timeout=60) as client:
+        for _ in range(300):
+            try:
+                if (await client.get(f"{base}/health")).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.1)
+        await asyncio.sleep(args.warmup)  # Give every worker time to boot
+
+    latencies: List[float] = []
+    result_ids: List[str] = []
+    errors = 0
+    stop = time.perf_counter() + args.duration
+
+    async def run_client(number: int) -> None:
+        nonlocal errors
+        async with httpx.AsyncClient(timeout=120) as client:
+            request = 0
+            while time.perf_counter() < stop:
+                start = time.perf_counter()
+                response = await client.post(
+                    f"{base}/api/v1/analyze",
+                    json={"url": f"https://www.youtube.com/watch?v=bench{number}x{request}"}
+                )
+                request += 1
+                if response.status_code != 200:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - start)
+                if len(result_ids) < args.export_checks:
+                    result_ids.append(response.json().get("resultId"))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run_client(number) for number in range(args.clients)))
+    elapsed = time.perf_counter() - started
+
+    exported = 0
+    for result_id in result_ids:
+        async with httpx.AsyncClient(timeout=30) as client:  # New connection, so any worker may answer
+            exported += (await client.get(f"{base}/api/v1/results/{result_id}")).status_code == 200
+
+    latencies.sort()
+    return {
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000) if latencies else None,
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000) if latencies else None,
+        "errors": errors,
+        "exported": f"{exported}/{len(result_ids)}"
+    }
+
+
+def run(workers: int, backend: str, args: argparse.Namespace) -> dict:
+    workdir = tempfile.mkdtemp(prefix="multiworker_load_")
+    stats_path = os.path.join(workdir, "stats.bin")
+    with open(stats_path, "wb") as f:
+        f.write(struct.pack(STATS_FORMAT, 0, 0, 0))
+    env = dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])),
+        HOST="127.0.0.1",
+        PORT=str(args.port),
+        WEB_CONCURRENCY=str(workers),
+        SHARED_STATE_BACKEND=backend,
+        SHARED_STATE_DB=os.path.join(workdir, "shared_state.db"),
+        MODEL_MAX_CONCURRENCY=str(args.model_concurrency),
+        WATCHLIST_ENABLED="false",
+        CLERK_SECRET_KEY="",  # No usage limit
+        BENCH_STATS=stats_path,
+        BENCH_MODEL_DELAY=str(args.model_delay),
+        BENCH_COMMENTS=str(args.comments)
+    )
+    env.setdefault("APIFY_API_TOKEN", "benchmark")
+    env.setdefault("GCP_PROJECT_ID", "benchmark")
+    with open(os.path.join(workdir, "gunicorn.log"), "w") as log:
+        server = subprocess.Popen(
+            [
+                sys.executable, "-m", "gunicorn", "benchmarks.multiworker_load:create_app()",
+                "-c", os.path.join(ROOT, "gunicorn.conf.py"), "--access-logfile", os.devnull
+            ],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=log
+        )
+        try:
+            result = asyncio.run(_load(f"http://127.0.0.1:{args.port}", args))
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(30)
+    with open(stats_path, "rb") as f:
+        _, peak, total = struct.unpack(STATS_FORMAT, f.read(struct.calcsize(STATS_FORMAT)))
+    return {"workers": workers, "backend": backend, **result, "model_calls": total, "peak_model_calls": peak}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--backends", nargs="+", default=["local", "sqlite"], choices=["local", "sqlite", "redis"])
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent request loops")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per run")
+    parser.add_argument("--comments", type=int, default=300, help="Comments per fake scrape")
+    parser.add_argument("--model-delay", type=float, default=0.2, help="Seconds per fake model call")
+    parser.add_argument("--model-concurrency", type=int, default=8, help="MODEL_MAX_CONCURRENCY")
+    parser.add_argument("--export-checks", type=int, default=60, help="Results read back by id")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Seconds to wait for workers to boot")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"cpus={os.cpu_count()} clients={args.clients} comments={args.comments} "
+          f"model_delay={args.model_delay}s model_concurrency={args.model_concurrency}")
+    for backend in args.backends:
+        for workers in args.workers:
+            print(json.dumps(run(workers, backend, args)), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""gunicorn settings for the multi-worker runtime: `gunicorn app.main:app -c gunicorn.conf.py`.
+
+Each worker is a uvicorn event loop with its own process pools. Budgets,
+usage counters and caches are per process unless SHARED_STATE_BACKEND is
+"sqlite" or "redis", so the default is one worker per CPU only with a shared
+backend and a single worker otherwise (WEB_CONCURRENCY overrides both).
+The watchlist scheduler runs inside each worker, so WATCHLIST_ENABLED pins
+the server to one worker.
+"""
+import multiprocessing
+
+from app.config import settings
+
+bind = f"{settings.HOST}:{settings.PORT}"
+worker_class = "uvicorn_worker.UvicornWorker"
+
+if settings.WATCHLIST_ENABLED:
+    # Every worker would run every due watchlist entry
+    if settings.WEB_CONCURRENCY and settings.WEB_CONCURRENCY > 1:
+        raise RuntimeError("WATCHLIST_ENABLED needs a single worker; unset WEB_CONCURRENCY or set it to 1")
+    workers = 1
+elif settings.WEB_CONCURRENCY:
+    workers = settings.WEB_CONCURRENCY
+elif settings.SHARED_STATE_BACKEND != "local":
+    workers = multiprocessing.cpu_count()
+else:
+    workers = 1
+
+# Long analyses stream their response, so only a stuck event loop (no
+# heartbeat for this long) gets a worker restarted
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+accesslog = "-"
@@ -0,0 +1,5 @@
+import os
+
+# Settings requires these; tests never reach Apify or Vertex AI
+os.environ.setdefault("APIFY_API_TOKEN", "test-token")
+os.environ.setdefault("GCP_PROJECT_ID", "test-project")
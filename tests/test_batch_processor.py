@@ -0,0 +1,50 @@
+from app.models.records import BatchOutcome, CommentRecord, SentimentRecord
+from app.models.schemas import SentimentCategory
+from app.utils.batch_processor import BatchProcessor
+
+
+def make_batch(texts):
+    return [CommentRecord(comment=text, platform="youtube", originalIndex=index) for index, text in enumerate(texts)]
+
+
+def make_outcome(texts, batch_number=0):
+    return BatchOutcome(
+        batchNumber=batch_number,
+        sentiments=[
+            SentimentRecord(Comment=text, Sentiment=SentimentCategory.APPRECIATIVE_PRAISING, Justification="")
+            for text in texts
+        ]
+    )
+
+
+def test_duplicate_texts_pair_with_separate_comments():
+    batch = make_batch(["🔥🔥", "first", "🔥🔥"])
+    pairs = BatchProcessor.pair_with_comments(batch, make_outcome(["🔥🔥", "first", "🔥🔥"]))
+    assert [source.originalIndex for source, _ in pairs] == [0, 1, 2]
+
+
+def test_extra_echo_is_dropped():
+    batch = make_batch(["🔥🔥", "first"])
+    pairs = BatchProcessor.pair_with_comments(batch, make_outcome(["🔥🔥", "🔥🔥", "first"]))
+    assert [source.originalIndex for source, _ in pairs] == [0, 1]
+
+
+def test_rewritten_text_falls_back_to_untaken_position():
+    batch = make_batch(["great video", "first"])
+    pairs = BatchProcessor.pair_with_comments(batch, make_outcome(["Great video!", "first"]))
+    assert [source.originalIndex for source, _ in pairs] == [0, 1]
+
+
+def test_duplicate_texts_count_as_labelled():
+    batches = [make_batch(["first", "🔥🔥", "🔥🔥"]), make_batch(["first", "first"])]
+    batch_results = [
+        make_outcome(["first", "🔥🔥", "🔥🔥"], batch_number=0),
+        make_outcome(["first", "first", "first"], batch_number=1)
+    ]
+    assert BatchProcessor.count_labelled(batches, batch_results) == 5
+
+
+def test_failed_batches_leave_comments_unlabelled():
+    batches = [make_batch(["first", "🔥🔥"]), make_batch(["🔥🔥"])]
+    failed = BatchOutcome(batchNumber=1, error="Deadline exceeded")
+    assert BatchProcessor.count_labelled(batches, [make_outcome(["first", "🔥🔥"]), failed]) == 2
@@ -0,0 +1,21 @@
+from app.models.records import SentimentRecord
+from app.models.schemas import SentimentCategory
+from app.services.sampling import estimate_proportions
+
+
+def label(category):
+    return SentimentRecord(Comment="", Sentiment=category, Justification="")
+
+
+def test_repeated_labels_of_one_comment_count_once():
+    strata = {0: (0, 0), 1: (0, 0)}
+    labelled = [
+        (0, label(SentimentCategory.APPRECIATIVE_PRAISING)),
+        (1, label(SentimentCategory.CRITICAL_DISAPPROVING)),
+        (1, label(SentimentCategory.CRITICAL_DISAPPROVING))
+    ]
+    estimates = estimate_proportions(labelled, strata, 0.95)
+    praising = estimates[SentimentCategory.APPRECIATIVE_PRAISING.value]
+    assert praising.proportion == 0.5
+    # The whole stratum is labelled, so there is no sampling error
+    assert praising.lower == praising.upper == 0.5